@@ -0,0 +1,166 @@
+"""Koşu başına çevrimiçi (online) örnek toplayıcı.
+
+Abonenin mesaj kayıtları geldikçe katlanır; DataFrame ya da geçici dosya
+gerekmez, test zaman aşımına uğrasa bile o ana kadarki sonuçlar elde kalır.
+- sıra numarası tekilleştirme bit eşlemi (yinelenen teslimler bir kez sayılır)
+- Welford ortalama/varyans (gecikme ortalaması ve jitter)
+- sabit boyutlu, logaritmik kovalı (HDR tarzı) gecikme histogramı; koşular
+  arasında kova kova toplanarak birleştirilebilir (dashboard/histograms.py)
+Ham örnekler (yinelenenler dahil, geliş sırasıyla) arşiv için ayrıca tutulur.
+"""
+import math
+import threading
+from array import array
+
+# Bit eşlemi bu sıra numarasına kadar büyür; daha büyükleri (bozuk yük) kümede tutulur
+MAX_BITMAP_SEQ = 1 << 24
+INT32_MIN, INT32_MAX = -(1 << 31), (1 << 31) - 1
+
+# Histogram: kova i, (MIN * 2^((i-1)/B), MIN * 2^(i/B)] aralığı (B = BUCKETS_PER_OCTAVE,
+# ~%4.4 çözünürlük); kova 0 <= MIN, son kova üst sınırın üstünü de tutar (~22 dk).
+# dashboard/histograms.py ile aynı olmalı
+BUCKETS_PER_OCTAVE = 16
+MIN_LATENCY_MS = 0.01
+HISTOGRAM_BUCKETS = 27 * BUCKETS_PER_OCTAVE + 1
+
+# Sonuç satırına yazılan yüzdelik kolonları
+PERCENTILE_COLUMNS = {"LatencyP50_ms": 50, "LatencyP90_ms": 90, "LatencyP99_ms": 99, "LatencyP999_ms": 99.9}
+
+
+class OnlineAggregator:
+    """Thread-safe: akış okuyucu thread'i ekler, orkestratör sonucu okur"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = bytearray(128)
+        self._seen_overflow = set()
+        self.count = 0
+        self.duplicates = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self.raw_seqs = array("i")
+        self.raw_latencies = array("f")
+
+    def _first_seen(self, seq):
+        if seq < 0 or seq >= MAX_BITMAP_SEQ:
+            if seq in self._seen_overflow:
+                return False
+            self._seen_overflow.add(seq)
+            return True
+        byte, bit = divmod(seq, 8)
+        if byte >= len(self._seen):
+            self._seen.extend(bytes(max(byte + 1, 2 * len(self._seen)) - len(self._seen)))
+        if self._seen[byte] & (1 << bit):
+            return False
+        self._seen[byte] |= 1 << bit
+        return True
+
+    def add(self, seq, latency_ms):
+        with self._lock:
+            self.raw_seqs.append(seq if INT32_MIN <= seq <= INT32_MAX else -1)
+            self.raw_latencies.append(latency_ms)
+            if not self._first_seen(seq):
+                self.duplicates += 1
+                return
+            self.count += 1
+            delta = latency_ms - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (latency_ms - self.mean)
+            self.min = min(self.min, latency_ms)
+            self.max = max(self.max, latency_ms)
+            self.histogram[bucket_index(latency_ms)] += 1
+
+    def add_line(self, line):
+        """'seq,latency' ya da results.csv satırı 'timestamp,seq,latency'; başlık/bozuk satır False"""
+        fields = line.strip().split(",")
+        try:
+            seq, latency = int(fields[-2]), float(fields[-1])
+        except (IndexError, ValueError):
+            return False
+        self.add(seq, latency)
+        return True
+
+    def add_csv(self, text):
+        for line in (text or "").splitlines():
+            self.add_line(line)
+
+    @property
+    def std(self):
+        """Örneklem standart sapması (pandas std ile aynı, ddof=1)"""
+        with self._lock:
+            return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def percentile(self, q):
+        """Histogramdan yaklaşık yüzdelik (kova üst sınırı, [min, max] ile kırpılır)"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(q / 100.0 * self.count))
+            seen = 0
+            for bucket, count in enumerate(self.histogram):
+                seen += count
+                if seen >= rank:
+                    return max(min(bucket_upper(bucket), self.max), self.min)
+            return self.max
+
+    def percentile_columns(self):
+        """Sonuç satırı için p50/p90/p99/p99.9/max kolonları"""
+        columns = {name: self.percentile(q) for name, q in PERCENTILE_COLUMNS.items()}
+        columns["LatencyMax_ms"] = self.max if self.count else 0.0
+        return columns
+
+    def merge(self, other):
+        """Başka bir koşunun toplayıcısını ekle (tekrarlı koşular). Sıra numaraları koşular arasında
+        tekilleştirilmez; her koşu kendi içinde tekilleştirilmiştir."""
+        with other._lock:
+            count, mean, m2 = other.count, other.mean, other._m2
+            low, high, histogram, duplicates = other.min, other.max, list(other.histogram), other.duplicates
+            raw_seqs, raw_latencies = array("i", other.raw_seqs), array("f", other.raw_latencies)
+        with self._lock:
+            self.raw_seqs.extend(raw_seqs)
+            self.raw_latencies.extend(raw_latencies)
+            self.duplicates += duplicates
+            if not count:
+                return
+            # Paralel Welford birleştirmesi (Chan ve ark.)
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean += delta * count / total
+            self._m2 += m2 + delta * delta * self.count * count / total
+            self.count = total
+            self.min = min(self.min, low)
+            self.max = max(self.max, high)
+            self.histogram = [a + b for a, b in zip(self.histogram, histogram)]
+
+    def encode_histogram(self):
+        """Seyrek metin kodlaması: 'kova:adet,kova:adet' (boş kovalar yazılmaz)"""
+        with self._lock:
+            return ",".join(f"{bucket}:{count}" for bucket, count in enumerate(self.histogram) if count)
+
+
+def decode_histogram(text):
+    """encode_histogram metninden (kova, adet) çiftleri; boş/bozuk girdiler ve aralık dışı kovalar atlanır"""
+    if not isinstance(text, str) or not text:
+        return
+    for pair in text.split(","):
+        bucket, _, count = pair.partition(":")
+        try:
+            bucket, count = int(bucket), int(count)
+        except ValueError:
+            continue
+        if 0 <= bucket < HISTOGRAM_BUCKETS:
+            yield bucket, count
+
+
+def bucket_index(latency_ms):
+    if latency_ms <= MIN_LATENCY_MS:
+        return 0
+    bucket = math.ceil(math.log2(latency_ms / MIN_LATENCY_MS) * BUCKETS_PER_OCTAVE)
+    return min(bucket, HISTOGRAM_BUCKETS - 1)
+
+
+def bucket_upper(bucket):
+    return MIN_LATENCY_MS * 2 ** (bucket / BUCKETS_PER_OCTAVE)
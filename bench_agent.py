@@ -0,0 +1,100 @@
+"""Konteyner başına uzun ömürlü Java benchmark ajanı (`java -jar /app/bench.jar agent`).
+
+Ajan yığın kurulurken bir kez başlatılır; komutlar konteyner içindeki yerel
+kontrol soketine (127.0.0.1:AGENT_PORT) kalıcı kabuk oturumu üzerinden gönderilir.
+Her istek tek satır komut, yanıt tek satır "OK k=v ..." ya da "ERR mesaj".
+Abone örnekleri `stream` bağlantısıyla geldikleri anda orkestratöre akar.
+"""
+import shlex
+import subprocess
+import threading
+
+AGENT_PORT = 7070
+AGENT_DIR = "/tmp/bench_agent"
+AGENT_READY_MARKER = "BENCHMARK_AGENT_READY"
+
+
+class AgentError(Exception):
+    """Ajan komutu reddetti ya da yanıt vermedi"""
+
+
+class AgentClient:
+    def __init__(self, shell, port=AGENT_PORT):
+        self.shell = shell
+        self.port = port
+
+    @property
+    def log_path(self):
+        return f"{AGENT_DIR}/agent.log"
+
+    def start(self):
+        """Ajanı arka planda başlat (çalışan eski ajan/JVM'ler öldürülür)"""
+        self.shell.run("pkill -f 'java -jar'", check=False)
+        self.shell.run(f"mkdir -p {AGENT_DIR} && rm -f {self.log_path}")
+        self.shell.run_detached(f"cd {AGENT_DIR} && exec java -jar /app/bench.jar agent {self.port} > agent.log 2>&1")
+
+    def request(self, *args, timeout=None):
+        """Komutu gönder; OK yanıtındaki k=v alanlarını dict olarak döndür"""
+        line = " ".join(str(arg) for arg in args)
+        # sh'de /dev/tcp yok; bağlantı bash ile açılır
+        script = (f"exec 3<>/dev/tcp/127.0.0.1/{self.port} && printf '%s\\n' {shlex.quote(line)} >&3 "
+                  f"&& IFS= read -r reply <&3 && printf '%s\\n' \"$reply\"")
+        reply = self.shell.run(f"bash -c {shlex.quote(script)}", check=False, timeout=timeout)
+        if not reply:
+            raise AgentError(f"no reply from agent on {self.shell.container} for: {args[0]}")
+        if not reply.startswith("OK"):
+            raise AgentError(f"{self.shell.container}: {reply}")
+        return dict(field.split("=", 1) for field in reply.split()[1:] if "=" in field)
+
+    def stream(self, run_id, aggregator):
+        """Koşunun örnek akışını aç (önce `start` gönderilmiş olmalı)"""
+        return SampleStreamReader(self.shell.container, self.port, run_id, aggregator)
+
+
+class SampleStreamReader:
+    """`stream` bağlantısını ayrı bir docker exec sürecinde açık tutar; gelen
+    "seq,latency" satırlarını toplayıcıya katlar, "END" ile biter"""
+
+    def __init__(self, container, port, run_id, aggregator):
+        self.aggregator = aggregator
+        self.error = None
+        self.finished = False
+        self._opened = threading.Event()
+        script = (f"exec 3<>/dev/tcp/127.0.0.1/{port} && printf '%s\\n' {shlex.quote(f'stream {run_id}')} >&3 "
+                  f"&& cat <&3")
+        self._proc = subprocess.Popen(
+            ["docker", "exec", container, "bash", "-c", script],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1
+        )
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        lines = iter(self._proc.stdout.readline, '')
+        first = next(lines, '').strip()
+        if first != "OK":
+            self.error = first or "stream closed before reply"
+            self._opened.set()
+            return
+        self._opened.set()
+        for line in lines:
+            if line.strip() == "END":
+                self.finished = True
+                break
+            self.aggregator.add_line(line)
+
+    def wait_open(self, timeout):
+        """Ajan akışı kaydedene kadar bekle; üretici bundan sonra başlatılmalı"""
+        if not self._opened.wait(timeout):
+            self.close(0)
+            raise AgentError(f"sample stream not opened after {timeout}s")
+        if self.error:
+            raise AgentError(f"sample stream: {self.error}")
+
+    def close(self, timeout):
+        """END gelene kadar (en fazla timeout saniye) bekle, sonra süreci kapat"""
+        self._thread.join(timeout)
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
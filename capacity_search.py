@@ -0,0 +1,81 @@
+"""Protokol ve ağ profili başına sürdürülebilir en yüksek üretici hızı (run_experiments.py --capacity).
+
+Sabit RATES ızgarası bir protokolün nerede doyduğunu göstermez. Kapasite
+araması her (size, bandwidth, loss, delay) profili için hızı START_RATE'ten
+başlayarak GROWTH katıyla artırır (üssel yoklama); SLO ilk kez ihlal edilince
+son geçen ve ilk kalan hız arasında ikili arama yapar. Aralık RESOLUTION
+oranına (en az 1 mesaj/sn) inince son geçen hız kapasitedir.
+
+SLO: teslim oranı >= slo_delivery (%) ve p99 gecikme <= yapılandırılan tek yön
+gecikme + slo_p99_ms (kuyruk ve yeniden iletim bütçesi; 500ms profilinde de
+anlamlı kalsın diye netem gecikmesinin üstüne eklenir).
+
+Sonuçlar `capacity`, her yoklama `capacity_probes` tablosuna yazılır (results_db v5).
+"""
+import math
+
+SLO_DELIVERY = 99.0  # yüzde
+SLO_P99_MS = 500.0  # yapılandırılan gecikmenin üstüne
+
+START_RATE = 1
+MAX_RATE = 2000
+GROWTH = 2.0
+RESOLUTION = 0.05
+
+# Arama sonucu (capacity.Status)
+FOUND = "FOUND"  # geçen ve kalan hız arasında daraltıldı
+AT_MAX = "AT_MAX"  # MAX_RATE'te bile SLO sağlandı; kapasite en az bu kadar
+BELOW_MIN = "BELOW_MIN"  # START_RATE'te bile SLO ihlal edildi
+
+
+def slo_check(delivery_ratio, p99_ms, delay_ms, slo_delivery=SLO_DELIVERY, slo_p99_ms=SLO_P99_MS):
+    """(geçti mi, ihlal nedeni); p99 None ise (mesaj alınmadı) kalır"""
+    if p99_ms is None:
+        return False, "no data"
+    reasons = []
+    if delivery_ratio < slo_delivery:
+        reasons.append(f"delivery {delivery_ratio:.1f}% < {slo_delivery:g}%")
+    if p99_ms > delay_ms + slo_p99_ms:
+        reasons.append(f"p99 {p99_ms:.0f}ms > {delay_ms + slo_p99_ms:g}ms")
+    return not reasons, "; ".join(reasons)
+
+
+class CapacitySearch:
+    """Üssel yoklama + ikili arama durumu: next_rate() ile sıradaki hız, record() ile sonucu"""
+
+    def __init__(self, start=START_RATE, max_rate=MAX_RATE, growth=GROWTH, resolution=RESOLUTION):
+        self.start = start
+        self.max_rate = max(max_rate, start)
+        self.growth = growth
+        self.resolution = resolution
+        self.passed = None  # SLO'yu sağlayan en yüksek hız
+        self.failed = None  # SLO'yu ihlal eden en düşük hız
+
+    @property
+    def phase(self):
+        """Sıradaki yoklamanın aşaması: ihlal görülene kadar 'probe', sonra 'bisect'"""
+        return "probe" if self.failed is None else "bisect"
+
+    def next_rate(self):
+        """Sıradaki hız; arama bittiyse None"""
+        if self.failed is None:
+            if self.passed is None:
+                return self.start
+            if self.passed >= self.max_rate:
+                return None
+            return min(max(math.ceil(self.passed * self.growth), self.passed + 1), self.max_rate)
+        if self.passed is None or self.failed - self.passed <= max(1, self.resolution * self.passed):
+            return None
+        return (self.passed + self.failed) // 2
+
+    def record(self, rate, passed):
+        if passed:
+            self.passed = rate if self.passed is None else max(self.passed, rate)
+        else:
+            self.failed = rate if self.failed is None else min(self.failed, rate)
+
+    def result(self):
+        """(kapasite, durum); BELOW_MIN'de kapasite None"""
+        if self.passed is None:
+            return None, BELOW_MIN
+        return self.passed, AT_MAX if self.failed is None else FOUND
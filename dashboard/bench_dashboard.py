@@ -0,0 +1,381 @@
+"""Dashboard API benchmark'ı: sentetik büyük sonuç geçmişi, eşzamanlı istemciler, rapor.
+
+Üç adım (dashboard/ dizininden çalıştırılır):
+    python bench_dashboard.py generate --rows 1000000 --legacy-share 0.3
+    python bench_dashboard.py run --clients 8 --requests 20 --output before.json
+    python bench_dashboard.py compare before.json after.json
+
+generate, run_experiments.py'nin yazdığı kolon düzeninde (RESULT_COLUMNS) ve
+results_bak/ içindeki eski düzende (LEGACY_COLUMNS) results_<proto>.csv
+dosyaları üretir ve results_db.import_csv ile bir benchmark veritabanına aktarır.
+run her endpoint'i ayrı bir alt süreçte Flask test client'larıyla yükler; böylece
+tepe RSS endpoint başına ölçülür ve önbellekler her endpoint için soğuk başlar.
+Rapor (JSON) ilk (soğuk) istek süresini, yanıt önbelleği kapalıyken her isteğin
+hesaplandığı gecikme yüzdeliklerini (p50_ms/p90_ms/p99_ms), önbellek açıkken
+ölçülen sıcak yüzdelikleri (warm_p50_ms/warm_p99_ms) ve tepe RSS'i içerir.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from histograms import BUCKETS_PER_OCTAVE, HISTOGRAM_BUCKETS, MIN_LATENCY_MS
+from results_store import RESULT_COLUMNS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import results_db  # noqa: E402
+from network_profile import parse_delay, parse_loss, parse_rate  # noqa: E402
+from run_experiments import DURATION, PROTOCOLS as EXPERIMENT_PROTOCOLS, iter_configs  # noqa: E402
+
+BENCH_DIR = "../results/bench"
+BENCH_DB = os.path.join(BENCH_DIR, "results.db")
+
+# results_bak/ dosyalarının kolon düzeni (Status, yüzdelikler ve histogram öncesi)
+LEGACY_COLUMNS = ['Protocol', 'Size', 'Rate', 'Bandwidth', 'Loss', 'Delay', 'ConfigDelay_ms',
+                  'DeliveryRatio', 'LatencyAvg_ms', 'Jitter_ms', 'Throughput_bps', 'Timestamp']
+
+# Sentetik konfigürasyon ızgarası run_experiments.iter_configs'ten (atlanan hücreler dahil aynı);
+# satırlar ızgarayı tekrar tekrar dolaşır
+PROTOCOLS = list(EXPERIMENT_PROTOCOLS)
+GRID = list(iter_configs())
+GRID_SIZE, GRID_RATE, GRID_BW, GRID_LOSS, GRID_DELAY = (np.array(values, dtype=object) for values in zip(*GRID))
+GRID_BW_BPS = np.array([parse_rate(bw) for bw in GRID_BW])
+GRID_LOSS_PCT = np.array([parse_loss(loss) for loss in GRID_LOSS])
+GRID_DELAY_MS = np.array([parse_delay(delay) for delay in GRID_DELAY]).astype(np.int64)
+GENERATE_CHUNK = 200000  # CSV'ye tek seferde yazılan satır
+
+# Endpoint adı -> (yol, istemci başına istek; None ise --requests)
+BENCH_ENDPOINTS = {
+    'filtered-data': ('/api/filtered-data?limit=1000', None),
+    'filtered-data-filter': ('/api/filtered-data?protocol=mqtt-qos1&bandwidth=50kbit&loss=1%25', None),
+    'filtered-data-all': ('/api/filtered-data', 1),
+    'detailed-stats': ('/api/detailed-stats', None),
+    'network-conditions': ('/api/network-conditions', None),
+    'analysis': ('/api/analysis?delay=100&loss=1', None),
+    'comparison': ('/api/comparison?bandwidth=50kbit', None),
+    'latency-percentiles': ('/api/latency-percentiles?loss=1%25', None),
+    'export-csv': ('/api/export/csv', 1),
+    'export-parquet': ('/api/export/parquet', 1),
+}
+REQUEST_HEADERS = {'Accept-Encoding': 'gzip'}
+REPORT_PERCENTILES = {'p50_ms': 50, 'p90_ms': 90, 'p99_ms': 99}
+
+
+def synthetic_frame(proto, start, count, rng, legacy=False):
+    """proto için start. satırdan itibaren count sentetik sonuç satırı"""
+    index = np.arange(start, start + count)
+    cells = index % len(GRID)
+    size, rate = GRID_SIZE[cells].astype(np.int64), GRID_RATE[cells].astype(np.int64)
+    bw, loss = GRID_BW[cells], GRID_LOSS[cells]
+    delay, bw_bps, loss_pct = GRID_DELAY_MS[cells], GRID_BW_BPS[cells], GRID_LOSS_PCT[cells]
+
+    # Gecikme: yapılandırılmış gecikme + serileştirme + protokol payı, log-normal gürültüyle
+    base = delay + (size + 60) * 8 / bw_bps * 1000.0 + 2.0 * PROTOCOLS.index(proto)
+    latency = base * rng.lognormal(0.0, 0.2, count) + 1.0
+    congested = (bw_bps <= 50e3) & (rate >= 100)
+    delivery = np.clip(100.0 - loss_pct * rng.uniform(0.2, 1.5, count)
+                       - congested * rng.uniform(20.0, 80.0, count), 0.0, 100.0)
+    expected = rate * DURATION
+    received = np.round(expected * delivery / 100.0).astype(np.int64)
+    status = rng.choice(np.array(['SUCCESS', 'PARTIAL: timeout', 'NO_DATA']), count, p=[0.98, 0.01, 0.01])
+    no_data = status == 'NO_DATA'
+    delivery[no_data], received[no_data], latency[no_data] = 0.0, 0, 0.0
+
+    df = pd.DataFrame({
+        'Protocol': proto,
+        'Size': size,
+        'Rate': rate,
+        'Bandwidth': bw,
+        'Loss': loss,
+        'Delay': GRID_DELAY[cells],
+        'ConfigDelay_ms': delay,
+        'DeliveryRatio': delivery,
+        'LatencyAvg_ms': latency,
+        'Jitter_ms': latency * rng.uniform(0.05, 0.4, count),
+        'Throughput_bps': received * size * 8.0 / DURATION,
+        'Timestamp': 1.7e9 + index * 15.0 + rng.uniform(0.0, 1.0, count)
+    })
+    if legacy:
+        return df[LEGACY_COLUMNS]
+
+    for column, factor in (('LatencyP50_ms', 0.95), ('LatencyP90_ms', 1.3), ('LatencyP99_ms', 2.0),
+                           ('LatencyP999_ms', 3.0), ('LatencyMax_ms', 3.5)):
+        df[column] = latency * factor
+    df['LatencyHist'] = _histograms(df['LatencyP50_ms'].to_numpy(), rate, no_data)
+    df['ReceivedCount'] = received
+    df['ExpectedCount'] = expected
+    df['Status'] = status
+    df['RunId'] = f"{proto.replace('-', '_')}_" + pd.Series(index).astype(str).to_numpy()
+    # Uyarlamalı olmayan tarama: tek tekrar, güven aralığı yok
+    df['Repetitions'] = 1
+    for column in ('DeliveryRatio_ci_lower', 'DeliveryRatio_ci_upper', 'LatencyAvg_ms_ci_lower', 'LatencyAvg_ms_ci_upper'):
+        df[column] = np.nan
+    return df[RESULT_COLUMNS]
+
+
+def _histograms(p50, rate, no_data):
+    """p50 kovası etrafında sağa çarpık sentetik histogram metinleri (aynı (kova, rate) bir kez üretilir)"""
+    center = np.ceil(np.log2(np.maximum(p50, MIN_LATENCY_MS) / MIN_LATENCY_MS) * BUCKETS_PER_OCTAVE)
+    center = np.clip(center, 0, HISTOGRAM_BUCKETS - 1).astype(np.int64)
+    offsets = np.arange(-4, 13)
+    weights = np.exp(-(offsets / np.where(offsets < 0, 4.0, 8.0)) ** 2)
+    weights /= weights.sum()
+
+    texts = {}
+    for key in set(zip(center.tolist(), rate.tolist())):
+        bucket, messages = key[0], key[1] * DURATION
+        counts = np.round(weights * messages).astype(int)
+        texts[key] = ",".join(f"{bucket + offset}:{n}" for offset, n in zip(offsets, counts)
+                              if n and 0 <= bucket + offset < HISTOGRAM_BUCKETS)
+    hist = np.array([texts[key] for key in zip(center.tolist(), rate.tolist())], dtype=object)
+    hist[no_data] = ""
+    return hist
+
+
+def generate(out_dir, rows, legacy_share, seed, import_db=True):
+    """Sentetik CSV'leri yaz ve (import_db ise) out_dir/results.db'ye aktar"""
+    rng = np.random.default_rng(seed)
+    legacy_dir = os.path.join(out_dir, "legacy")
+    os.makedirs(legacy_dir, exist_ok=True)
+    per_proto = np.full(len(PROTOCOLS), rows // len(PROTOCOLS))
+    per_proto[:rows % len(PROTOCOLS)] += 1
+
+    started = time.perf_counter()
+    paths = []
+    for proto, count in zip(PROTOCOLS, per_proto):
+        legacy_rows = int(count * legacy_share)
+        safe_proto = proto.replace('-', '_')
+        # Eski satırlar geçmişin başında (results_bak), yenileri devamında
+        for directory, start, n, legacy in ((legacy_dir, 0, legacy_rows, True),
+                                            (out_dir, legacy_rows, count - legacy_rows, False)):
+            if n == 0:
+                continue
+            path = os.path.join(directory, f"results_{safe_proto}.csv")
+            for offset in range(0, n, GENERATE_CHUNK):
+                chunk = synthetic_frame(proto, start + offset, min(GENERATE_CHUNK, n - offset), rng, legacy)
+                chunk.to_csv(path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+            paths.append(path)
+    print(f"Generated {rows} rows ({legacy_share:.0%} legacy layout) in {time.perf_counter() - started:.1f}s")
+
+    if import_db:
+        db_path = os.path.join(out_dir, "results.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        started = time.perf_counter()
+        conn = results_db.connect(db_path)
+        for path in paths:
+            results_db.import_csv(conn, path)
+        conn.close()
+        print(f"Imported into {db_path} in {time.perf_counter() - started:.1f}s")
+
+
+def _peak_rss_mb():
+    # Linux'ta ru_maxrss KiB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def bench_endpoint(db_path, path, clients, requests_per_client, warm=True):
+    """Tek endpoint'i bu süreçte yükle (run tarafından ayrı alt süreçte çağrılır).
+
+    Soğuk istek ve p50/p90/p99 yanıt önbelleği kapalıyken ölçülür (her istek hesaplanır);
+    warm ise ardından önbellek açık tekrarlanır (warm_*: ETag önbelleği isabetleri).
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        import dashboard
+        from results_store import ResultsStore
+        # Dashboard'u benchmark veritabanına yönlendir
+        dashboard.results_store = ResultsStore(db_path, dashboard.PROTOCOLS)
+        dashboard.data_cache.version_fn = dashboard.results_store.etag
+        dashboard.data_cache.max_entries = 0
+    rss_base = _peak_rss_mb()
+
+    def fetch(client):
+        started = time.perf_counter()
+        response = client.get(path, headers=REQUEST_HEADERS)
+        size = len(response.get_data())
+        response.close()
+        return (time.perf_counter() - started) * 1000.0, response.status_code, size
+
+    # İlk istek tek başına: soğuk veritabanı/önbellek maliyeti
+    with contextlib.redirect_stdout(sys.stderr):
+        cold_ms, cold_status, cold_bytes = fetch(dashboard.app.test_client())
+
+    def load():
+        """clients eşzamanlı istemci x requests_per_client istek: (örnekler, duvar saati süresi)"""
+        samples, lock = [], threading.Lock()
+
+        def client_loop():
+            client = dashboard.app.test_client()
+            for _ in range(requests_per_client):
+                sample = fetch(client)
+                with lock:
+                    samples.append(sample)
+
+        threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return samples, time.perf_counter() - started
+
+    def percentiles(samples, wall, prefix=''):
+        latencies = np.array([ms for ms, _, _ in samples])
+        return {
+            **{prefix + name: round(float(np.percentile(latencies, q)), 2) for name, q in REPORT_PERCENTILES.items()},
+            prefix + 'max_ms': round(float(latencies.max()), 2),
+            prefix + 'mean_ms': round(float(latencies.mean()), 2),
+            prefix + 'req_per_s': round(len(samples) / wall, 2) if wall > 0 else None,
+        }
+
+    samples, wall = load()
+    result = {
+        'path': path,
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 400) + (cold_status >= 400),
+        'status': cold_status,
+        'cold_ms': round(cold_ms, 2),
+        **percentiles(samples, wall),
+        'response_bytes': cold_bytes
+    }
+    if warm:
+        # Önbelleği doldur, sonra aynı yükü isabetlerle tekrarla
+        dashboard.data_cache.max_entries = dashboard.DATA_CACHE_ENTRIES
+        with contextlib.redirect_stdout(sys.stderr):
+            fetch(dashboard.app.test_client())
+        samples, wall = load()
+        result['errors'] += sum(1 for _, status, _ in samples if status >= 400)
+        result.update(percentiles(samples, wall, 'warm_'))
+    result['rss_base_mb'] = round(rss_base, 1)
+    result['rss_peak_mb'] = round(_peak_rss_mb(), 1)
+    return result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(db_path, endpoints, clients, requests, warm=True):
+    """Her endpoint'i ayrı alt süreçte koştur ve raporu döndür"""
+    if not os.path.exists(db_path):
+        raise SystemExit(f"{db_path} not found; run 'python bench_dashboard.py generate' first")
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    report = {
+        'revision': _git_revision(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'db': os.path.abspath(db_path),
+        'rows': rows,
+        'clients': clients,
+        'warm': warm,
+        'endpoints': {}
+    }
+    for name in endpoints:
+        path, per_client = BENCH_ENDPOINTS[name]
+        command = [sys.executable, os.path.abspath(__file__), "worker", "--db", db_path, "--path", path,
+                   "--clients", str(clients), "--requests", str(per_client or requests)]
+        if not warm:
+            command.append("--no-warm")
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{name}: worker failed\n{completed.stderr[-2000:]}")
+            report['endpoints'][name] = {'path': path, 'error': completed.stderr.strip().splitlines()[-1:]}
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        report['endpoints'][name] = result
+        warm_text = f"  warm p50 {result['warm_p50_ms']:7.2f}" if warm else ""
+        print(f"{name:22s} cold {result['cold_ms']:9.1f} ms  p50 {result['p50_ms']:9.1f}  "
+              f"p99 {result['p99_ms']:9.1f}  {result['req_per_s'] or 0:8.1f} req/s{warm_text}  "
+              f"peak RSS {result['rss_peak_mb']:7.1f} MB")
+    return report
+
+
+def compare(before, after):
+    """İki raporu endpoint bazında karşılaştır (oran = sonra / önce)"""
+    def describe(report):
+        return f"{report.get('revision')} ({report['rows']} rows, {report['clients']} clients)"
+    print(f"before: {describe(before)}  after: {describe(after)}")
+    print("p50/p99: response cache off (every request computed); warm_p50: cache hits")
+    metrics = ['cold_ms', 'p50_ms', 'p99_ms', 'warm_p50_ms', 'rss_peak_mb']
+    print(f"{'endpoint':22s}" + "".join(f"{m:>26s}" for m in metrics))
+    for name, new in after['endpoints'].items():
+        old = before['endpoints'].get(name)
+        if old is None or 'error' in old or 'error' in new:
+            print(f"{name:22s} (not comparable)")
+            continue
+        cells = []
+        for metric in metrics:
+            if old.get(metric) is None or new.get(metric) is None:
+                cells.append("-")
+                continue
+            ratio = new[metric] / old[metric] if old[metric] else float('nan')
+            cells.append(f"{old[metric]:9.1f} -> {new[metric]:9.1f} x{ratio:4.2f}")
+        print(f"{name:22s}" + "".join(f"{cell:>26s}" for cell in cells))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Dashboard API benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="write synthetic results_<proto>.csv files and import them")
+    gen.add_argument("--rows", type=int, default=100000, help="total rows over all protocols")
+    gen.add_argument("--legacy-share", type=float, default=0.3, help="fraction of rows in the old column layout")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--out", default=BENCH_DIR)
+    gen.add_argument("--no-import", action="store_true", help="only write the CSV files")
+
+    bench = commands.add_parser("run", help="load every endpoint with concurrent test clients")
+    bench.add_argument("--db", default=BENCH_DB)
+    bench.add_argument("--endpoint", action="append", choices=list(BENCH_ENDPOINTS),
+                       help="endpoint to run (repeatable, default: all)")
+    bench.add_argument("--clients", type=int, default=8)
+    bench.add_argument("--requests", type=int, default=20, help="requests per client")
+    bench.add_argument("--no-warm", action="store_true",
+                       help="skip the second, response-cache-enabled pass (warm_* metrics)")
+    bench.add_argument("--output", help="write the JSON report here")
+
+    cmp_parser = commands.add_parser("compare", help="compare two JSON reports")
+    cmp_parser.add_argument("before")
+    cmp_parser.add_argument("after")
+
+    worker = commands.add_parser("worker")
+    worker.add_argument("--db", required=True)
+    worker.add_argument("--path", required=True)
+    worker.add_argument("--clients", type=int, required=True)
+    worker.add_argument("--requests", type=int, required=True)
+    worker.add_argument("--no-warm", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args.out, args.rows, args.legacy_share, args.seed, import_db=not args.no_import)
+    elif args.command == "run":
+        report = run(args.db, args.endpoint or list(BENCH_ENDPOINTS), args.clients, args.requests,
+                     warm=not args.no_warm)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to {args.output}")
+    elif args.command == "compare":
+        with open(args.before) as f_before, open(args.after) as f_after:
+            compare(json.load(f_before), json.load(f_after))
+    else:
+        print(json.dumps(bench_endpoint(args.db, args.path, args.clients, args.requests,
+                                        warm=not args.no_warm)))
@@ -1,11 +1,23 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 import os
 import json
 import pandas as pd
 import subprocess
 import glob
+import sys
+import threading
+import time
 from datetime import datetime
 
+from exporters import EXPORT_FORMATS, stream_export
+from histograms import histogram_vectors, summarize
+from http_cache import ResponseCache
+from results_store import RESULT_COLUMNS, ResultsStore
+
+# Orkestratörün trace okuyucusu üst dizinde (tracing.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tracing import load_events, slowest, summarize as summarize_phases  # noqa: E402
+
 app = Flask(__name__)
 
 # Deney parametreleri (run_experiments.py ile aynı)
@@ -22,6 +34,61 @@ BANDWIDTHS = ["50kbit", "100kbit", "250kbit", "1mbit"]
 LOSSES = ["0%", "1%", "5%", "10%"]
 DELAYS = [0, 20, 100, 500]
 RESULTS_DIR = "../results"
+RESULTS_DB = os.path.join(RESULTS_DIR, "results.db")
+
+# Tüm endpoint'lerin paylaştığı sonuç deposu
+results_store = ResultsStore(RESULTS_DB, PROTOCOLS)
+
+# Veri endpoint'leri: sonuç sürümüne bağlı ETag/304 ve yanıt önbelleği
+DATA_CACHE_ENTRIES = 256
+data_cache = ResponseCache(results_store.etag, DATA_CACHE_ENTRIES)
+
+# Orkestratörün faz zamanlamaları (Chrome Trace Event JSON)
+TRACE_FILE = os.path.join(RESULTS_DIR, "trace.json")
+TIMING_SLOWEST_LIMIT = 20
+_trace_cache = {'signature': None, 'events': []}
+_trace_lock = threading.Lock()
+
+# Deney log dosyası adayları (ilk bulunan kullanılır)
+LOG_FILES = [
+    '/tmp/final_experiment_run.log',
+    '/tmp/experiment_run.log',
+    '../experiment_log.txt',
+    'experiment_log.txt'
+]
+
+LOG_TAIL_LINES = 100
+LOG_FOLLOW_MAX_BYTES = 1024 * 1024  # takip modunda tek yanıtta en fazla okunacak bayt
+
+# /api/stream ayarları (saniye)
+STREAM_POLL_INTERVAL = 0.25
+STREAM_PROCESS_INTERVAL = 2.0  # pgrep ile süreç kontrolü
+STREAM_HEARTBEAT_INTERVAL = 15.0
+STREAM_MAX_ROWS = 100  # tek olayda gönderilen en fazla yeni satır
+
+# Detaylı istatistik tablosu: isim -> (kolon, hesaplanan istatistikler)
+DETAILED_STATS = {
+    'delivery': ('DeliveryRatio', ['mean', 'min', 'max', 'median', 'p95', 'std']),
+    'latency': ('LatencyAvg_ms', ['mean', 'min', 'max', 'median', 'p95', 'std']),
+    'jitter': ('Jitter_ms', ['mean', 'min', 'max', 'median']),
+    'throughput': ('Throughput_bps', ['mean', 'min', 'max', 'median'])
+}
+
+# /api/filtered-data: eski isimlerle sunulan kolonlar ve gizli yardımcı kolonlar
+FILTERED_DATA_ALIASES = {
+    'Delay_ms': 'ConfigDelay_ms',
+    'PayloadSize_bytes': 'Size',
+    'Rate_msg_s': 'Rate'
+}
+FILTERED_DATA_BLOCK = 10000  # akışta tek parçada serileştirilen değer sayısı
+
+def _round(value, digits=2):
+    """JSON için yuvarla; NaN değerleri null olarak döner"""
+    return None if pd.isna(value) else round(float(value), digits)
+
+def _records(df):
+    """DataFrame satırlarını JSON uyumlu dict listesine çevir (NaN -> None)"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
 
 def calculate_total_tests():
     """Toplam test sayısını hesapla"""
@@ -33,16 +100,11 @@ def get_experiment_status():
     
     status = {}
     for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
-        
         completed = 0
-        if os.path.exists(proto_file):
-            try:
-                df = pd.read_csv(proto_file)
-                completed = len(df)
-            except:
-                completed = 0
+        try:
+            completed = results_store.count(proto)
+        except:
+            completed = 0
         
         status[proto] = {
             'completed': completed,
@@ -76,22 +138,20 @@ def get_latest_results():
     """En son sonuçları al"""
     results = {}
     for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
-        
-        if os.path.exists(proto_file):
+        if results_store.count(proto):
             try:
-                df = pd.read_csv(proto_file)
-                if len(df) > 0:
+                recent_df = results_store.tail(proto, 10)
+                if recent_df is not None:
                     # Son 10 test sonucu
-                    recent = df.tail(10).to_dict('records')
+                    recent = _records(recent_df)
                     
-                    # Özet istatistikler
+                    # Özet istatistikler (SQL AVG/COUNT, tüm tabloyu okumadan)
+                    means, total = results_store.summary(proto)
                     summary = {
-                        'avg_delivery': round(df['DeliveryRatio'].mean(), 2),
-                        'avg_latency': round(df['LatencyAvg_ms'].mean(), 2),
-                        'avg_throughput': round(df['Throughput_bps'].mean(), 2),
-                        'total_tests': len(df)
+                        'avg_delivery': round(means['DeliveryRatio'], 2),
+                        'avg_latency': round(means['LatencyAvg_ms'], 2),
+                        'avg_throughput': round(means['Throughput_bps'], 2),
+                        'total_tests': total
                     }
                     
                     results[proto] = {
@@ -104,187 +164,99 @@ def get_latest_results():
     return results
 
 def get_comparison_data(filters=None):
-    """Protokoller arası karşılaştırma verisi"""
-    comparison = []
-
-    for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
+    """Protokoller arası karşılaştırma verisi; geçersiz filtrede ValueError"""
+    grouped = results_store.rollup(['Protocol'], filters)
+    return [
+        {
+            'protocol': row['Protocol'],
+            'avg_delivery': _round(row['DeliveryRatio_mean']),
+            'avg_latency': _round(row['LatencyAvg_ms_mean']),
+            'avg_throughput': _round(row['Throughput_bps_mean']),
+            'total_tests': int(row['count'])
+        }
+        for _, row in grouped.iterrows()
+    ]
 
-        if os.path.exists(proto_file):
-            try:
-                df = pd.read_csv(proto_file)
-
-                # Filtreleri uygula
-                if filters and len(df) > 0:
-                    if filters.get('size'):
-                        df = df[df['Size'] == int(filters['size'])]
-                    if filters.get('bandwidth'):
-                        df = df[df['Bandwidth'] == filters['bandwidth']]
-                    if filters.get('loss'):
-                        df = df[df['Loss'] == filters['loss']]
-                    if filters.get('delay'):
-                        df = df[df['ConfigDelay_ms'] == int(filters['delay'])]
-
-                if len(df) > 0:
-                    comparison.append({
-                        'protocol': proto,
-                        'avg_delivery': round(df['DeliveryRatio'].mean(), 2),
-                        'avg_latency': round(df['LatencyAvg_ms'].mean(), 2),
-                        'avg_throughput': round(df['Throughput_bps'].mean(), 2),
-                        'total_tests': len(df)
-                    })
-            except:
-                pass
-
-    return comparison
 
 def get_detailed_stats():
     """Detaylı istatistikler - Her protokol için min/max/median/percentile"""
-    stats = {}
+    columns = [column for column, _ in DETAILED_STATS.values()]
+    # Yalnızca gruplanan metrik kolonları (LatencyHist gibi büyük metin kolonları okunmaz)
+    df = results_store.combined(columns)
 
-    for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
+    # Tek groupby: tüm kolonlar için tüm istatistikler
+    grouped = df.groupby('Protocol', observed=True)[columns]
+    aggregated = grouped.agg(['mean', 'min', 'max', 'median', 'std'])
+    p95 = grouped.quantile(0.95)
 
-        if os.path.exists(proto_file):
-            try:
-                df = pd.read_csv(proto_file)
-                if len(df) > 0:
-                    stats[proto] = {
-                        'delivery': {
-                            'mean': round(df['DeliveryRatio'].mean(), 2),
-                            'min': round(df['DeliveryRatio'].min(), 2),
-                            'max': round(df['DeliveryRatio'].max(), 2),
-                            'median': round(df['DeliveryRatio'].median(), 2),
-                            'p95': round(df['DeliveryRatio'].quantile(0.95), 2),
-                            'std': round(df['DeliveryRatio'].std(), 2)
-                        },
-                        'latency': {
-                            'mean': round(df['LatencyAvg_ms'].mean(), 2),
-                            'min': round(df['LatencyAvg_ms'].min(), 2),
-                            'max': round(df['LatencyAvg_ms'].max(), 2),
-                            'median': round(df['LatencyAvg_ms'].median(), 2),
-                            'p95': round(df['LatencyAvg_ms'].quantile(0.95), 2),
-                            'std': round(df['LatencyAvg_ms'].std(), 2)
-                        },
-                        'jitter': {
-                            'mean': round(df['Jitter_ms'].mean(), 2) if 'Jitter_ms' in df.columns else 0,
-                            'min': round(df['Jitter_ms'].min(), 2) if 'Jitter_ms' in df.columns else 0,
-                            'max': round(df['Jitter_ms'].max(), 2) if 'Jitter_ms' in df.columns else 0,
-                            'median': round(df['Jitter_ms'].median(), 2) if 'Jitter_ms' in df.columns else 0
-                        },
-                        'throughput': {
-                            'mean': round(df['Throughput_bps'].mean(), 2),
-                            'min': round(df['Throughput_bps'].min(), 2),
-                            'max': round(df['Throughput_bps'].max(), 2),
-                            'median': round(df['Throughput_bps'].median(), 2)
-                        }
-                    }
-            except Exception as e:
-                stats[proto] = {'error': str(e)}
+    percentiles = get_latency_percentiles()
 
-    return stats
+    stats = {}
+    for proto in aggregated.index:
+        stats[proto] = {
+            name: {
+                stat: _round(p95.at[proto, column] if stat == 'p95' else aggregated.at[proto, (column, stat)])
+                for stat in stat_names
+            }
+            for name, (column, stat_names) in DETAILED_STATS.items()
+        }
+        # Birleşik histogramdan gerçek mesaj gecikmesi yüzdelikleri
+        stats[proto]['latency_percentiles'] = percentiles.get(proto)
 
-def get_filtered_data(filters=None):
-    """Filtrelenmiş veri - bandwidth, loss, delay, protocol gibi filtrelere göre"""
-    all_data = []
+    return stats
 
-    for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
 
-        if os.path.exists(proto_file):
-            try:
-                df = pd.read_csv(proto_file)
-                if len(df) > 0:
-                    # Kolon adlarını standartlaştır
-                    if 'ConfigDelay_ms' in df.columns:
-                        df['Delay_ms'] = df['ConfigDelay_ms']
-                    if 'Size' in df.columns:
-                        df['PayloadSize_bytes'] = df['Size']
-                    if 'Rate' in df.columns:
-                        df['Rate_msg_s'] = df['Rate']
-
-                    # Filtre uygula
-                    if filters:
-                        if 'protocol' in filters and filters['protocol']:
-                            if proto != filters['protocol']:
-                                continue
-                        if 'bandwidth' in filters and filters['bandwidth']:
-                            df = df[df['Bandwidth'] == filters['bandwidth']]
-                        if 'loss' in filters and filters['loss']:
-                            df = df[df['Loss'] == filters['loss']]
-                        if 'delay' in filters and filters['delay']:
-                            df = df[df['Delay_ms'] == int(filters['delay'])]
-                        if 'payload_size' in filters and filters['payload_size']:
-                            df = df[df['PayloadSize_bytes'] == int(filters['payload_size'])]
-
-                    # DataFrame'i dict'e çevir
-                    for _, row in df.iterrows():
-                        all_data.append(row.to_dict())
-            except:
-                pass
-
-    return all_data
+def get_latency_percentiles(filters=None):
+    """Filtreye uyan koşuların histogramlarını protokol bazında birleştirip
+    mesaj gecikmesi yüzdeliklerini hesapla (koşu ortalamalarının yüzdeliği değil).
+    Kovalar yazımda güncellenen rollup_histogram tablosundan gelir; satır sayısıyla büyümez."""
+    buckets, maxima = results_store.latency_histograms(filters)
+    maxima = dict(zip(maxima['Protocol'], maxima['max']))
+    return {proto: summarize(counts, maxima.get(proto)) for proto, counts in histogram_vectors(buckets).items()}
+
+def _json_values(series):
+    """Seriyi JSON dizisi elemanlarına çevir (NaN -> null)"""
+    values = series.astype(object).where(series.notna(), None).tolist()
+    return ','.join(json.dumps(v) for v in values)
+
+def stream_columnar(df, columns, meta):
+    """DataFrame'i kolon bazlı JSON olarak parça parça üret"""
+    yield '{' + ','.join(f'{json.dumps(k)}:{json.dumps(v)}' for k, v in meta.items())
+    yield ',"columns":' + json.dumps(columns) + ',"data":{'
+    for i, column in enumerate(columns):
+        source = df[FILTERED_DATA_ALIASES.get(column, column)]
+        yield (',' if i else '') + json.dumps(column) + ':['
+        for start in range(0, len(source), FILTERED_DATA_BLOCK):
+            yield (',' if start else '') + _json_values(source.iloc[start:start + FILTERED_DATA_BLOCK])
+        yield ']'
+    yield '}}'
 
 def get_network_condition_comparison():
     """Ağ koşullarına göre karşılaştırma"""
-    results = {
-        'by_bandwidth': {},
-        'by_loss': {},
-        'by_delay': {}
+    dimensions = {
+        'by_bandwidth': ('Bandwidth', {bw: bw for bw in BANDWIDTHS}),
+        'by_loss': ('Loss', {loss: loss for loss in LOSSES}),
+        'by_delay': ('ConfigDelay_ms', {delay: f"{delay}ms" for delay in DELAYS})
     }
-
-    for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
-
-        if os.path.exists(proto_file):
-            try:
-                df = pd.read_csv(proto_file)
-                if len(df) > 0:
-                    # Bandwidth bazlı
-                    for bw in BANDWIDTHS:
-                        if bw not in results['by_bandwidth']:
-                            results['by_bandwidth'][bw] = {}
-                        bw_data = df[df['Bandwidth'] == bw]
-                        if len(bw_data) > 0:
-                            results['by_bandwidth'][bw][proto] = {
-                                'delivery': round(bw_data['DeliveryRatio'].mean(), 2),
-                                'latency': round(bw_data['LatencyAvg_ms'].mean(), 2),
-                                'throughput': round(bw_data['Throughput_bps'].mean(), 2)
-                            }
-
-                    # Loss bazlı
-                    for loss in LOSSES:
-                        if loss not in results['by_loss']:
-                            results['by_loss'][loss] = {}
-                        loss_data = df[df['Loss'] == loss]
-                        if len(loss_data) > 0:
-                            results['by_loss'][loss][proto] = {
-                                'delivery': round(loss_data['DeliveryRatio'].mean(), 2),
-                                'latency': round(loss_data['LatencyAvg_ms'].mean(), 2),
-                                'throughput': round(loss_data['Throughput_bps'].mean(), 2)
-                            }
-
-                    # Delay bazlı
-                    for delay in DELAYS:
-                        delay_key = f"{delay}ms"
-                        if delay_key not in results['by_delay']:
-                            results['by_delay'][delay_key] = {}
-                        delay_data = df[df['Delay_ms'] == delay]
-                        if len(delay_data) > 0:
-                            results['by_delay'][delay_key][proto] = {
-                                'delivery': round(delay_data['DeliveryRatio'].mean(), 2),
-                                'latency': round(delay_data['LatencyAvg_ms'].mean(), 2),
-                                'throughput': round(delay_data['Throughput_bps'].mean(), 2)
-                            }
-            except:
-                pass
+    results = {key: {} for key in dimensions}
+    if results_store.total() == 0:
+        return results
+
+    for key, (column, labels) in dimensions.items():
+        results[key] = {label: {} for label in labels.values()}
+        grouped = results_store.rollup([column, 'Protocol'])
+        for _, row in grouped.iterrows():
+            value, proto = row[column], row['Protocol']
+            if value in labels and pd.notna(proto):
+                results[key][labels[value]][proto] = {
+                    'delivery': _round(row['DeliveryRatio_mean']),
+                    'latency': _round(row['LatencyAvg_ms_mean']),
+                    'throughput': _round(row['Throughput_bps_mean'])
+                }
 
     return results
 
+
 @app.route('/')
 def index():
     """Ana sayfa"""
@@ -299,12 +271,14 @@ def api_status():
     return jsonify(status)
 
 @app.route('/api/results')
+@data_cache.endpoint
 def api_results():
     """Sonuçlar API"""
     results = get_latest_results()
     return jsonify(results)
 
 @app.route('/api/comparison')
+@data_cache.endpoint
 def api_comparison():
     """Karşılaştırma API"""
     # Filtreleri al
@@ -317,7 +291,10 @@ def api_comparison():
     # None değerleri temizle
     filters = {k: v for k, v in filters.items() if v}
 
-    comparison = get_comparison_data(filters if filters else None)
+    try:
+        comparison = get_comparison_data(filters if filters else None)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
     return jsonify(comparison)
 
 @app.route('/api/control/start', methods=['POST'])
@@ -349,39 +326,156 @@ def api_stop():
 
 @app.route('/api/logs')
 def api_logs():
-    """Son logları getir"""
-    log_files = [
-        '/tmp/final_experiment_run.log',
-        '/tmp/experiment_run.log',
-        '../experiment_log.txt',
-        'experiment_log.txt'
-    ]
+    """Son logları getir
 
-    for log_file in log_files:
-        try:
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    lines = f.readlines()
-                    # Son 100 satır
-                    recent_lines = lines[-100:] if len(lines) > 100 else lines
-                    return jsonify({
-                        'logs': ''.join(recent_lines),
-                        'source': log_file
-                    })
-        except:
-            continue
+    offset (ve source) verilirse sadece o offset'ten sonra eklenen satırlar döner;
+    aksi halde dosyanın sonundan geriye okunan son LOG_TAIL_LINES satır döner.
+    Yanıttaki offset bir sonraki takip isteğinde kullanılır.
+    """
+    offset = request.args.get('offset', type=int)
+    source = request.args.get('source')
+
+    log_file = find_log_file()
+    if log_file is None:
+        return jsonify({'logs': 'Log dosyası bulunamadı', 'source': 'none'})
 
-    return jsonify({'logs': 'Log dosyası bulunamadı', 'source': 'none'})
+    try:
+        size = os.path.getsize(log_file)
+        # Kaynak değiştiyse, dosya kısaldıysa ya da çok geride kalındıysa kuyruğa dön
+        if (offset is not None and source in (None, log_file) and offset <= size
+                and size - offset <= LOG_FOLLOW_MAX_BYTES):
+            text, new_offset = read_log_since(log_file, offset)
+            mode = 'follow'
+        else:
+            text, new_offset = tail_log_lines(log_file, LOG_TAIL_LINES)
+            mode = 'tail'
+    except OSError as e:
+        return jsonify({'logs': f'Log okunamadı: {e}', 'source': log_file}), 500
+
+    return jsonify({
+        'logs': text,
+        'source': log_file,
+        'offset': new_offset,
+        'mode': mode
+    })
+
+def find_log_file():
+    """Mevcut ilk log dosyası (yoksa None)"""
+    for log_file in LOG_FILES:
+        if os.path.exists(log_file):
+            return log_file
+    return None
+
+def tail_log_lines(log_file, n, block_size=8192):
+    """Dosyanın sonundan geriye doğru blok blok okuyarak son n satırı ve dosya sonu offset'ini döndür"""
+    with open(log_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        position = end
+        data = b''
+        while position > 0 and data.count(b'\n') <= n:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines(keepends=True)[-n:]
+    return b''.join(lines).decode('utf-8', errors='replace'), end
+
+def read_log_since(log_file, offset):
+    """offset'ten sonra eklenen tam satırları ve yeni offset'i döndür; dosya kısaldıysa baştan okur"""
+    size = os.path.getsize(log_file)
+    if offset > size:
+        offset = 0
+    with open(log_file, 'rb') as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+    end = data.rfind(b'\n') + 1
+    return data[:end].decode('utf-8', errors='replace'), offset + end
+
+def _sse(event, payload):
+    """Server-Sent Events çerçevesi (payload hazır JSON metni)"""
+    return f"event: {event}\ndata: {payload}\n\n"
+
+@app.route('/api/stream')
+def api_stream():
+    """Canlı olay akışı (SSE): yeni sonuç satırları, durum değişiklikleri ve yeni log satırları"""
+    def events():
+        counts = {proto: results_store.count(proto) for proto in PROTOCOLS}
+        version = results_store.version()
+        running = get_experiment_process_status()
+        log_file = find_log_file()
+        log_offset = os.path.getsize(log_file) if log_file else 0
+        last_process_check = last_sent = time.time()
+
+        yield 'retry: 3000\n\n'
+        while True:
+            time.sleep(STREAM_POLL_INTERVAL)
+            now = time.time()
+            status_changed = False
+
+            new_version = results_store.version()
+            if new_version != version:
+                version = new_version
+                status_changed = True
+                for proto in PROTOCOLS:
+                    count = results_store.count(proto)
+                    added = count - counts[proto]
+                    counts[proto] = count
+                    if added > 0:
+                        rows = results_store.tail(proto, min(added, STREAM_MAX_ROWS))
+                        yield _sse('results', f'{{"protocol":{json.dumps(proto)},"version":{version},'
+                                              f'"rows":{rows.to_json(orient="records")}}}')
+                        last_sent = now
+
+            if now - last_process_check >= STREAM_PROCESS_INTERVAL:
+                last_process_check = now
+                new_running = get_experiment_process_status()
+                status_changed = status_changed or new_running != running
+                running = new_running
+
+            if status_changed:
+                status = get_experiment_status()
+                status['running'] = running
+                status['timestamp'] = datetime.now().isoformat()
+                yield _sse('status', json.dumps(status))
+                last_sent = now
+
+            current_log = find_log_file()
+            if current_log != log_file:
+                log_file, log_offset = current_log, 0
+            if log_file:
+                try:
+                    text, log_offset = read_log_since(log_file, log_offset)
+                except OSError:
+                    text = ''
+                if text:
+                    yield _sse('logs', json.dumps({'logs': text, 'source': log_file, 'offset': log_offset}))
+                    last_sent = now
+
+            if now - last_sent >= STREAM_HEARTBEAT_INTERVAL:
+                yield ': heartbeat\n\n'
+                last_sent = now
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/detailed-stats')
+@data_cache.endpoint
 def api_detailed_stats():
     """Detaylı istatistikler API"""
     stats = get_detailed_stats()
     return jsonify(stats)
 
 @app.route('/api/filtered-data')
+@data_cache.endpoint
 def api_filtered_data():
-    """Filtrelenmiş veri API"""
+    """Filtrelenmiş veri API - kolon bazlı, sayfalı ve akışlı
+
+    Parametreler: filtreler, columns=A,B (projeksiyon), limit, offset ve
+    cursor (bir önceki yanıttaki next_cursor; "timestamp,id" anahtarından sonra devam eder).
+    """
     filters = {
         'protocol': request.args.get('protocol'),
         'bandwidth': request.args.get('bandwidth'),
@@ -389,117 +483,185 @@ def api_filtered_data():
         'delay': request.args.get('delay'),
         'payload_size': request.args.get('payload_size')
     }
-    data = get_filtered_data(filters)
-    return jsonify(data)
+
+    available = RESULT_COLUMNS + list(FILTERED_DATA_ALIASES)
+    columns = request.args.get('columns')
+    columns = [c for c in columns.split(',') if c] if columns else available
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        return jsonify({'error': f'Unknown columns: {", ".join(unknown)}'}), 400
+
+    # Projeksiyon SQL'e iner; imleç için Timestamp ve id her zaman okunur
+    selected = list(dict.fromkeys([FILTERED_DATA_ALIASES.get(c, c) for c in columns] + ['Timestamp', 'id']))
+    try:
+        offset = request.args.get('offset', 0, type=int)
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            timestamp, _, row_id = cursor.partition(',')
+            after = (float(timestamp), int(row_id))
+        total, page = results_store.query(filters, columns=selected, after=after,
+                                          offset=offset, limit=request.args.get('limit', type=int))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+
+    has_more = offset + len(page) < total
+    meta = {
+        'total': total,
+        'offset': offset,
+        'count': len(page),
+        'next_cursor': f"{float(page['Timestamp'].iloc[-1])!r},{int(page['id'].iloc[-1])}"
+        if has_more and len(page) > 0 else None
+    }
+    return Response(stream_with_context(stream_columnar(page, columns, meta)), mimetype='application/json')
+
+@app.route('/api/latency-percentiles')
+@data_cache.endpoint
+def api_latency_percentiles():
+    """Filtre kombinasyonu için protokol başına birleşik gecikme yüzdelikleri (p50/p90/p99/p99.9/max)"""
+    filters = {
+        'protocol': request.args.get('protocol'),
+        'bandwidth': request.args.get('bandwidth'),
+        'loss': request.args.get('loss'),
+        'delay': request.args.get('delay'),
+        'payload_size': request.args.get('payload_size'),
+        'rate': request.args.get('rate')
+    }
+    try:
+        return jsonify(get_latency_percentiles(filters))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
 
 @app.route('/api/network-conditions')
+@data_cache.endpoint
 def api_network_conditions():
     """Ağ koşulları karşılaştırma API"""
     data = get_network_condition_comparison()
     return jsonify(data)
 
 @app.route('/api/analysis')
+@data_cache.endpoint
 def api_analysis():
     """Performans analizi API (Latency/Throughput vs Load)"""
     delay_filter = request.args.get('delay')
     loss_filter = request.args.get('loss')
-    
-    print(f"[DEBUG] Analysis filters - delay: {delay_filter}, loss: {loss_filter}")
-    
-    data = {}
-    for proto in PROTOCOLS:
-        safe_proto = proto.replace('-', '_')
-        proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
-        if os.path.exists(proto_file):
-            try:
-                df = pd.read_csv(proto_file)
-                original_len = len(df)
-                
-                if len(df) > 0:
-                    # Filtreleme - CSV'deki sütun isimleri: 'Delay' ve 'Loss'
-                    if delay_filter and delay_filter != 'all':
-                        try:
-                            # Delay sütunu string olabilir ("0ms", "20ms" gibi) veya sayı
-                            delay_val = int(delay_filter)
-                            # Önce sayısal karşılaştırma dene
-                            if 'Delay' in df.columns:
-                                # Delay değeri string ise ("20ms") parse et
-                                if df['Delay'].dtype == 'object':
-                                    df['Delay_numeric'] = df['Delay'].str.replace('ms', '').astype(int)
-                                    df = df[df['Delay_numeric'] == delay_val]
-                                else:
-                                    df = df[df['Delay'] == delay_val]
-                            print(f"[DEBUG] {proto}: After delay filter ({delay_filter}ms) - {len(df)} rows (was {original_len})")
-                        except Exception as e:
-                            print(f"[DEBUG] {proto}: Delay filter error - {e}")
-                        
-                    if loss_filter and loss_filter != 'all':
-                        try:
-                            # Loss sütunu string olabilir ("1%") veya sayı
-                            loss_val = int(loss_filter.replace('%', ''))
-                            before_loss = len(df)
-                            
-                            if 'Loss' in df.columns:
-                                # Loss değeri string ise ("1%") parse et
-                                if df['Loss'].dtype == 'object':
-                                    df['Loss_numeric'] = df['Loss'].str.replace('%', '').astype(int)
-                                    df = df[df['Loss_numeric'] == loss_val]
-                                else:
-                                    df = df[df['Loss'] == loss_val]
-                            print(f"[DEBUG] {proto}: After loss filter ({loss_val}%) - {len(df)} rows (was {before_loss})")
-                        except Exception as e:
-                            print(f"[DEBUG] {proto}: Loss filter error - {e}")
-                    
-                    if len(df) > 0:
-                        # Rate'e göre grupla ve ortalama al
-                        grouped = df.groupby('Rate').agg({
-                            'LatencyAvg_ms': 'mean',
-                            'Throughput_bps': 'mean'
-                        }).reset_index().sort_values('Rate')
-                        
-                        data[proto] = {
-                            'rates': grouped['Rate'].tolist(),
-                            'latency': grouped['LatencyAvg_ms'].tolist(),
-                            'throughput': grouped['Throughput_bps'].tolist()
-                        }
-                        print(f"[DEBUG] {proto}: Added to results with {len(grouped)} rate points")
-            except Exception as e:
-                print(f"[DEBUG] {proto}: Error processing file - {e}")
-    
-    print(f"[DEBUG] Returning data for {len(data)} protocols")
+
+    filters = {}
+    try:
+        if delay_filter and delay_filter != 'all':
+            filters['delay'] = int(delay_filter)
+        if loss_filter and loss_filter != 'all':
+            filters['loss'] = f"{int(loss_filter.replace('%', ''))}%"
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+
+    # Protokol ve Rate'e göre ortalamalar (rollup tablosundan) ve ölçülmemiş konfigürasyonların tahminleri
+    grouped = results_store.rollup(['Protocol', 'Rate'], filters)
+    predicted = results_store.predictions(['Protocol', 'Rate'], filters)
+    data = get_analysis_cells(grouped, predicted)
     return jsonify(data)
 
+
+def get_analysis_cells(grouped, predicted):
+    """Heatmap hücreleri: ölçülen ortalamalar, hücrede ölçülmemiş konfigürasyon varsa tahminlerle
+    birleştirilir. predicted_share tahmin edilen konfigürasyon oranı, *_interval ölçülenler sabit
+    alınarak tahminlerin %95 aralığından elde edilen hücre aralığıdır."""
+    cells = {}
+    for _, row in grouped.iterrows():
+        cells[(row['Protocol'], row['Rate'])] = {'count': row['count'], 'latency': row['LatencyAvg_ms_mean'],
+                                                 'throughput': row['Throughput_bps_mean']}
+    for _, row in predicted.iterrows():
+        cell = cells.setdefault((row['Protocol'], row['Rate']), {'count': 0, 'latency': None, 'throughput': None})
+        cell['predicted'] = row
+
+    data = {}
+    for (proto, rate), cell in sorted(cells.items(), key=lambda item: (PROTOCOLS.index(item[0][0]), item[0][1])):
+        entry = data.setdefault(proto, {'rates': [], 'latency': [], 'throughput': [], 'predicted_share': [],
+                                        'latency_interval': [], 'throughput_interval': []})
+        entry['rates'].append(int(rate))
+        row = cell.get('predicted')
+        share = row['count'] / (row['count'] + cell['count']) if row is not None else 0.0
+        entry['predicted_share'].append(round(share, 3))
+        for key, metric in (('latency', 'LatencyAvg_ms'), ('throughput', 'Throughput_bps')):
+            measured = cell[key] if cell[key] is not None and not pd.isna(cell[key]) else None
+            if row is None or pd.isna(row[metric]):
+                entry[key].append(measured)
+                entry[f'{key}_interval'].append(None)
+                continue
+
+            def blend(value):
+                return value if measured is None else (1 - share) * measured + share * value
+            entry[key].append(blend(row[metric]))
+            entry[f'{key}_interval'].append([_round(blend(row[f'{metric}_lower'])),
+                                             _round(blend(row[f'{metric}_upper']))])
+    return data
+
+def get_trace_events():
+    """trace.json olayları; dosya değişmedikçe (boyut, mtime) yeniden parse edilmez"""
+    try:
+        st = os.stat(TRACE_FILE)
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return []
+    with _trace_lock:
+        if _trace_cache['signature'] != signature:
+            _trace_cache['events'] = load_events(TRACE_FILE)
+            _trace_cache['signature'] = signature
+        return _trace_cache['events']
+
+@app.route('/api/timing')
+def api_timing():
+    """Tarama zaman dağılımı: faz başına toplam/öz süre ve en yavaş konfigürasyonlar"""
+    limit = request.args.get('limit', TIMING_SLOWEST_LIMIT, type=int)
+    events = get_trace_events()
+    return jsonify({
+        'phases': summarize_phases(events),
+        'slowest_configs': slowest(events, 'config', limit),
+        'source': TRACE_FILE if events else None
+    })
+
+@app.route('/api/predictions')
+@data_cache.endpoint
+def api_predictions():
+    """Tarama planlayıcının (sweep_plan.py) ölçülmemiş konfigürasyon tahminleri ve etki tahminleri"""
+    filters = {key: request.args.get(key) for key in ('protocol', 'bandwidth', 'loss', 'delay', 'payload_size', 'rate')}
+    try:
+        predictions, effects = results_store.prediction_rows(filters)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+    return jsonify({'predictions': _records(predictions), 'effects': _records(effects)})
+
+@app.route('/api/capacity')
+@data_cache.endpoint
+def api_capacity():
+    """Kapasite araması (run_experiments.py --capacity): profil başına SLO'yu sağlayan en yüksek hız ve yoklamalar"""
+    filters = {key: request.args.get(key) for key in ('protocol', 'bandwidth', 'loss', 'delay', 'payload_size')}
+    include_probes = request.args.get('probes', '1') not in ('0', 'false')
+    try:
+        capacity, probes = results_store.capacity(filters, include_probes)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+    return jsonify({'capacity': _records(capacity), 'probes': _records(probes) if include_probes else None})
+
 @app.route('/api/export/<format>')
 def api_export(format):
-    """Veri export API - CSV veya JSON"""
+    """Veri export API - CSV, JSON, Parquet veya Arrow (IPC stream), protokol protokol akıtılır"""
+    if results_store.total() == 0:
+        return jsonify({'error': 'No data available'}), 404
+
+    def frames():
+        for _, df in results_store.items():
+            yield df
+
     try:
-        all_data = []
-        for proto in PROTOCOLS:
-            safe_proto = proto.replace('-', '_')
-            proto_file = os.path.join(RESULTS_DIR, f"results_{safe_proto}.csv")
-            if os.path.exists(proto_file):
-                df = pd.read_csv(proto_file)
-                all_data.append(df)
-
-        if not all_data:
-            return jsonify({'error': 'No data available'}), 404
-
-        combined_df = pd.concat(all_data, ignore_index=True)
-
-        if format == 'csv':
-            return combined_df.to_csv(index=False), 200, {
-                'Content-Type': 'text/csv',
-                'Content-Disposition': 'attachment; filename=lpwan_results.csv'
-            }
-        elif format == 'json':
-            return combined_df.to_json(orient='records'), 200, {
-                'Content-Type': 'application/json',
-                'Content-Disposition': 'attachment; filename=lpwan_results.json'
-            }
-        else:
-            return jsonify({'error': 'Invalid format'}), 400
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        stream = stream_export(frames(), format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    mimetype, extension = EXPORT_FORMATS[format]
+    return Response(stream_with_context(stream), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=lpwan_results.{extension}'
+    })
 
 if __name__ == '__main__':
     # Results dizinini oluştur
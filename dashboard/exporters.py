@@ -0,0 +1,156 @@
+"""Sonuçları protokol protokol akıtarak dışa aktaran üreticiler (csv, json, parquet, arrow)"""
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet/arrow formatları için opsiyonel
+    pa = None
+    pq = None
+
+# run_experiments.py'nin yazdığı kolon düzeni; eski dosyalarda eksik olanlar boş kalır
+EXPORT_COLUMNS = {
+    'Protocol': 'string',
+    'Size': 'int',
+    'Rate': 'int',
+    'Bandwidth': 'string',
+    'Loss': 'string',
+    'Delay': 'string',
+    'ConfigDelay_ms': 'int',
+    'DeliveryRatio': 'float',
+    'LatencyAvg_ms': 'float',
+    'Jitter_ms': 'float',
+    'LatencyP50_ms': 'float',
+    'LatencyP90_ms': 'float',
+    'LatencyP99_ms': 'float',
+    'LatencyP999_ms': 'float',
+    'LatencyMax_ms': 'float',
+    'LatencyHist': 'string',
+    'Throughput_bps': 'float',
+    'ReceivedCount': 'int',
+    'ExpectedCount': 'int',
+    'Status': 'string',
+    'Timestamp': 'float',
+    'RunId': 'string',
+    'Repetitions': 'int',
+    'DeliveryRatio_ci_lower': 'float',
+    'DeliveryRatio_ci_upper': 'float',
+    'LatencyAvg_ms_ci_lower': 'float',
+    'LatencyAvg_ms_ci_upper': 'float'
+}
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
+
+ROWS_PER_CHUNK = 50000
+
+
+def _normalize(df):
+    """Parçayı ortak kolon düzenine ve tiplere getir"""
+    out = pd.DataFrame(index=df.index)
+    for column, kind in EXPORT_COLUMNS.items():
+        values = df[column] if column in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if kind == 'int':
+            out[column] = pd.to_numeric(values, errors='coerce').astype('Int64')
+        elif kind == 'float':
+            out[column] = pd.to_numeric(values, errors='coerce').astype('float64')
+        else:
+            out[column] = values.astype(object).where(values.notna(), None)
+    return out
+
+
+def _chunks(frames):
+    """Protokol tablolarını ROWS_PER_CHUNK satırlık normalize parçalara böl"""
+    for df in frames:
+        for start in range(0, len(df), ROWS_PER_CHUNK):
+            yield _normalize(df.iloc[start:start + ROWS_PER_CHUNK])
+
+
+class _ChunkSink:
+    """pyarrow yazıcılarının yazdığı baytları biriktirip parça parça vermek için dosya benzeri hedef"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_schema():
+    types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+    return pa.schema([(column, types[kind]) for column, kind in EXPORT_COLUMNS.items()])
+
+
+def stream_csv(frames):
+    yield ','.join(EXPORT_COLUMNS) + '\n'
+    for chunk in _chunks(frames):
+        yield chunk.to_csv(index=False, header=False)
+
+
+def stream_json(frames):
+    yield '['
+    first = True
+    for chunk in _chunks(frames):
+        body = chunk.to_json(orient='records')[1:-1]
+        if body:
+            yield ('' if first else ',') + body
+            first = False
+    yield ']'
+
+
+def _stream_arrow(frames, open_writer):
+    sink = _ChunkSink()
+    schema = _arrow_schema()
+    writer = open_writer(sink, schema)
+    for chunk in _chunks(frames):
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def stream_parquet(frames):
+    return _stream_arrow(frames, lambda sink, schema: pq.ParquetWriter(sink, schema))
+
+
+def stream_arrow_ipc(frames):
+    return _stream_arrow(frames, lambda sink, schema: pa.ipc.new_stream(sink, schema))
+
+
+def stream_export(frames, fmt):
+    """frames: DataFrame üreteci; formatı desteklenmiyorsa ValueError"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError('Invalid format')
+    if fmt in ('parquet', 'arrow') and pa is None:
+        raise ValueError(f'{fmt} export requires pyarrow')
+    writers = {
+        'csv': stream_csv,
+        'json': stream_json,
+        'parquet': stream_parquet,
+        'arrow': stream_arrow_ipc
+    }
+    return writers[fmt](frames)
@@ -0,0 +1,52 @@
+"""Koşu başına gecikme histogramlarının (LatencyHist kolonu) birleştirilmesi.
+
+Kodlama aggregator.py'deki OnlineAggregator.encode_histogram ile aynıdır:
+'kova:adet,kova:adet'. Kova i, (MIN * 2^((i-1)/B), MIN * 2^(i/B)] aralığını
+tutar. Histogramlar kova kova toplanarak herhangi bir filtre kombinasyonu için
+koşu ortalamalarının değil, mesaj gecikmelerinin gerçek yüzdelikleri hesaplanır.
+Kovalar yazımda results_db.rollup_histogram tablosunda konfigürasyon başına toplanır
+(metin results_db/aggregator.decode_histogram ile ayrıştırılır).
+"""
+import numpy as np
+import pandas as pd
+
+# aggregator.py ile aynı
+BUCKETS_PER_OCTAVE = 16
+MIN_LATENCY_MS = 0.01
+HISTOGRAM_BUCKETS = 27 * BUCKETS_PER_OCTAVE + 1
+
+PERCENTILES = {'p50': 50, 'p90': 90, 'p99': 99, 'p999': 99.9}
+
+BUCKET_UPPER = MIN_LATENCY_MS * 2 ** (np.arange(HISTOGRAM_BUCKETS) / BUCKETS_PER_OCTAVE)
+
+
+def histogram_vectors(buckets):
+    """(Protocol, Bucket, Count) satırlarından protokol başına HISTOGRAM_BUCKETS uzunluğunda sayım vektörü"""
+    vectors = {}
+    for proto, group in buckets.groupby('Protocol', observed=True):
+        counts = np.zeros(HISTOGRAM_BUCKETS, dtype=np.int64)
+        valid = group[(group['Bucket'] >= 0) & (group['Bucket'] < HISTOGRAM_BUCKETS)]
+        np.add.at(counts, valid['Bucket'].to_numpy(dtype=np.int64), valid['Count'].to_numpy(dtype=np.int64))
+        vectors[proto] = counts
+    return vectors
+
+
+def summarize(counts, max_value=None):
+    """Birleşik histogramdan mesaj sayısı ve p50/p90/p99/p99.9/max"""
+    total = int(counts.sum())
+    if total == 0:
+        return {'messages': 0, **{name: None for name in PERCENTILES}, 'max': None}
+
+    cumulative = np.cumsum(counts)
+    summary = {'messages': total}
+    for name, q in PERCENTILES.items():
+        rank = max(1, int(np.ceil(q / 100.0 * total)))
+        value = float(BUCKET_UPPER[np.searchsorted(cumulative, rank)])
+        if max_value is not None and not pd.isna(max_value):
+            value = min(value, float(max_value))
+        summary[name] = round(value, 2)
+
+    if max_value is None or pd.isna(max_value):
+        max_value = BUCKET_UPPER[np.flatnonzero(counts)[-1]]
+    summary['max'] = round(float(max_value), 2)
+    return summary
@@ -0,0 +1,145 @@
+"""Veri endpoint'leri için sürüm tabanlı ETag, koşullu GET, sıkıştırma ve LRU önbellek.
+
+Sonuç sürümü (yazılan satır sayısı + son Timestamp) değişmedikçe aynı istek
+yeniden hesaplanmaz: If-None-Match eşleşirse 304 döner, eşleşmezse gövde
+(endpoint, normalize edilmiş argümanlar, sürüm) anahtarıyla önbellekten gelir.
+Tarayıcı fetch() istekleri ETag'i kendiliğinden yeniden doğrular (Cache-Control: no-cache).
+Akıtılan (streamed) yanıtlar belleğe alınmaz: yalnızca ETag/304 uygulanır, gzip
+parça parça sıkıştırılır.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # br kodlaması için opsiyonel
+    brotli = None
+
+# Bu boyutun altındaki gövdeler sıkıştırılmaz (bayt)
+MIN_COMPRESS_SIZE = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Bundan büyük gövdeler önbelleğe alınmaz (ör. sayfasız filtered-data)
+MAX_CACHED_BODY = 8 * 1024 * 1024
+
+ENCODERS = {'gzip': lambda body: gzip.compress(body, GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def gzip_chunks(chunks):
+    """Akıtılan gövdeyi parça parça gzip'le (tek gzip üyesi, gövde bellekte tutulmaz)"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def negotiate_encoding(body_size):
+    """İstemcinin kabul ettiği en iyi kodlama (br > gzip); küçük gövdelerde None"""
+    if body_size < MIN_COMPRESS_SIZE:
+        return None
+    for encoding in ('br', 'gzip'):
+        if encoding in ENCODERS and request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class _Entry:
+    """Önbelleğe alınmış yanıt: ham gövde ve istendikçe üretilen sıkıştırılmış halleri"""
+
+    def __init__(self, body, mimetype):
+        self.mimetype = mimetype
+        self.bodies = {None: body}
+
+    def body(self, encoding):
+        if encoding not in self.bodies:
+            self.bodies[encoding] = ENCODERS[encoding](self.bodies[None])
+        return self.bodies[encoding]
+
+
+class ResponseCache:
+    """Sürüme bağlı, sınırlı (LRU) yanıt önbelleği; version_fn sonuç sürümü metnini döner"""
+
+    def __init__(self, version_fn, max_entries=256):
+        self.version_fn = version_fn
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def endpoint(self, view):
+        """Flask view dekoratörü: ETag/304, önbellek ve sıkıştırma (yalnızca 200 yanıtlar önbelleğe girer)"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = self.version_fn()
+            # Aynı argümanların farklı sırası aynı anahtara düşer
+            key = (request.endpoint, tuple(sorted(request.args.items(multi=True))),
+                   tuple(sorted(kwargs.items())), version)
+            headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+
+            # Sürüm aynıysa hiçbir şey hesaplanmadan 304 (kodlamasız ya da bilinen bir kodlama ekiyle)
+            fresh = {version} | {f'{version}-{encoding}' for encoding in ENCODERS}
+            for etag in request.if_none_match.as_set():
+                if etag in fresh:
+                    response = Response(status=304, headers=headers)
+                    response.set_etag(etag)
+                    return response
+
+            entry = self._get(key)
+            if entry is None:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                if response.is_streamed:
+                    return self._stream(response, version, headers)
+                entry = _Entry(response.get_data(), response.mimetype)
+                if len(entry.bodies[None]) <= MAX_CACHED_BODY:
+                    self._put(key, entry)
+
+            encoding = negotiate_encoding(len(entry.bodies[None]))
+            response = Response(entry.body(encoding), mimetype=entry.mimetype, headers=headers)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            # Güçlü ETag temsil başına tekil olmalı: kodlama etikete eklenir
+            response.set_etag(f'{version}-{encoding}' if encoding else version)
+            return response
+        return wrapper
+
+    @staticmethod
+    def _stream(response, version, headers):
+        """Akıtılan yanıt: önbelleğe alınmaz; istemci kabul ediyorsa gzip parça parça uygulanır"""
+        response.headers.update(headers)
+        if request.accept_encodings['gzip']:
+            response.response = gzip_chunks(response.response)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Length', None)
+            response.set_etag(f'{version}-gzip')
+        else:
+            response.set_etag(version)
+        return response
@@ -0,0 +1,278 @@
+"""Dashboard için süreç genelinde paylaşılan sonuç deposu (SQLite, results_db.py)"""
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import results_db  # noqa: E402
+
+# Veritabanındaki sonuç kolonları (sıralı)
+RESULT_COLUMNS = list(results_db.COLUMNS)
+
+# Satır başına özet ortalamaları
+SUMMARY_COLUMNS = ['DeliveryRatio', 'LatencyAvg_ms', 'Throughput_bps']
+
+CATEGORY_COLUMNS = ['Bandwidth', 'Loss', 'Delay', 'Status']
+
+# Filtre parametresi -> (kolon, değer dönüşümü); geçersiz değerde ValueError
+FILTERS = {
+    'protocol': ('Protocol', str),
+    'bandwidth': ('Bandwidth', str),
+    'loss': ('Loss', str),
+    'delay': ('ConfigDelay_ms', int),
+    'size': ('Size', int),
+    'payload_size': ('Size', int),
+    'rate': ('Rate', int)
+}
+
+
+# Tahmin satırının konfigürasyonu sonradan ölçüldü mü (sweep_plan.fit_and_store ile aynı tanım: SUCCESS ya da
+# Status'suz eski satır); eski bir --plan taramasının tahminleri tam taramadan sonra ölçümlerle karışmasın
+UNMEASURED_PREDICTION = (
+    "NOT EXISTS (SELECT 1 FROM results r WHERE r.Protocol = predictions.Protocol AND r.Size = predictions.Size "
+    "AND r.Rate = predictions.Rate AND r.Bandwidth = predictions.Bandwidth AND r.Loss = predictions.Loss "
+    "AND r.ConfigDelay_ms = predictions.ConfigDelay_ms AND (r.Status IS NULL OR r.Status = 'SUCCESS'))"
+)
+
+
+def where_clause(filters):
+    """Filtre sözlüğünden (SQL WHERE, parametreler); boş değerler yok sayılır"""
+    conditions, params = [], []
+    for key, value in (filters or {}).items():
+        if value in (None, '') or key not in FILTERS:
+            continue
+        column, convert = FILTERS[key]
+        conditions.append(f'{column} = ?')
+        params.append(convert(value))
+    return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+
+class ResultsStore:
+    """Sonuç veritabanı üzerinde indeksli sorgular.
+
+    Orkestratör aynı veritabanına WAL modunda yazar; okuyucular yazıcıyı
+    beklemez. Değişiklikler `PRAGMA data_version` ile algılanır; tam tablo
+    (combined) ve protokol sayıları yalnızca veri değiştiğinde yeniden okunur.
+
+    Dönen DataFrame'ler endpoint'ler arasında paylaşılabilir; çağıranlar
+    yerinde değişiklik yapmamalı (filtre/assign ile yeni frame üretmeli).
+    """
+
+    def __init__(self, db_path, protocols):
+        self.db_path = db_path
+        self.protocols = list(protocols)
+        self._lock = threading.Lock()
+        self._pool = []  # boşta bekleyen okuma bağlantıları
+        self._version_conn = None
+        self._data_version = None
+        self._generation = 0  # veritabanı değiştikçe artar
+        self._counts = None  # ((generation, None), {proto: satır sayısı})
+        self._combined = None  # ((generation, kolonlar), DataFrame)
+        self._etag = None  # ((generation, None), sürüm metni)
+
+    @contextmanager
+    def _connection(self):
+        with self._lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = results_db.connect(self.db_path, check_same_thread=False)
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                self._pool.append(conn)
+
+    def _read(self, sql, params=()):
+        with self._connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def _typed(self, df):
+        """Kategorik kolonlar ve protokol sırası (groupby çıktıları PROTOCOLS sırasında)"""
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        if 'Protocol' in df.columns:
+            df['Protocol'] = pd.Categorical(df['Protocol'], categories=self.protocols)
+        return df
+
+    def version(self):
+        """Sonuçlar değiştikçe artan sayaç"""
+        with self._lock:
+            if self._version_conn is None:
+                self._version_conn = results_db.connect(self.db_path, check_same_thread=False)
+            data_version = self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._generation += 1
+            return self._generation
+
+    def _cached(self, attr, build, key=None):
+        """version() ve key değişmedikçe build() sonucunu sakla"""
+        generation = self.version()
+        with self._lock:
+            cached = getattr(self, attr)
+            if cached is not None and cached[0] == (generation, key):
+                return cached[1]
+        # Arada değişiklik olursa bir sonraki çağrıda yeniden kurulur
+        value = build()
+        with self._lock:
+            setattr(self, attr, ((generation, key), value))
+        return value
+
+    def etag(self):
+        """HTTP ETag'i olarak sonuç sürümü: yazılan satır sayısı, son Timestamp ve (varsa) son tahmin
+        ve kapasite yoklaması"""
+        def build():
+            row = self._read('SELECT MAX(id) AS n, MAX(Timestamp) AS ts, '
+                             '(SELECT MAX(FittedAt) FROM predictions) AS fitted, '
+                             '(SELECT MAX(id) FROM capacity_probes) AS probes FROM results').iloc[0]
+            rows = int(row['n']) if pd.notna(row['n']) else 0
+            version = f"{rows}-{float(row['ts']) if pd.notna(row['ts']) else 0.0!r}"
+            if pd.notna(row['fitted']):
+                version += f"-p{float(row['fitted'])!r}"
+            return f"{version}-c{int(row['probes'])}" if pd.notna(row['probes']) else version
+        return self._cached('_etag', build)
+
+    def counts(self):
+        """Protokol başına satır sayıları (konfigürasyon indeksinden)"""
+        def build():
+            rows = self._read('SELECT Protocol, COUNT(*) AS n FROM results GROUP BY Protocol')
+            return dict(zip(rows['Protocol'], rows['n'].astype(int)))
+        return self._cached('_counts', build)
+
+    def count(self, proto):
+        return self.counts().get(proto, 0)
+
+    def total(self):
+        return sum(self.counts().values())
+
+    def tail(self, proto, n):
+        """Protokolün son n satırı (ekleme sırasıyla); satır yoksa None"""
+        df = self._read(f'SELECT {", ".join(RESULT_COLUMNS)} FROM '
+                        f'(SELECT * FROM results WHERE Protocol = ? ORDER BY id DESC LIMIT ?) ORDER BY id',
+                        (proto, n))
+        return df if len(df) else None
+
+    def summary(self, proto):
+        """Özet kolonların ortalamaları ve satır sayısı"""
+        averages = ', '.join(f'AVG({col}) AS {col}' for col in SUMMARY_COLUMNS)
+        row = self._read(f'SELECT COUNT(*) AS n, {averages} FROM results WHERE Protocol = ?', (proto,)).iloc[0]
+        if not row['n']:
+            return None
+        means = {col: float(row[col]) if pd.notna(row[col]) else float('nan') for col in SUMMARY_COLUMNS}
+        return means, int(row['n'])
+
+    def query(self, filters=None, columns=None, after=None, offset=0, limit=None):
+        """Filtreye uyan satırlar, (Timestamp, id) sıralı: (toplam satır, DataFrame).
+        after=(timestamp, id) verilirse bu anahtardan sonraki satırlar (keyset sayfalama imleci;
+        aynı Timestamp'i paylaşan satırlar sayfa sınırında atlanmaz)."""
+        where, params = where_clause(filters)
+        if after is not None:
+            where += (' AND ' if where else ' WHERE ') + '(Timestamp, id) > (?, ?)'
+            params += [float(after[0]), int(after[1])]
+        total = int(self._read(f'SELECT COUNT(*) AS n FROM results{where}', params)['n'].iloc[0])
+
+        columns = list(columns or RESULT_COLUMNS)
+        page = f' LIMIT {max(int(limit), 0)} OFFSET {max(int(offset), 0)}' if limit is not None else \
+            (f' LIMIT -1 OFFSET {int(offset)}' if offset else '')
+        df = self._read(f'SELECT {", ".join(columns)} FROM results{where} ORDER BY Timestamp, id{page}', params)
+        return total, self._typed(df)
+
+    def rollup(self, by, filters=None):
+        """Yazımda güncellenen rollup tablolarından gruplanmış istatistikler.
+
+        by ve filtre kolonlarını kapsayan en küçük rollup tablosu okunur; dönen
+        DataFrame'de by kolonları, 'count' (satır sayısı) ve her ROLLUP_METRICS
+        metriği için <metrik>_mean/_std/_min/_max bulunur (NULL değerler hariç).
+        """
+        where, params = where_clause(filters)
+        dims = set(by) | {FILTERS[key][0] for key, value in (filters or {}).items()
+                          if value not in (None, '') and key in FILTERS}
+        table = results_db.rollup_table(dims)
+        if table is None:
+            raise ValueError(f'no rollup covers {sorted(dims)}')
+
+        sums = ['SUM(rows) AS count']
+        for m in results_db.ROLLUP_METRICS:
+            sums += [f'SUM({stat}_{m}) AS {stat}_{m}' for stat in ('n', 'sum', 'sumsq')]
+            sums += [f'{stat.upper()}({stat}_{m}) AS {stat}_{m}' for stat in ('min', 'max')]
+        df = self._read(f'SELECT {", ".join(list(by) + sums)} FROM {table}{where} GROUP BY {", ".join(by)}', params)
+
+        result = df[list(by) + ['count']].copy()
+        for m in results_db.ROLLUP_METRICS:
+            n, total, squares = df[f'n_{m}'], df[f'sum_{m}'], df[f'sumsq_{m}']
+            result[f'{m}_mean'] = (total / n).where(n > 0)
+            variance = ((squares - total * total / n) / (n - 1)).where(n > 1)
+            result[f'{m}_std'] = variance.clip(lower=0) ** 0.5
+            result[f'{m}_min'] = df[f'min_{m}']
+            result[f'{m}_max'] = df[f'max_{m}']
+        result = self._typed(result)
+        return result.sort_values(list(by), ignore_index=True) if len(result) else result
+
+    def latency_histograms(self, filters=None):
+        """Filtreye uyan koşuların birleşik gecikme histogramları ve en yüksek LatencyMax_ms (yazımda
+        güncellenen rollup_histogram/rollup_latency_max): (Protocol, Bucket, Count) ve (Protocol, max)"""
+        where, params = where_clause(filters)
+        buckets = self._read(f'SELECT Protocol, Bucket, SUM(Count) AS Count FROM rollup_histogram{where} '
+                             f'GROUP BY Protocol, Bucket', params)
+        maxima = self._read(f'SELECT Protocol, MAX(LatencyMax_ms) AS max FROM rollup_latency_max{where} '
+                            f'GROUP BY Protocol', params)
+        return self._typed(buckets), maxima
+
+    def predictions(self, by, filters=None):
+        """sweep_plan tahminleri (ölçülmemiş konfigürasyonlar) by kolonlarına göre: 'count' (konfigürasyon
+        sayısı) ve her PREDICTED_METRICS metriği için tahmin ile %95 aralık sınırlarının ortalamaları.
+        Sonradan ölçülmüş konfigürasyonların tahminleri dahil edilmez."""
+        where, params = where_clause(filters)
+        where += (' AND ' if where else ' WHERE ') + UNMEASURED_PREDICTION
+        means = [f'AVG({m}{suffix}) AS {m}{suffix}'
+                 for m in results_db.PREDICTED_METRICS for suffix in ('', '_lower', '_upper')]
+        df = self._read(f'SELECT {", ".join(list(by) + ["COUNT(*) AS count"] + means)} FROM predictions{where} '
+                        f'GROUP BY {", ".join(by)}', params)
+        df = self._typed(df)
+        return df.sort_values(list(by), ignore_index=True) if len(df) else df
+
+    def prediction_rows(self, filters=None):
+        """Ölçülmemiş konfigürasyonların tahmin satırları ve etki tahminleri: (predictions, effects) DataFrame'leri"""
+        where, params = where_clause(filters)
+        where += (' AND ' if where else ' WHERE ') + UNMEASURED_PREDICTION
+        predictions = self._read(f'SELECT * FROM predictions{where} ORDER BY Protocol, Size, Rate, Bandwidth, '
+                                 f'Loss, ConfigDelay_ms', params)
+        protocol = (filters or {}).get('protocol')
+        effects = self._read('SELECT * FROM effects' + (' WHERE Protocol = ?' if protocol else '')
+                             + ' ORDER BY Protocol, Metric, ABS(Effect) DESC', (protocol,) if protocol else ())
+        return predictions, effects
+
+    def capacity(self, filters=None, probes=True):
+        """Kapasite araması sonuçları ve bu aramaların yoklamaları: (capacity, probes) DataFrame'leri;
+        probes=False ise yoklamalar None"""
+        where, params = where_clause(filters)
+        capacity = self._read(f'SELECT * FROM capacity{where} ORDER BY Protocol, Size, Bandwidth, Loss, '
+                              f'ConfigDelay_ms', params)
+        capacity['CapacityRate'] = capacity['CapacityRate'].astype('Int64')  # BELOW_MIN satırlarında NULL
+        if not probes:
+            return self._typed(capacity), None
+        trace = self._read(f'SELECT * FROM capacity_probes WHERE SearchId IN (SELECT SearchId FROM capacity{where}) '
+                           f'ORDER BY SearchId, Probe', params)
+        return self._typed(capacity), self._typed(trace)
+
+    def combined(self, columns=None):
+        """Tüm protokollerin tek ve tipli tablosu (Protocol + columns; varsayılan tüm kolonlar);
+        aynı kolonlar için değişiklik olmadıkça önbellekten döner"""
+        columns = tuple(dict.fromkeys(['Protocol'] + list(columns or RESULT_COLUMNS)))
+
+        def build():
+            df = self._read(f'SELECT {", ".join(columns)} FROM results ORDER BY Timestamp, id')
+            return self._typed(df)
+        return self._cached('_combined', build, columns)
+
+    def items(self):
+        """Satırı olan protokoller için (proto, df) çiftleri"""
+        for proto in self.protocols:
+            if self.count(proto):
+                df = self._read(f'SELECT {", ".join(RESULT_COLUMNS)} FROM results WHERE Protocol = ? ORDER BY id',
+                                (proto,))
+                yield proto, df
@@ -0,0 +1,134 @@
+"""Konteyner başına kalıcı kabuk oturumları.
+
+Her komut için ayrı bir host kabuğu + `docker exec` süreci başlatmak yerine,
+her konteynerde tek bir `docker exec -i <konteyner> sh` oturumu açık tutulur ve
+komutlar bu oturumun stdin'ine yazılır. Komut sonu, stdout ve stderr'e basılan
+benzersiz bir işaretçi satırıyla (çıkış koduyla birlikte) tespit edilir.
+"""
+import queue
+import shlex
+import subprocess
+import threading
+import uuid
+
+
+class ContainerSession:
+    """Tek bir konteynere açık tutulan `sh` oturumu (thread-safe, komutlar sırayla çalışır)"""
+
+    def __init__(self, container):
+        self.container = container
+        self._lock = threading.Lock()
+        self._proc = None
+        self._stdout = None
+        self._stderr = None
+
+    def _reader(self, stream, lines):
+        for line in iter(stream.readline, ''):
+            lines.put(line)
+        lines.put(None)  # EOF
+
+    def _ensure_started(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        self._proc = subprocess.Popen(
+            ["docker", "exec", "-i", self.container, "sh"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, bufsize=1
+        )
+        self._stdout = queue.Queue()
+        self._stderr = queue.Queue()
+        for stream, lines in ((self._proc.stdout, self._stdout), (self._proc.stderr, self._stderr)):
+            threading.Thread(target=self._reader, args=(stream, lines), daemon=True).start()
+
+    def _collect(self, lines, marker, deadline_timeout):
+        """İşaretçi satırına kadar olan çıktıyı topla; (çıktı, işaretçi satırı) döner"""
+        output = []
+        while True:
+            line = lines.get(timeout=deadline_timeout)
+            if line is None:
+                raise EOFError(f"session to {self.container} closed")
+            if line.startswith(marker):
+                return ''.join(output), line
+            output.append(line)
+
+    def run(self, command, check=True, timeout=None):
+        """Komutu oturumda çalıştır; run_command ile aynı sözleşme (strip edilmiş stdout)"""
+        marker = f"__BENCH_DONE_{uuid.uuid4().hex}"
+        # Komutun stdin'i oturumun stdin'i olmasın (sonraki komutları yutmasın)
+        script = (f"{{ {command}\n}} </dev/null\n"
+                  f"printf '\\n{marker} %s\\n' \"$?\"\n"
+                  f"printf '\\n{marker}\\n' >&2\n")
+
+        with self._lock:
+            self._ensure_started()
+            try:
+                self._proc.stdin.write(script)
+                self._proc.stdin.flush()
+                stdout, marker_line = self._collect(self._stdout, marker, timeout)
+                stderr, _ = self._collect(self._stderr, marker, timeout)
+            except queue.Empty:
+                self._close_locked()
+                raise subprocess.TimeoutExpired(command, timeout)
+            except (OSError, EOFError) as e:
+                self._close_locked()
+                raise subprocess.CalledProcessError(-1, command, stderr=str(e))
+
+        returncode = int(marker_line.split()[1])
+        if returncode != 0:
+            print(f"Error executing: [{self.container}] {command}\n{stderr.strip()}")
+            if check:
+                raise subprocess.CalledProcessError(returncode, command, output=stdout, stderr=stderr)
+            return None
+        return stdout.strip()
+
+    def run_detached(self, command):
+        """Komutu arka planda başlat (docker exec -d karşılığı)"""
+        return self.run(f"nohup sh -c {shlex.quote(command)} >/dev/null 2>&1 &")
+
+    def _close_locked(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        self._proc = None
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+
+class SessionPool:
+    """Konteyner adına göre oturumları paylaşan havuz"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def get(self, container):
+        with self._lock:
+            session = self._sessions.get(container)
+            if session is None:
+                session = self._sessions[container] = ContainerSession(container)
+            return session
+
+    def close(self, container):
+        with self._lock:
+            session = self._sessions.pop(container, None)
+        if session is not None:
+            session.close()
+
+    def close_all(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+
+# Süreç genelinde paylaşılan havuz
+sessions = SessionPool()
@@ -0,0 +1,207 @@
+package com.lpwan.bench;
+
+import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.PrintWriter;
+import java.net.InetAddress;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+
+/**
+ * Uzun ömürlü benchmark ajanı: konteyner başına tek JVM.
+ *
+ * Her test için yeni JVM başlatmak yerine (JVM açılışı, sınıf yükleme, JIT ısınması,
+ * broker'a yeniden bağlanma) ajan bir kez başlatılır ve 127.0.0.1:port üzerindeki
+ * kontrol soketinden komut alır. Her bağlantı tek satırlık bir komut taşır, yanıt
+ * tek satırdır ("OK ..." veya "ERR ..."):
+ *
+ *   ping
+ *   subscribe <protocol> <host> [extra]
+ *       Aboneyi bir kez başlatır; bağlantısı koşular arasında açık kalır.
+ *   start <runId>
+ *       Abone tamponunu boşaltır ve ölçüm penceresini açar.
+ *   run <runId> <warmup> <protocol> <host> <size> <rate> <duration> [extra]
+ *       Önce warmup adet ısınma mesajı (negatif seq, ölçüme girmez), sonra ölçülen
+ *       mesajları gönderir. Yanıt: OK sent=<n>
+ *   stream <runId>
+ *       "OK" sonrası bağlantı açık kalır; ölçüme giren her mesaj geldiği anda
+ *       "seq,latency" satırı olarak yazılır, koşu toplanınca "END" ile kapanır.
+ *   collect <runId>
+ *       Koşunun sonuçlarını runs/<runId>.csv'ye yazar. Yanıt: OK received=<n> path=<csv>
+ */
+public class Agent {
+    public static final int DEFAULT_PORT = 7070;
+    private static final String RUNS_DIR = "runs";
+
+    private static String subscriberSpec = null;
+    private static String subscriberProtocol = null;
+    private static String activeRun = null;
+
+    public static void run(int port) throws IOException {
+        new File(RUNS_DIR).mkdirs();
+        try (ServerSocket server = new ServerSocket(port, 50, InetAddress.getLoopbackAddress())) {
+            System.out.println("BENCHMARK_AGENT_READY " + port);
+            while (true) {
+                Socket socket = server.accept();
+                Thread handler = new Thread(() -> handle(socket));
+                handler.setDaemon(true);
+                handler.start();
+            }
+        }
+    }
+
+    private static void handle(Socket socket) {
+        try (Socket s = socket;
+                BufferedReader in = new BufferedReader(
+                        new InputStreamReader(s.getInputStream(), StandardCharsets.UTF_8));
+                PrintWriter out = new PrintWriter(
+                        new OutputStreamWriter(s.getOutputStream(), StandardCharsets.UTF_8), true)) {
+            String line = in.readLine();
+            if (line == null || line.trim().isEmpty())
+                return;
+
+            String[] cmd = line.trim().split("\\s+");
+            if (cmd[0].equals("stream")) {
+                stream(Arrays.copyOfRange(cmd, 1, cmd.length), out);
+                return;
+            }
+
+            String reply;
+            try {
+                reply = execute(cmd);
+            } catch (Exception e) {
+                e.printStackTrace();
+                reply = "ERR " + e.getClass().getSimpleName() + ": " + e.getMessage();
+            }
+            out.println(reply.replace('\n', ' '));
+        } catch (IOException | InterruptedException e) {
+            e.printStackTrace();
+        }
+    }
+
+    private static String execute(String[] cmd) throws Exception {
+        String[] args = Arrays.copyOfRange(cmd, 1, cmd.length);
+        switch (cmd[0]) {
+            case "ping":
+                return "OK";
+            case "subscribe":
+                return subscribe(args);
+            case "start":
+                return start(args);
+            case "run":
+                return produce(args);
+            case "collect":
+                return collect(args);
+            default:
+                return "ERR unknown command: " + cmd[0];
+        }
+    }
+
+    private static synchronized String subscribe(String[] args) {
+        if (args.length < 2)
+            return "ERR usage: subscribe <protocol> <host> [extra]";
+
+        String spec = String.join(" ", args);
+        if (subscriberSpec != null) {
+            // Abone sınıfları statik durum tutar; aynı JVM'de başka bir abone açılamaz
+            return spec.equals(subscriberSpec) ? "OK" : "ERR subscriber already running: " + subscriberSpec;
+        }
+
+        String protocol = args[0];
+        String host = args[1];
+        String extra = (args.length > 2) ? args[2] : "";
+        Thread subscriber = new Thread(() -> Main.runSubscriber(protocol, host, extra), "subscriber");
+        subscriber.setDaemon(true);
+        subscriber.start();
+
+        subscriberSpec = spec;
+        subscriberProtocol = protocol;
+        return "OK";
+    }
+
+    private static synchronized String start(String[] args) {
+        if (args.length < 1)
+            return "ERR usage: start <runId>";
+        if (subscriberProtocol == null)
+            return "ERR no subscriber";
+
+        Main.resetResults(subscriberProtocol);
+        Payload.startRun();
+        activeRun = checkRunId(args[0]);
+        return "OK";
+    }
+
+    // Üretici koşusu uzun sürer; diğer komutları bloklamasın diye senkronize değil
+    private static String produce(String[] args) {
+        if (args.length < 7)
+            return "ERR usage: run <runId> <warmup> <protocol> <host> <size> <rate> <duration> [extra]";
+
+        String runId = checkRunId(args[0]);
+        int warmup = Integer.parseInt(args[1]);
+        String protocol = args[2];
+        String host = args[3];
+        int size = Integer.parseInt(args[4]);
+        double rate = Double.parseDouble(args[5]);
+        int duration = Integer.parseInt(args[6]);
+        String extra = (args.length > 7) ? args[7] : "";
+
+        System.out.println("Run " + runId + ": " + protocol + " size=" + size + " rate=" + rate
+                + " duration=" + duration + " warmup=" + warmup);
+        int sent = Main.runProducer(protocol, host, size, rate, duration, extra, warmup);
+        return "OK sent=" + sent;
+    }
+
+    private static synchronized String collect(String[] args) {
+        if (args.length < 1)
+            return "ERR usage: collect <runId>";
+        String runId = checkRunId(args[0]);
+        if (!runId.equals(activeRun))
+            return "ERR run not active: " + runId;
+
+        String path = new File(RUNS_DIR, runId + ".csv").getAbsolutePath();
+        int received = Main.saveResults(subscriberProtocol, path);
+        activeRun = null;
+        Agent.class.notifyAll(); // açık akışlar END ile kapanır
+        return "OK received=" + received + " path=" + path;
+    }
+
+    private static void stream(String[] args, PrintWriter out) throws InterruptedException {
+        if (args.length < 1) {
+            out.println("ERR usage: stream <runId>");
+            return;
+        }
+        String runId = checkRunId(args[0]);
+        synchronized (Agent.class) {
+            if (!runId.equals(activeRun)) {
+                out.println("ERR run not active: " + runId);
+                return;
+            }
+            out.println("OK");
+            SampleStream.attach(out);
+        }
+        try {
+            synchronized (Agent.class) {
+                while (runId.equals(activeRun) && !out.checkError()) {
+                    Agent.class.wait(1000);
+                }
+            }
+        } finally {
+            SampleStream.detach(out);
+        }
+        out.println("END");
+    }
+
+    private static String checkRunId(String runId) {
+        if (!runId.matches("[A-Za-z0-9_.-]+"))
+            throw new IllegalArgumentException("invalid run id: " + runId);
+        return runId;
+    }
+}
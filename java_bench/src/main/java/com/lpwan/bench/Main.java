@@ -20,8 +20,19 @@ import com.lpwan.bench.zenoh.ZenohSubscriber;
 
 public class Main {
     public static void main(String[] args) {
+        if (args.length >= 1 && args[0].equals("agent")) {
+            int port = (args.length > 1) ? Integer.parseInt(args[1]) : Agent.DEFAULT_PORT;
+            try {
+                Agent.run(port);
+            } catch (Exception e) {
+                e.printStackTrace();
+            }
+            return;
+        }
+
         if (args.length < 2) {
             System.out.println("Usage: java -jar bench.jar <mode> <protocol> [args...]");
+            System.out.println("       java -jar bench.jar agent [port]");
             return;
         }
 
@@ -37,75 +48,108 @@ public class Main {
             int duration = (args.length > 5) ? Integer.parseInt(args[5]) : 10;
             String extra = (args.length > 6) ? args[6] : "";
 
-            if (protocol.startsWith("mqtt")) {
-                int qos = 0;
-                if (extra.equals("1"))
-                    qos = 1;
-                if (extra.equals("2"))
-                    qos = 2;
-                MQTTProducer.run(host, size, rate, duration, qos);
-            } else if (protocol.startsWith("amqp")) {
-                int qos = 0;
-                if (extra.equals("1"))
-                    qos = 1;
-                AMQPProducer.run(host, size, rate, duration, qos);
-            } else if (protocol.startsWith("coap")) {
-                boolean confirmable = extra.equals("con");
-                CoAPProducer.run(host, size, rate, duration, confirmable);
-            } else if (protocol.equals("http")) {
-                HTTPProducer.run(host, size, rate, duration);
-            } else if (protocol.startsWith("zenoh")) {
-                String reliability = "best_effort";
-                if (extra.equals("reliable"))
-                    reliability = "reliable";
-                ZenohProducer.run(host, size, rate, duration, reliability);
-            } else if (protocol.equals("xmpp")) {
-                XMPPProducer.run(host, size, rate, duration, extra);
-            }
+            runProducer(protocol, host, size, rate, duration, extra, 0);
 
         } else if (mode.equals("subscriber")) {
             String extra = (args.length > 3) ? args[3] : "";
 
             // Shutdown hook for saving results
-            final Thread mainThread = Thread.currentThread();
             Runtime.getRuntime().addShutdownHook(new Thread() {
                 public void run() {
-                    if (protocol.startsWith("mqtt"))
-                        MQTTSubscriber.saveResults();
-                    else if (protocol.startsWith("amqp"))
-                        AMQPSubscriber.saveResults();
-                    else if (protocol.startsWith("coap"))
-                        CoAPSubscriber.saveResults();
-                    else if (protocol.equals("http"))
-                        HTTPSubscriber.saveResults();
-                    else if (protocol.equals("xmpp"))
-                        XMPPSubscriber.saveResults();
-                    else if (protocol.startsWith("zenoh"))
-                        ZenohSubscriber.saveResults();
+                    saveResults(protocol, "results.csv");
                 }
             });
 
-            if (protocol.startsWith("mqtt")) {
-                int qos = 0;
-                if (extra.equals("1"))
-                    qos = 1;
-                if (extra.equals("2"))
-                    qos = 2;
-                MQTTSubscriber.run(host, qos);
-            } else if (protocol.startsWith("amqp")) {
-                int qos = 0;
-                if (extra.equals("1"))
-                    qos = 1;
-                AMQPSubscriber.run(host, qos);
-            } else if (protocol.startsWith("coap")) {
-                CoAPSubscriber.run();
-            } else if (protocol.equals("http")) {
-                HTTPSubscriber.run();
-            } else if (protocol.equals("xmpp")) {
-                XMPPSubscriber.run(host, extra);
-            } else if (protocol.startsWith("zenoh")) {
-                ZenohSubscriber.run();
-            }
+            runSubscriber(protocol, host, extra);
+        }
+    }
+
+    /** Üreticiyi çalıştır; gönderilen (ölçülen) mesaj sayısını döndürür */
+    public static int runProducer(String protocol, String host, int size, double rate, int duration,
+            String extra, int warmup) {
+        if (protocol.startsWith("mqtt")) {
+            int qos = 0;
+            if (extra.equals("1"))
+                qos = 1;
+            if (extra.equals("2"))
+                qos = 2;
+            return MQTTProducer.run(host, size, rate, duration, qos, warmup);
+        } else if (protocol.startsWith("amqp")) {
+            int qos = 0;
+            if (extra.equals("1"))
+                qos = 1;
+            return AMQPProducer.run(host, size, rate, duration, qos, warmup);
+        } else if (protocol.startsWith("coap")) {
+            boolean confirmable = extra.equals("con");
+            return CoAPProducer.run(host, size, rate, duration, confirmable, warmup);
+        } else if (protocol.equals("http")) {
+            return HTTPProducer.run(host, size, rate, duration, warmup);
+        } else if (protocol.startsWith("zenoh")) {
+            String reliability = "best_effort";
+            if (extra.equals("reliable"))
+                reliability = "reliable";
+            return ZenohProducer.run(host, size, rate, duration, reliability, warmup);
+        } else if (protocol.equals("xmpp")) {
+            return XMPPProducer.run(host, size, rate, duration, extra, warmup);
+        }
+        throw new IllegalArgumentException("Unknown protocol: " + protocol);
+    }
+
+    /** Aboneyi çalıştır (bloklar) */
+    public static void runSubscriber(String protocol, String host, String extra) {
+        if (protocol.startsWith("mqtt")) {
+            int qos = 0;
+            if (extra.equals("1"))
+                qos = 1;
+            if (extra.equals("2"))
+                qos = 2;
+            MQTTSubscriber.run(host, qos);
+        } else if (protocol.startsWith("amqp")) {
+            int qos = 0;
+            if (extra.equals("1"))
+                qos = 1;
+            AMQPSubscriber.run(host, qos);
+        } else if (protocol.startsWith("coap")) {
+            CoAPSubscriber.run();
+        } else if (protocol.equals("http")) {
+            HTTPSubscriber.run();
+        } else if (protocol.equals("xmpp")) {
+            XMPPSubscriber.run(host, extra);
+        } else if (protocol.startsWith("zenoh")) {
+            ZenohSubscriber.run();
         }
     }
+
+    /** Abone tamponunu boşalt (ajan modunda koşu başı) */
+    public static void resetResults(String protocol) {
+        if (protocol.startsWith("mqtt"))
+            MQTTSubscriber.reset();
+        else if (protocol.startsWith("amqp"))
+            AMQPSubscriber.reset();
+        else if (protocol.startsWith("coap"))
+            CoAPSubscriber.reset();
+        else if (protocol.equals("http"))
+            HTTPSubscriber.reset();
+        else if (protocol.equals("xmpp"))
+            XMPPSubscriber.reset();
+        else if (protocol.startsWith("zenoh"))
+            ZenohSubscriber.reset();
+    }
+
+    /** Abone sonuçlarını CSV'ye yaz; yazılan satır sayısını döndürür */
+    public static int saveResults(String protocol, String path) {
+        if (protocol.startsWith("mqtt"))
+            return MQTTSubscriber.saveResults(path);
+        else if (protocol.startsWith("amqp"))
+            return AMQPSubscriber.saveResults(path);
+        else if (protocol.startsWith("coap"))
+            return CoAPSubscriber.saveResults(path);
+        else if (protocol.equals("http"))
+            return HTTPSubscriber.saveResults(path);
+        else if (protocol.equals("xmpp"))
+            return XMPPSubscriber.saveResults(path);
+        else if (protocol.startsWith("zenoh"))
+            return ZenohSubscriber.saveResults(path);
+        return 0;
+    }
 }
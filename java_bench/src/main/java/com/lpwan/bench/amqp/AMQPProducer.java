@@ -7,7 +7,7 @@ import com.rabbitmq.client.ConnectionFactory;
 import com.rabbitmq.client.MessageProperties;
 
 public class AMQPProducer {
-    public static void run(String host, int size, double rate, int duration, int qos) {
+    public static int run(String host, int size, double rate, int duration, int qos, int warmup) {
         try {
             ConnectionFactory factory = new ConnectionFactory();
             factory.setHost(host);
@@ -31,7 +31,7 @@ public class AMQPProducer {
                 int count = (int) (rate * duration);
                 long intervalNs = (long) ((1.0 / rate) * 1_000_000_000.0);
 
-                for (int i = 0; i < count; i++) {
+                for (int i = -warmup; i < count; i++) {
                     long start = System.nanoTime();
 
                     byte[] payload = Payload.generate(i, size);
@@ -63,10 +63,12 @@ public class AMQPProducer {
                 }
                 Thread.sleep(5000);
                 System.out.println("BENCHMARK_SENT_COUNT: " + count);
+                return count;
             }
 
         } catch (Exception e) {
             e.printStackTrace();
         }
+        return 0;
     }
 }
@@ -1,6 +1,7 @@
 package com.lpwan.bench.amqp;
 
 import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
 import com.rabbitmq.client.Channel;
 import com.rabbitmq.client.Connection;
 import com.rabbitmq.client.ConnectionFactory;
@@ -29,16 +30,19 @@ public class AMQPSubscriber {
 
             DeliverCallback deliverCallback = (consumerTag, delivery) -> {
                 Payload.ParsedPayload p = Payload.parse(delivery.getBody());
-                if (p != null) {
+                if (Payload.accept(p)) {
                     synchronized (results) {
                         results.add(p);
                     }
+                    SampleStream.publish(p);
                 }
             };
 
             channel.basicConsume("test_queue", true, deliverCallback, consumerTag -> {
             });
 
+            System.out.println("BENCHMARK_SUBSCRIBER_READY");
+
             // Wait indefinitely
             synchronized (AMQPSubscriber.class) {
                 AMQPSubscriber.class.wait();
@@ -51,16 +55,29 @@ public class AMQPSubscriber {
         }
     }
 
+    // Ajan modunda her koşudan önce tampon boşaltılır
+    public static void reset() {
+        synchronized (results) {
+            results.clear();
+        }
+    }
+
     public static void saveResults() {
-        try (FileWriter writer = new FileWriter("results.csv")) {
-            writer.write("timestamp,sequence,latency\n");
-            synchronized (results) {
+        saveResults("results.csv");
+    }
+
+    public static int saveResults(String path) {
+        synchronized (results) {
+            try (FileWriter writer = new FileWriter(path)) {
+                writer.write("timestamp,sequence,latency\n");
                 for (Payload.ParsedPayload p : results) {
                     writer.write(p.timestamp + "," + p.seq + "," + p.latencyMs + "\n");
                 }
+            } catch (IOException e) {
+                e.printStackTrace();
+                return 0;
             }
-        } catch (IOException e) {
-            e.printStackTrace();
+            return results.size();
         }
     }
 }
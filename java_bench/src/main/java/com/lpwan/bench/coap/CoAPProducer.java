@@ -6,7 +6,7 @@ import org.eclipse.californium.core.CoapResponse;
 import org.eclipse.californium.core.coap.MediaTypeRegistry;
 
 public class CoAPProducer {
-    public static void run(String host, int size, double rate, int duration, boolean confirmable) {
+    public static int run(String host, int size, double rate, int duration, boolean confirmable, int warmup) {
         try {
             String uri = "coap://" + host + ":5683/data";
             CoapClient client = new CoapClient(uri);
@@ -22,7 +22,7 @@ public class CoAPProducer {
             int count = (int) (rate * duration);
             long intervalNs = (long) ((1.0 / rate) * 1_000_000_000.0);
 
-            for (int i = 0; i < count; i++) {
+            for (int i = -warmup; i < count; i++) {
                 long start = System.nanoTime();
 
                 byte[] payload = Payload.generate(i, size);
@@ -53,9 +53,11 @@ public class CoAPProducer {
             Thread.sleep(5000);
             System.out.println("BENCHMARK_SENT_COUNT: " + count);
             client.shutdown();
+            return count;
 
         } catch (Exception e) {
             e.printStackTrace();
         }
+        return 0;
     }
 }
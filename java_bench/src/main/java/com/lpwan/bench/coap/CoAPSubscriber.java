@@ -1,6 +1,7 @@
 package com.lpwan.bench.coap;
 
 import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
 import org.eclipse.californium.core.CoapResource;
 import org.eclipse.californium.core.CoapServer;
 import org.eclipse.californium.core.server.resources.CoapExchange;
@@ -20,6 +21,8 @@ public class CoAPSubscriber {
             server.start();
             System.out.println("CoAP Subscriber Started");
 
+            System.out.println("BENCHMARK_SUBSCRIBER_READY");
+
             // Wait indefinitely
             synchronized (CoAPSubscriber.class) {
                 CoAPSubscriber.class.wait();
@@ -41,25 +44,39 @@ public class CoAPSubscriber {
         public void handlePOST(CoapExchange exchange) {
             byte[] payload = exchange.getRequestPayload();
             Payload.ParsedPayload p = Payload.parse(payload);
-            if (p != null) {
+            if (Payload.accept(p)) {
                 synchronized (results) {
                     results.add(p);
                 }
+                SampleStream.publish(p);
             }
             exchange.respond("OK");
         }
     }
 
+    // Ajan modunda her koşudan önce tampon boşaltılır
+    public static void reset() {
+        synchronized (results) {
+            results.clear();
+        }
+    }
+
     public static void saveResults() {
-        try (FileWriter writer = new FileWriter("results.csv")) {
-            writer.write("timestamp,sequence,latency\n");
-            synchronized (results) {
+        saveResults("results.csv");
+    }
+
+    public static int saveResults(String path) {
+        synchronized (results) {
+            try (FileWriter writer = new FileWriter(path)) {
+                writer.write("timestamp,sequence,latency\n");
                 for (Payload.ParsedPayload p : results) {
                     writer.write(p.timestamp + "," + p.seq + "," + p.latencyMs + "\n");
                 }
+            } catch (IOException e) {
+                e.printStackTrace();
+                return 0;
             }
-        } catch (IOException e) {
-            e.printStackTrace();
+            return results.size();
         }
     }
 }
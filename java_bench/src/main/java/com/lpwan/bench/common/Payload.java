@@ -4,6 +4,9 @@ import java.nio.ByteBuffer;
 import java.util.Random;
 
 public class Payload {
+
+    // Ölçüm penceresinin başlangıcı (ajan modunda her koşuda yenilenir)
+    private static volatile double runStart = 0.0;
     
     public static byte[] generate(long seq, int size) {
         if (size < 16) size = 16;
@@ -37,6 +40,19 @@ public class Payload {
         return new ParsedPayload(seq, timestamp, latencyMs);
     }
     
+    /** Ajan modu: yeni koşunun ölçüm penceresini aç */
+    public static void startRun() {
+        runStart = System.currentTimeMillis() / 1000.0;
+    }
+
+    /**
+     * Ölçüme girecek mesaj mı? Isınma mesajları negatif seq taşır; pencere
+     * açılmadan önce gönderilmiş (önceki koşudan geciken) mesajlar da sayılmaz.
+     */
+    public static boolean accept(ParsedPayload p) {
+        return p != null && p.seq >= 0 && p.timestamp >= runStart;
+    }
+
     public static class ParsedPayload {
         public long seq;
         public double timestamp;
@@ -0,0 +1,27 @@
+package com.lpwan.bench.common;
+
+import java.io.PrintWriter;
+import java.util.List;
+import java.util.concurrent.CopyOnWriteArrayList;
+
+/**
+ * Abonenin ölçüme giren mesajlarını geldikleri anda bağlı akışlara yazar
+ * ("seq,latency" satırları). Ajan modunda orkestratör bu akışı dinler.
+ */
+public class SampleStream {
+    private static final List<PrintWriter> sinks = new CopyOnWriteArrayList<>();
+
+    public static void attach(PrintWriter sink) {
+        sinks.add(sink);
+    }
+
+    public static void detach(PrintWriter sink) {
+        sinks.remove(sink);
+    }
+
+    public static void publish(Payload.ParsedPayload p) {
+        for (PrintWriter sink : sinks) {
+            sink.println(p.seq + "," + p.latencyMs);
+        }
+    }
+}
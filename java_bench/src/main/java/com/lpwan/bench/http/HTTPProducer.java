@@ -10,7 +10,7 @@ import org.apache.hc.core5.http.io.entity.ByteArrayEntity;
 import org.apache.hc.core5.util.Timeout;
 
 public class HTTPProducer {
-    public static void run(String host, int size, double rate, int duration) {
+    public static int run(String host, int size, double rate, int duration, int warmup) {
         // Configure timeouts: 10s connection, 30s request
         RequestConfig config = RequestConfig.custom()
                 .setConnectTimeout(Timeout.ofSeconds(10))
@@ -26,7 +26,7 @@ public class HTTPProducer {
             int count = (int) (rate * duration);
             long intervalNs = (long) ((1.0 / rate) * 1_000_000_000.0);
 
-            for (int i = 0; i < count; i++) {
+            for (int i = -warmup; i < count; i++) {
                 long start = System.nanoTime();
 
                 byte[] payload = Payload.generate(i, size);
@@ -49,9 +49,11 @@ public class HTTPProducer {
             System.out.println("Waiting for pending messages...");
             Thread.sleep(5000);
             System.out.println("BENCHMARK_SENT_COUNT: " + count);
+            return count;
 
         } catch (Exception e) {
             e.printStackTrace();
         }
+        return 0;
     }
 }
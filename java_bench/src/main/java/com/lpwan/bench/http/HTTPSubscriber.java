@@ -1,6 +1,7 @@
 package com.lpwan.bench.http;
 
 import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
 import com.sun.net.httpserver.HttpExchange;
 import com.sun.net.httpserver.HttpHandler;
 import com.sun.net.httpserver.HttpServer;
@@ -24,6 +25,8 @@ public class HTTPSubscriber {
             server.start();
             System.out.println("HTTP Subscriber Started on port 8000");
 
+            System.out.println("BENCHMARK_SUBSCRIBER_READY");
+
             // Wait indefinitely
             synchronized (HTTPSubscriber.class) {
                 HTTPSubscriber.class.wait();
@@ -44,10 +47,11 @@ public class HTTPSubscriber {
                 byte[] payload = is.readAllBytes();
 
                 Payload.ParsedPayload p = Payload.parse(payload);
-                if (p != null) {
+                if (Payload.accept(p)) {
                     synchronized (results) {
                         results.add(p);
                     }
+                    SampleStream.publish(p);
                 }
 
                 String response = "OK";
@@ -61,16 +65,29 @@ public class HTTPSubscriber {
         }
     }
 
+    // Ajan modunda her koşudan önce tampon boşaltılır
+    public static void reset() {
+        synchronized (results) {
+            results.clear();
+        }
+    }
+
     public static void saveResults() {
-        try (FileWriter writer = new FileWriter("results.csv")) {
-            writer.write("timestamp,sequence,latency\n");
-            synchronized (results) {
+        saveResults("results.csv");
+    }
+
+    public static int saveResults(String path) {
+        synchronized (results) {
+            try (FileWriter writer = new FileWriter(path)) {
+                writer.write("timestamp,sequence,latency\n");
                 for (Payload.ParsedPayload p : results) {
                     writer.write(p.timestamp + "," + p.seq + "," + p.latencyMs + "\n");
                 }
+            } catch (IOException e) {
+                e.printStackTrace();
+                return 0;
             }
-        } catch (IOException e) {
-            e.printStackTrace();
+            return results.size();
         }
     }
 }
@@ -7,7 +7,7 @@ import org.eclipse.paho.client.mqttv3.MqttMessage;
 import org.eclipse.paho.client.mqttv3.persist.MemoryPersistence;
 
 public class MQTTProducer {
-    public static void run(String host, int size, double rate, int duration, int qos) {
+    public static int run(String host, int size, double rate, int duration, int qos, int warmup) {
         try {
             String broker = "tcp://" + host + ":1883";
             String clientId = "JavaMQTTProducer";
@@ -27,7 +27,7 @@ public class MQTTProducer {
             int count = (int) (rate * duration);
             long intervalNs = (long) ((1.0 / rate) * 1_000_000_000.0);
 
-            for (int i = 0; i < count; i++) {
+            for (int i = -warmup; i < count; i++) {
                 long start = System.nanoTime();
 
                 byte[] payload = Payload.generate(i, size);
@@ -57,9 +57,11 @@ public class MQTTProducer {
 
             client.disconnect();
             System.out.println("Disconnected");
+            return count;
 
         } catch (Exception e) {
             e.printStackTrace();
         }
+        return 0;
     }
 }
@@ -1,6 +1,7 @@
 package com.lpwan.bench.mqtt;
 
 import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
 import org.eclipse.paho.client.mqttv3.IMqttDeliveryToken;
 import org.eclipse.paho.client.mqttv3.MqttCallback;
 import org.eclipse.paho.client.mqttv3.MqttClient;
@@ -34,10 +35,11 @@ public class MQTTSubscriber {
 
                 public void messageArrived(String topic, MqttMessage message) throws Exception {
                     Payload.ParsedPayload p = Payload.parse(message.getPayload());
-                    if (p != null) {
+                    if (Payload.accept(p)) {
                         synchronized (results) {
                             results.add(p);
                         }
+                        SampleStream.publish(p);
                     }
                 }
 
@@ -50,6 +52,8 @@ public class MQTTSubscriber {
             client.subscribe("test/topic", qos);
             System.out.println("Subscribed");
 
+            System.out.println("BENCHMARK_SUBSCRIBER_READY");
+
             // Wait for termination signal (Main loop handles this via Thread.join or
             // similar)
             // For now, we just wait indefinitely until killed or interrupted
@@ -64,16 +68,29 @@ public class MQTTSubscriber {
         }
     }
 
+    // Ajan modunda her koşudan önce tampon boşaltılır
+    public static void reset() {
+        synchronized (results) {
+            results.clear();
+        }
+    }
+
     public static void saveResults() {
-        try (FileWriter writer = new FileWriter("results.csv")) {
-            writer.write("timestamp,sequence,latency\n");
-            synchronized (results) {
+        saveResults("results.csv");
+    }
+
+    public static int saveResults(String path) {
+        synchronized (results) {
+            try (FileWriter writer = new FileWriter(path)) {
+                writer.write("timestamp,sequence,latency\n");
                 for (Payload.ParsedPayload p : results) {
                     writer.write(p.timestamp + "," + p.seq + "," + p.latencyMs + "\n");
                 }
+            } catch (IOException e) {
+                e.printStackTrace();
+                return 0;
             }
-        } catch (IOException e) {
-            e.printStackTrace();
+            return results.size();
         }
     }
 }
@@ -13,7 +13,7 @@ import org.jxmpp.jid.impl.JidCreate;
 import java.util.Base64;
 
 public class XMPPProducer {
-    public static void run(String host, int size, double rate, int duration, String qos) {
+    public static int run(String host, int size, double rate, int duration, String qos, int warmup) {
         try {
             int qosLevel = Integer.parseInt(qos);
 
@@ -39,7 +39,7 @@ public class XMPPProducer {
             int count = (int) (rate * duration);
             long intervalNs = (long) ((1.0 / rate) * 1_000_000_000.0);
 
-            for (int i = 0; i < count; i++) {
+            for (int i = -warmup; i < count; i++) {
                 long start = System.nanoTime();
 
                 byte[] payload = Payload.generate(i, size);
@@ -69,9 +69,11 @@ public class XMPPProducer {
             System.out.println("Waiting for pending messages...");
             Thread.sleep(5000);
             connection.disconnect();
+            return count;
 
         } catch (Exception e) {
             e.printStackTrace();
         }
+        return 0;
     }
 }
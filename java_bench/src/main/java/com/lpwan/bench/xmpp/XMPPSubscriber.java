@@ -1,6 +1,7 @@
 package com.lpwan.bench.xmpp;
 
 import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
 import org.jivesoftware.smack.AbstractXMPPConnection;
 import org.jivesoftware.smack.ConnectionConfiguration;
 import org.jivesoftware.smack.chat2.Chat;
@@ -45,10 +46,11 @@ public class XMPPSubscriber {
                         try {
                             byte[] payload = Base64.getDecoder().decode(body);
                             Payload.ParsedPayload p = Payload.parse(payload);
-                            if (p != null) {
+                            if (Payload.accept(p)) {
                                 synchronized (results) {
                                     results.add(p);
                                 }
+                                SampleStream.publish(p);
                             }
                         } catch (Exception e) {
                             // Ignore malformed
@@ -59,6 +61,8 @@ public class XMPPSubscriber {
 
             System.out.println("XMPP Subscriber Started (QoS " + qosLevel + ")");
 
+            System.out.println("BENCHMARK_SUBSCRIBER_READY");
+
             // Wait indefinitely
             synchronized (XMPPSubscriber.class) {
                 XMPPSubscriber.class.wait();
@@ -71,16 +75,29 @@ public class XMPPSubscriber {
         }
     }
 
+    // Ajan modunda her koşudan önce tampon boşaltılır
+    public static void reset() {
+        synchronized (results) {
+            results.clear();
+        }
+    }
+
     public static void saveResults() {
-        try (FileWriter writer = new FileWriter("results.csv")) {
-            writer.write("timestamp,sequence,latency\n");
-            synchronized (results) {
+        saveResults("results.csv");
+    }
+
+    public static int saveResults(String path) {
+        synchronized (results) {
+            try (FileWriter writer = new FileWriter(path)) {
+                writer.write("timestamp,sequence,latency\n");
                 for (Payload.ParsedPayload p : results) {
                     writer.write(p.timestamp + "," + p.seq + "," + p.latencyMs + "\n");
                 }
+            } catch (IOException e) {
+                e.printStackTrace();
+                return 0;
             }
-        } catch (IOException e) {
-            e.printStackTrace();
+            return results.size();
         }
     }
 }
@@ -8,7 +8,7 @@ import io.zenoh.keyexpr.KeyExpr;
 import io.zenoh.bytes.ZBytes;
 
 public class ZenohProducer {
-    public static void run(String host, int size, double rate, int duration, String reliability) {
+    public static int run(String host, int size, double rate, int duration, String reliability, int warmup) {
         try {
             System.out.println("Zenoh Producer Started");
 
@@ -21,6 +21,12 @@ public class ZenohProducer {
             // Declare key expression
             KeyExpr keyExpr = KeyExpr.tryFrom("lpwan/bench/data");
 
+            // Isınma: negatif seq'li mesajlar abonede ölçüme alınmaz
+            for (long i = -warmup; i < 0; i++) {
+                session.put(keyExpr, ZBytes.from(Payload.generate(i, size)));
+                Thread.sleep((long) (1000.0 / rate));
+            }
+
             long startTime = System.currentTimeMillis();
             long endTime = startTime + (duration * 1000L);
             long count = 0;
@@ -48,9 +54,11 @@ public class ZenohProducer {
             Thread.sleep(2000);
 
             session.close();
+            return (int) count;
 
         } catch (Exception e) {
             e.printStackTrace();
         }
+        return 0;
     }
 }
@@ -1,6 +1,7 @@
 package com.lpwan.bench.zenoh;
 
 import com.lpwan.bench.common.Payload;
+import com.lpwan.bench.common.SampleStream;
 import io.zenoh.Config;
 import io.zenoh.Session;
 import io.zenoh.Zenoh;
@@ -32,10 +33,11 @@ public class ZenohSubscriber {
                 try {
                     byte[] data = sample.getPayload().toBytes();
                     Payload.ParsedPayload parsed = Payload.parse(data);
-                    if (parsed != null) {
+                    if (Payload.accept(parsed)) {
                         synchronized (results) {
                             results.add(parsed);
                         }
+                        SampleStream.publish(parsed);
                     }
                 } catch (Exception e) {
                     e.printStackTrace();
@@ -44,6 +46,8 @@ public class ZenohSubscriber {
 
             System.out.println("Listening for messages on: lpwan/bench/data");
 
+            System.out.println("BENCHMARK_SUBSCRIBER_READY");
+
             // Wait indefinitely
             synchronized (ZenohSubscriber.class) {
                 ZenohSubscriber.class.wait();
@@ -54,17 +58,30 @@ public class ZenohSubscriber {
         }
     }
 
+    // Ajan modunda her koşudan önce tampon boşaltılır
+    public static void reset() {
+        synchronized (results) {
+            results.clear();
+        }
+    }
+
     public static void saveResults() {
-        try (FileWriter writer = new FileWriter("results.csv")) {
-            writer.write("timestamp,sequence,latency\n");
-            synchronized (results) {
+        saveResults("results.csv");
+    }
+
+    public static int saveResults(String path) {
+        synchronized (results) {
+            try (FileWriter writer = new FileWriter(path)) {
+                writer.write("timestamp,sequence,latency\n");
                 for (Payload.ParsedPayload p : results) {
                     writer.write(p.timestamp + "," + p.seq + "," + p.latencyMs + "\n");
                 }
+                System.out.println("Saved " + results.size() + " Zenoh results");
+            } catch (IOException e) {
+                e.printStackTrace();
+                return 0;
             }
-            System.out.println("Saved " + results.size() + " Zenoh results");
-        } catch (IOException e) {
-            e.printStackTrace();
+            return results.size();
         }
     }
 }
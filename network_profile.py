@@ -0,0 +1,126 @@
+"""Konteynerlere ağ profili (netem gecikme/kayıp + tbf bant genişliği) uygulayıcı.
+
+İlk kurulumda kök qdisc silinip netem/tbf eklenir; sonraki testlerde mevcut
+qdisc'ler `tc qdisc change` ile yerinde değiştirilir. Her profil tek bir
+`tc -batch` çağrısıyla gönderilir, iki konteyner paralel ayarlanır ve aktif
+qdisc geri okunarak doğrulanır.
+"""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEVICE = "eth0"
+TBF_OPTIONS = "burst 32kbit latency 400ms"
+
+_UNIT_BITS = {"bit": 1, "kbit": 1e3, "mbit": 1e6, "gbit": 1e9}
+_UNIT_MS = {"us": 1e-3, "ms": 1.0, "s": 1000.0}
+
+
+class NetworkSetupError(Exception):
+    """Profil uygulanamadı ya da doğrulanamadı"""
+
+
+def parse_rate(value):
+    """'100kbit', '1Mbit' -> bit/s"""
+    match = re.fullmatch(r"([\d.]+)([a-zA-Z]+)", value.strip())
+    if not match or match.group(2).lower() not in _UNIT_BITS:
+        raise ValueError(f"Unknown rate: {value}")
+    return float(match.group(1)) * _UNIT_BITS[match.group(2).lower()]
+
+
+def parse_delay(value):
+    """'20ms', '0.5s' -> ms"""
+    match = re.fullmatch(r"([\d.]+)(us|ms|s)", value.strip())
+    if not match:
+        raise ValueError(f"Unknown delay: {value}")
+    return float(match.group(1)) * _UNIT_MS[match.group(2)]
+
+
+def parse_loss(value):
+    """'5%' -> 5.0"""
+    return float(value.strip().rstrip("%"))
+
+
+def profile_commands(bw, loss, delay, verb):
+    """tc -batch satırları (verb: add veya change)"""
+    return [
+        f"qdisc {verb} dev {DEVICE} root handle 1: netem delay {delay} loss {loss}",
+        f"qdisc {verb} dev {DEVICE} parent 1: handle 2: tbf rate {bw} {TBF_OPTIONS}"
+    ]
+
+
+def verify_profile(qdisc_output, bw, loss, delay):
+    """`tc qdisc show` çıktısı istenen profille uyuşmuyorsa NetworkSetupError"""
+    netem = re.search(r"qdisc netem 1: root.*", qdisc_output)
+    tbf = re.search(r"qdisc tbf 2: parent 1:.*", qdisc_output)
+    if not netem or not tbf:
+        raise NetworkSetupError(f"netem/tbf qdisc missing: {qdisc_output!r}")
+
+    # tc sıfır gecikme/kaybı hiç yazdırmaz
+    delay_match = re.search(r"delay ([\d.]+(?:us|ms|s))", netem.group(0))
+    loss_match = re.search(r"loss ([\d.]+)%", netem.group(0))
+    rate_match = re.search(r"rate ([\d.]+[a-zA-Z]+)", tbf.group(0))
+
+    actual_delay = parse_delay(delay_match.group(1)) if delay_match else 0.0
+    actual_loss = float(loss_match.group(1)) if loss_match else 0.0
+    actual_rate = parse_rate(rate_match.group(1)) if rate_match else 0.0
+
+    if (abs(actual_delay - parse_delay(delay)) > 0.5
+            or abs(actual_loss - parse_loss(loss)) > 0.01
+            or abs(actual_rate - parse_rate(bw)) > 0.01 * parse_rate(bw)):
+        raise NetworkSetupError(
+            f"active profile delay={actual_delay}ms loss={actual_loss}% rate={actual_rate}bit/s "
+            f"does not match {delay}/{loss}/{bw}")
+
+
+class NetworkProfileApplier:
+    """Bir compose yığınının konteynerlerine profil uygular; hangi konteynerin kurulduğunu hatırlar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._installed = set()
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+    def _apply_one(self, shell, bw, loss, delay):
+        with self._lock:
+            installed = shell.container in self._installed
+
+        if installed:
+            batch = "\n".join(profile_commands(bw, loss, delay, "change"))
+            script = f"tc -batch - <<'EOF'\n{batch}\nEOF"
+        else:
+            batch = "\n".join(profile_commands(bw, loss, delay, "add"))
+            script = f"tc qdisc del dev {DEVICE} root 2>/dev/null\ntc -batch - <<'EOF'\n{batch}\nEOF"
+
+        try:
+            if shell.run(script, check=False) is None:
+                if not installed:
+                    raise NetworkSetupError(f"tc batch failed on {shell.container}")
+                # change başarısızsa (ör. qdisc dışarıdan silindi) sıfırdan kur
+                with self._lock:
+                    self._installed.discard(shell.container)
+                return self._apply_one(shell, bw, loss, delay)
+
+            verify_profile(shell.run(f"tc qdisc show dev {DEVICE}") or "", bw, loss, delay)
+        except Exception:
+            with self._lock:
+                self._installed.discard(shell.container)
+            raise
+
+        with self._lock:
+            self._installed.add(shell.container)
+
+    def apply(self, shells, bw, loss, delay):
+        """Profili tüm konteynerlere paralel uygula; herhangi biri başarısızsa NetworkSetupError"""
+        futures = [self._executor.submit(self._apply_one, shell, bw, loss, delay) for shell in shells]
+        errors = []
+        for shell, future in zip(shells, futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{shell.container}: {e}")
+        if errors:
+            raise NetworkSetupError("; ".join(errors))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,49 @@
+"""Sabit bekleme süreleri yerine hazırlık kontrolleri (port, log işaretçisi, süreç/dosya durumu)"""
+import shlex
+import time
+
+POLL_INTERVAL = 0.2
+
+
+class ReadinessTimeout(Exception):
+    """Beklenen durum zaman aşımı içinde oluşmadı"""
+
+
+def wait_until(check, timeout, description, interval=POLL_INTERVAL):
+    """check() True dönene kadar bekle; geçen süreyi döndür, zaman aşımında ReadinessTimeout"""
+    start = time.monotonic()
+    last_error = None
+    while True:
+        try:
+            if check():
+                return time.monotonic() - start
+        except Exception as e:  # konteyner henüz hazır değilken exec de başarısız olabilir
+            last_error = e
+        elapsed = time.monotonic() - start
+        if elapsed >= timeout:
+            detail = f" (last error: {last_error})" if last_error else ""
+            raise ReadinessTimeout(f"{description} not ready after {elapsed:.1f}s{detail}")
+        time.sleep(interval)
+
+
+def probe(shell, condition):
+    """Kabuk koşulu konteynerde doğruysa True (başarısız koşul hata olarak loglanmaz)"""
+    return shell.run(f"if {condition}; then echo yes; else echo no; fi") == "yes"
+
+
+def port_listening(shell, port, transport="tcp"):
+    flag = "u" if transport == "udp" else "t"
+    return probe(shell, f"netstat -ln{flag} 2>/dev/null | grep -q ':{port} '")
+
+
+def file_contains(shell, path, text):
+    return probe(shell, f"grep -q {shlex.quote(text)} {shlex.quote(path)} 2>/dev/null")
+
+
+def process_running(shell, pattern):
+    return probe(shell, f"pgrep -f {shlex.quote(pattern)} >/dev/null")
+
+
+def file_tail(shell, path, lines=20):
+    """Hata raporu için dosyanın son satırları"""
+    return shell.run(f"tail -n {lines} {shlex.quote(path)} 2>/dev/null", check=False) or ""
@@ -0,0 +1,67 @@
+"""Uyarlamalı tekrar için koşu başına metriklerin güven aralıkları (--adaptive).
+
+Bir konfigürasyon aynı yığında tekrar tekrar koşulur; her tekrarın teslim oranı
+ve ortalama gecikmesi birer örnektir. Ortalamaların %95 t-güven aralıkları hedef
+genişliğin altına inince (ya da tekrar sayısı/zaman bütçesi dolunca) durulur;
+böylece süre, gürültülü hücrelere (ör. rate=1, yüksek kayıp) harcanır.
+"""
+import math
+
+# İki yönlü %95 t-dağılımı kritik değerleri (serbestlik derecesi -> t); aradaki df için
+# küçük olan (daha geniş aralık) kullanılır, 30'un üstünde normal yaklaşım
+T_975 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+         10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042}
+Z_975 = 1.960
+
+
+def t_critical(df):
+    if df > max(T_975):
+        return Z_975
+    return T_975[max(key for key in T_975 if key <= df)]
+
+
+def mean_ci(values):
+    """(ortalama, alt, üst); tek örnekte aralık yok (None, None)"""
+    n = len(values)
+    if n == 0:
+        return None, None, None
+    mean = sum(values) / n
+    if n < 2:
+        return mean, None, None
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+    half = t_critical(n - 1) * std / math.sqrt(n)
+    return mean, mean - half, mean + half
+
+
+class RepetitionStats:
+    """Bir konfigürasyonun tekrarları: teslim oranı (%) ve ortalama gecikme (ms) örnekleri"""
+
+    def __init__(self):
+        self.delivery = []
+        self.latency = []  # yalnızca mesaj alınan tekrarlar
+
+    @property
+    def count(self):
+        return len(self.delivery)
+
+    def add(self, delivery_ratio, latency_ms=None):
+        self.delivery.append(delivery_ratio)
+        if latency_ms is not None:
+            self.latency.append(latency_ms)
+
+    def delivery_ci(self):
+        return mean_ci(self.delivery)[1:]
+
+    def latency_ci(self):
+        return mean_ci(self.latency)[1:]
+
+    def converged(self, delivery_width, latency_width):
+        """Teslim oranı aralığı delivery_width (yüzde puanı) ve gecikme aralığı ortalamanın
+        latency_width katı genişliğin altında mı; hiç mesaj alınmadıysa yalnızca teslim oranı"""
+        low, high = self.delivery_ci()
+        if low is None or high - low > delivery_width:
+            return False
+        if not self.latency:
+            return True
+        mean, low, high = mean_ci(self.latency)
+        return low is not None and high - low <= latency_width * abs(mean)
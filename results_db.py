@@ -0,0 +1,409 @@
+"""Tek dosyalı SQLite (WAL) sonuç veritabanı.
+
+Orkestratör satırları tek bir bağlantı üzerinden eklerken dashboard ayrı
+bağlantılarla okur; WAL modunda okuyucular yazıcıyı beklemez. Şema sürümü
+`PRAGMA user_version` ile tutulur, eksik göçler (MIGRATIONS) açılışta sırayla
+uygulanır. Konfigürasyon ve Timestamp indeksleri sayesinde dashboard filtreleri
+tam tarama yerine indeksli sorgulardır. Özet ortalamalar için ROLLUPS tabloları
+her INSERT'te bir tetikleyiciyle güncellenir. Gecikme histogramları (LatencyHist)
+konfigürasyon ve kova başına rollup_histogram tablosunda toplanır; metin SQL'de
+ayrıştırılamadığından bu tablo satırla aynı işlemde insert_rows tarafından güncellenir.
+
+Eski per-protokol CSV'ler bir kez içe aktarılır:
+    python results_db.py import results/*.csv results_bak/*.csv
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from aggregator import decode_histogram
+
+DB_PATH = "results/results.db"
+
+# Sonuç satırı kolonları (run_experiments.build_result_row sırası) ve SQLite tipleri; v1 şeması
+BASE_COLUMNS = {
+    "Protocol": "TEXT NOT NULL",
+    "Size": "INTEGER",
+    "Rate": "INTEGER",
+    "Bandwidth": "TEXT",
+    "Loss": "TEXT",
+    "Delay": "TEXT",
+    "ConfigDelay_ms": "INTEGER",
+    "DeliveryRatio": "REAL",
+    "LatencyAvg_ms": "REAL",
+    "Jitter_ms": "REAL",
+    "LatencyP50_ms": "REAL",
+    "LatencyP90_ms": "REAL",
+    "LatencyP99_ms": "REAL",
+    "LatencyP999_ms": "REAL",
+    "LatencyMax_ms": "REAL",
+    "LatencyHist": "TEXT",
+    "Throughput_bps": "REAL",
+    "ReceivedCount": "INTEGER",
+    "ExpectedCount": "INTEGER",
+    "Status": "TEXT",
+    "Timestamp": "REAL",
+    "RunId": "TEXT",
+}
+
+# v4: uyarlamalı tekrar (--adaptive) - tekrar sayısı ve teslim oranı/ortalama gecikme %95 güven aralıkları
+REPETITION_COLUMNS = {
+    "Repetitions": "INTEGER",
+    "DeliveryRatio_ci_lower": "REAL",
+    "DeliveryRatio_ci_upper": "REAL",
+    "LatencyAvg_ms_ci_lower": "REAL",
+    "LatencyAvg_ms_ci_upper": "REAL",
+}
+
+COLUMNS = {**BASE_COLUMNS, **REPETITION_COLUMNS}
+
+# Yazımda güncellenen özet (rollup) tabloları: tablo -> protokolle birlikte gruplanan boyutlar.
+# Her tablo satırı grup başına satır sayısı ve metrik başına count/sum/sum of squares/min/max
+# tutar; dashboard ortalamaları satırlardan değil bu gruplardan hesaplar.
+ROLLUP_METRICS = ["DeliveryRatio", "LatencyAvg_ms", "Jitter_ms", "Throughput_bps"]
+ROLLUPS = {
+    "rollup_protocol": (),
+    "rollup_size": ("Size",),
+    "rollup_rate": ("Rate",),
+    "rollup_bandwidth": ("Bandwidth",),
+    "rollup_loss": ("Loss",),
+    "rollup_delay": ("ConfigDelay_ms",),
+    # /api/analysis: delay/loss filtresi, Rate'e göre
+    "rollup_rate_loss_delay": ("Rate", "Loss", "ConfigDelay_ms"),
+    # /api/comparison: size/bandwidth/loss/delay filtre kombinasyonları
+    "rollup_size_bandwidth_loss_delay": ("Size", "Bandwidth", "Loss", "ConfigDelay_ms"),
+}
+
+
+def _rollup_schema():
+    """Rollup tabloları, mevcut satırlardan ilk doldurma ve her INSERT'te güncelleyen tetikleyici"""
+    statements, upserts = [], []
+    for table, dims in ROLLUPS.items():
+        keys = ("Protocol",) + dims
+        stats = [f"{stat}_{metric}" for metric in ROLLUP_METRICS for stat in ("n", "sum", "sumsq", "min", "max")]
+        statements.append(
+            f"CREATE TABLE {table} ({', '.join(f'{k} {COLUMNS[k].split()[0]}' for k in keys)}, "
+            f"rows INTEGER NOT NULL, {', '.join(f'{c} INTEGER' if c.startswith('n_') else f'{c} REAL' for c in stats)}, "
+            f"PRIMARY KEY ({', '.join(keys)}));")
+        statements.append(
+            f"INSERT INTO {table} SELECT {', '.join(keys)}, COUNT(*), "
+            + ", ".join(f"COUNT({m}), TOTAL({m}), TOTAL({m} * {m}), MIN({m}), MAX({m})" for m in ROLLUP_METRICS)
+            + f" FROM results GROUP BY {', '.join(keys)};")
+
+        values = [f"NEW.{k}" for k in keys] + ["1"]
+        updates = ["rows = rows + 1"]
+        for m in ROLLUP_METRICS:
+            values += [f"NEW.{m} IS NOT NULL", f"IFNULL(NEW.{m}, 0)", f"IFNULL(NEW.{m} * NEW.{m}, 0)",
+                       f"NEW.{m}", f"NEW.{m}"]
+            updates += [f"{stat}_{m} = {stat}_{m} + excluded.{stat}_{m}" for stat in ("n", "sum", "sumsq")]
+            # Skaler min/max NULL görünce NULL döner; yalnızca iki taraf da NULL ise NULL kalsın
+            updates += [f"{stat}_{m} = {stat}(IFNULL({stat}_{m}, excluded.{stat}_{m}), "
+                        f"IFNULL(excluded.{stat}_{m}, {stat}_{m}))" for stat in ("min", "max")]
+        upserts.append(
+            f"INSERT INTO {table} ({', '.join(keys)}, rows, {', '.join(stats)}) VALUES ({', '.join(values)}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {', '.join(updates)};")
+
+    statements.append(f"CREATE TRIGGER results_rollup AFTER INSERT ON results BEGIN {' '.join(upserts)} END;")
+    return "\n".join(statements)
+
+
+# sweep_plan.py'nin tahmin ettiği metrikler (predictions tablosunda <metrik>, _lower, _upper)
+PREDICTED_METRICS = ["DeliveryRatio", "LatencyAvg_ms", "Throughput_bps"]
+
+# Kapasite araması (capacity_search.py, --capacity): profil başına son sonuç ve her yoklama
+CAPACITY_COLUMNS = {
+    "Protocol": "TEXT NOT NULL",
+    "Size": "INTEGER",
+    "Bandwidth": "TEXT",
+    "Loss": "TEXT",
+    "Delay": "TEXT",
+    "ConfigDelay_ms": "INTEGER",
+    "CapacityRate": "INTEGER",
+    "DeliveryRatio": "REAL",
+    "LatencyP99_ms": "REAL",
+    "Throughput_bps": "REAL",
+    "Probes": "INTEGER",
+    "Status": "TEXT",
+    "SloDelivery": "REAL",
+    "SloP99_ms": "REAL",
+    "SearchId": "TEXT",
+    "Timestamp": "REAL",
+}
+PROBE_COLUMNS = {
+    "SearchId": "TEXT NOT NULL",
+    "Probe": "INTEGER",
+    "Phase": "TEXT",
+    "Protocol": "TEXT NOT NULL",
+    "Size": "INTEGER",
+    "Rate": "INTEGER",
+    "Bandwidth": "TEXT",
+    "Loss": "TEXT",
+    "Delay": "TEXT",
+    "ConfigDelay_ms": "INTEGER",
+    "DeliveryRatio": "REAL",
+    "LatencyP99_ms": "REAL",
+    "Throughput_bps": "REAL",
+    "Passed": "INTEGER",
+    "Reason": "TEXT",
+    "RunId": "TEXT",
+    "Timestamp": "REAL",
+}
+
+# rollup_histogram anahtarı: dashboard filtrelerinin (results_store.FILTERS) tüm kolonları + Bucket
+HISTOGRAM_KEYS = ("Protocol", "Size", "Rate", "Bandwidth", "Loss", "ConfigDelay_ms")
+HISTOGRAM_SQL = (f"INSERT INTO rollup_histogram ({', '.join(HISTOGRAM_KEYS)}, Bucket, Count) "
+                 f"VALUES ({', '.join('?' for _ in HISTOGRAM_KEYS)}, ?, ?) "
+                 f"ON CONFLICT ({', '.join(HISTOGRAM_KEYS)}, Bucket) DO UPDATE SET Count = Count + excluded.Count")
+
+
+def histogram_counts(rows):
+    """Satırların LatencyHist kovaları (anahtar kolonları..., kova) -> adet olarak toplanmış"""
+    counts = Counter()
+    for row in rows:
+        key = tuple(row.get(name) for name in HISTOGRAM_KEYS)
+        for bucket, count in decode_histogram(row.get("LatencyHist")):
+            counts[key + (bucket,)] += count
+    return counts
+
+
+def _histogram_schema(conn):
+    """v6: rollup_histogram (kovalar) ve rollup_latency_max (konfigürasyon başına en yüksek LatencyMax_ms,
+    tetikleyiciyle) tabloları; mevcut satırlardan ilk doldurma (histogram metni Python'da ayrıştırılır)"""
+    keys = ", ".join(HISTOGRAM_KEYS)
+    key_columns = ", ".join(f"{name} {COLUMNS[name].split()[0]}" for name in HISTOGRAM_KEYS)
+    conn.execute(f"""
+    CREATE TABLE rollup_histogram (
+        {key_columns},
+        Bucket INTEGER NOT NULL,
+        Count INTEGER NOT NULL,
+        PRIMARY KEY ({keys}, Bucket)
+    )""")
+    conn.execute(f"CREATE TABLE rollup_latency_max ({key_columns}, LatencyMax_ms REAL, PRIMARY KEY ({keys}))")
+    conn.execute(f"INSERT INTO rollup_latency_max SELECT {keys}, MAX(LatencyMax_ms) FROM results GROUP BY {keys}")
+    conn.execute(
+        f"CREATE TRIGGER results_latency_max AFTER INSERT ON results BEGIN "
+        f"INSERT INTO rollup_latency_max ({keys}, LatencyMax_ms) "
+        f"VALUES ({', '.join(f'NEW.{name}' for name in HISTOGRAM_KEYS)}, NEW.LatencyMax_ms) "
+        f"ON CONFLICT ({keys}) DO UPDATE SET LatencyMax_ms = "
+        f"MAX(IFNULL(LatencyMax_ms, excluded.LatencyMax_ms), IFNULL(excluded.LatencyMax_ms, LatencyMax_ms)); END")
+    cursor = conn.execute(f"SELECT {', '.join(HISTOGRAM_KEYS)}, LatencyHist FROM results "
+                          f"WHERE LatencyHist IS NOT NULL AND LatencyHist != ''")
+    columns = HISTOGRAM_KEYS + ("LatencyHist",)
+    while True:
+        rows = cursor.fetchmany(10000)
+        if not rows:
+            break
+        counts = histogram_counts(dict(zip(columns, row)) for row in rows)
+        conn.executemany(HISTOGRAM_SQL, (key + (count,) for key, count in counts.items()))
+
+
+# Şema göçleri: i. eleman user_version i -> i+1 (SQL metni ya da bağlantı alan fonksiyon)
+MIGRATIONS = [
+    f"""
+    CREATE TABLE results (
+        id INTEGER PRIMARY KEY,
+        {", ".join(f"{name} {sql_type}" for name, sql_type in BASE_COLUMNS.items())}
+    );
+    CREATE INDEX idx_results_config ON results (Protocol, Size, Rate, Bandwidth, Loss, ConfigDelay_ms);
+    CREATE INDEX idx_results_timestamp ON results (Timestamp);
+    CREATE TABLE imported_files (
+        path TEXT PRIMARY KEY,
+        rows INTEGER,
+        imported_at REAL
+    );
+    """,
+    # v2: yazımda güncellenen rollup tabloları (sonuç satırları yalnızca eklenir)
+    _rollup_schema(),
+    # v3: tarama planlayıcının tahminleri (ölçülmemiş konfigürasyonlar) ve etki tahminleri
+    f"""
+    CREATE TABLE predictions (
+        Protocol TEXT NOT NULL,
+        Size INTEGER,
+        Rate INTEGER,
+        Bandwidth TEXT,
+        Loss TEXT,
+        Delay TEXT,
+        ConfigDelay_ms INTEGER,
+        {", ".join(f"{m}{suffix} REAL" for m in PREDICTED_METRICS for suffix in ("", "_lower", "_upper"))},
+        Design TEXT,
+        Model TEXT,
+        MeasuredRows INTEGER,
+        FittedAt REAL,
+        PRIMARY KEY (Protocol, Size, Rate, Bandwidth, Loss, Delay)
+    );
+    CREATE TABLE effects (
+        Protocol TEXT NOT NULL,
+        Metric TEXT NOT NULL,
+        Term TEXT NOT NULL,
+        Level TEXT NOT NULL,
+        Effect REAL,
+        StdErr REAL,
+        FittedAt REAL,
+        PRIMARY KEY (Protocol, Metric, Term, Level)
+    );
+    """,
+    # v4: tekrar kolonları; eski satırlarda NULL (tek koşu)
+    "".join(f"ALTER TABLE results ADD COLUMN {name} {sql_type};" for name, sql_type in REPETITION_COLUMNS.items()),
+    # v5: kapasite araması; capacity profil başına son aramayı tutar, yoklamalar yalnızca eklenir
+    f"""
+    CREATE TABLE capacity (
+        {", ".join(f"{name} {sql_type}" for name, sql_type in CAPACITY_COLUMNS.items())},
+        PRIMARY KEY (Protocol, Size, Bandwidth, Loss, Delay)
+    );
+    CREATE TABLE capacity_probes (
+        id INTEGER PRIMARY KEY,
+        {", ".join(f"{name} {sql_type}" for name, sql_type in PROBE_COLUMNS.items())}
+    );
+    CREATE INDEX idx_capacity_probes_search ON capacity_probes (SearchId, Probe);
+    """,
+    # v6: konfigürasyon başına birleşik gecikme histogramları
+    _histogram_schema,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+INSERT_SQL = (f"INSERT INTO results ({', '.join(COLUMNS)}) "
+              f"VALUES ({', '.join('?' for _ in COLUMNS)})")
+CAPACITY_SQL = (f"INSERT OR REPLACE INTO capacity ({', '.join(CAPACITY_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in CAPACITY_COLUMNS)})")
+PROBE_SQL = (f"INSERT INTO capacity_probes ({', '.join(PROBE_COLUMNS)}) "
+             f"VALUES ({', '.join('?' for _ in PROBE_COLUMNS)})")
+
+
+def rollup_table(dims):
+    """Verilen boyutları (Protocol hariç) kapsayan en küçük rollup tablosu; yoksa None"""
+    dims = set(dims) - {"Protocol"}
+    candidates = [table for table, keys in ROLLUPS.items() if dims <= set(keys)]
+    return min(candidates, key=lambda table: len(ROLLUPS[table])) if candidates else None
+
+
+def connect(path=DB_PATH, check_same_thread=True):
+    """WAL modunda bağlantı aç ve şemayı güncel sürüme getir"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    migrate(conn)
+    return conn
+
+
+def migrate(conn):
+    """Eksik göçleri uygula; veritabanı koddan yeniyse hata ver"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"results database schema v{version} is newer than supported v{SCHEMA_VERSION}")
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        # Göç ve sürüm artışı tek işlemde; başka bir süreç aynı anda göç ettiyse onunki geçerli
+        migration = MIGRATIONS[target - 1]
+        try:
+            if callable(migration):
+                conn.execute("BEGIN IMMEDIATE")
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+                conn.commit()
+            else:
+                conn.executescript(f"BEGIN IMMEDIATE; {migration} PRAGMA user_version = {target}; COMMIT;")
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.rollback()
+            if conn.execute("PRAGMA user_version").fetchone()[0] < target:
+                raise
+
+
+def insert_rows(conn, rows):
+    """Sonuç satırlarını ve histogram kovalarını ekle (çağıranın işlemi içinde)"""
+    rows = list(rows)
+    conn.executemany(INSERT_SQL, (row_values(row) for row in rows))
+    conn.executemany(HISTOGRAM_SQL, (key + (count,) for key, count in histogram_counts(rows).items()))
+
+
+def row_values(row, columns=COLUMNS):
+    """dict satırını INSERT parametrelerine çevir (eksik ve NaN kolonlar NULL)"""
+    values = []
+    for name in columns:
+        value = row.get(name)
+        if isinstance(value, float) and value != value:
+            value = None
+        values.append(value)
+    return values
+
+
+class ResultsWriter:
+    """Orkestratörün paylaşılan yazıcısı (thread-safe, satır başına tek işlem)"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(path, check_same_thread=False)
+
+    def insert(self, row):
+        with self._lock, self._conn:
+            insert_rows(self._conn, [row])
+
+    def insert_capacity(self, row):
+        with self._lock, self._conn:
+            self._conn.execute(CAPACITY_SQL, row_values(row, CAPACITY_COLUMNS))
+
+    def insert_probe(self, row):
+        with self._lock, self._conn:
+            self._conn.execute(PROBE_SQL, row_values(row, PROBE_COLUMNS))
+
+    def completed_capacity(self, protocol, slo_delivery, slo_p99_ms):
+        """Aynı SLO ile aranmış (protocol, size, bandwidth, loss, delay) profilleri (ERROR hariç)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT Protocol, Size, Bandwidth, Loss, Delay FROM capacity WHERE Protocol = ? "
+                "AND SloDelivery = ? AND SloP99_ms = ? AND Status NOT LIKE 'ERROR%'",
+                (protocol, slo_delivery, slo_p99_ms)).fetchall()
+        return {(proto, int(size), bw, loss, delay) for proto, size, bw, loss, delay in rows}
+
+    def completed_configs(self, protocol):
+        """Başarıyla tamamlanmış (protocol, size, rate, bandwidth, loss, delay) anahtarları.
+        Status'u olmayan eski (içe aktarılmış) satırlar tamamlanmış sayılır."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT Protocol, Size, Rate, Bandwidth, Loss, Delay FROM results "
+                "WHERE Protocol = ? AND (Status IS NULL OR Status = 'SUCCESS')", (protocol,)
+            ).fetchall()
+        return {(proto, int(size), int(rate), bw, loss, delay) for proto, size, rate, bw, loss, delay in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def import_csv(conn, path):
+    """Tek bir results_<proto>.csv dosyasını aktar; daha önce aktarıldıysa None döner.
+    Dosyada olmayan kolonlar (ör. results_bak'ta Status/ReceivedCount) NULL kalır."""
+    import pandas as pd
+    key = os.path.abspath(path)
+    if conn.execute("SELECT 1 FROM imported_files WHERE path = ?", (key,)).fetchone():
+        return None
+
+    df = pd.read_csv(path)
+    df = df.astype(object).where(df.notna(), None)
+    with conn:
+        insert_rows(conn, df.to_dict("records"))
+        conn.execute("INSERT INTO imported_files (path, rows, imported_at) VALUES (?, ?, ?)",
+                     (key, len(df), time.time()))
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LPWAN results database")
+    parser.add_argument("--db", default=DB_PATH, help="database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="one-shot import of results_<proto>.csv files")
+    import_parser.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    for path in args.files:
+        rows = import_csv(conn, path)
+        print(f"{path}: " + ("already imported, skipped" if rows is None else f"{rows} rows imported"))
+    conn.close()
@@ -4,7 +4,21 @@ import subprocess
 import argparse
 import json
 import shutil
-from concurrent.futures import ThreadPoolExecutor
+
+from aggregator import PERCENTILE_COLUMNS, OnlineAggregator
+from bench_agent import AGENT_PORT, AgentClient, AgentError
+import capacity_search
+from capacity_search import CapacitySearch, slo_check
+from docker_exec import sessions
+from network_profile import NetworkProfileApplier, NetworkSetupError
+from repetitions import RepetitionStats
+from readiness import ReadinessTimeout, file_contains, file_tail, port_listening, probe, process_running, wait_until
+from results_db import ResultsWriter
+from sample_archive import SampleArchiveWriter
+from scheduler import SweepScheduler
+from simulator import Simulator
+import sweep_plan
+from tracing import Tracer
 
 # Test Edilecek Protokoller
 PROTOCOLS = {
@@ -30,6 +44,58 @@ LOSS_RATES = ["0%", "1%", "5%", "10%"]
 DELAYS = ["0ms", "20ms", "100ms", "500ms"]
 DURATION = 10
 
+# False ise checkpoint yok sayılır ve tüm ızgara baştan koşulur (--fresh)
+RESUME = True
+
+# Uyarlamalı tekrar (--adaptive): konfigürasyon, teslim oranı ve ortalama gecikme %95 güven
+# aralıkları hedef genişliğe inene kadar (en az MIN, en çok MAX tekrar, konfigürasyon başına bütçe) tekrarlanır
+ADAPTIVE = False
+MIN_REPETITIONS = 3
+MAX_REPETITIONS = 10
+CI_DELIVERY_WIDTH = 2.0  # yüzde puanı
+CI_LATENCY_WIDTH = 0.10  # ortalama gecikmenin oranı
+CONFIG_TIME_BUDGET = 300  # saniye
+
+# Kapasite araması (capacity_search.py, --capacity): profil başına SLO'yu sağlayan en yüksek hız
+SLO_DELIVERY = capacity_search.SLO_DELIVERY
+SLO_P99_MS = capacity_search.SLO_P99_MS
+CAPACITY_START_RATE = capacity_search.START_RATE
+CAPACITY_MAX_RATE = capacity_search.MAX_RATE
+
+# Tarama planı (sweep_plan.py, --plan): koşulacak konfigürasyonlar; None ise tüm ızgara
+PLAN = None
+
+# Hazırlık kontrolleri: node1'deki broker portu ve abonenin dinlediği port (protokol ailesine göre)
+BROKER_PORTS = {"mqtt": 1883, "amqp": 5672, "xmpp": 5222}
+SUBSCRIBER_PORTS = {"coap": (5683, "udp"), "http": (8000, "tcp")}
+SUBSCRIBER_READY_MARKER = "BENCHMARK_SUBSCRIBER_READY"
+STARTUP_TIMEOUT = 180
+SUBSCRIBER_READY_TIMEOUT = 30
+SUBSCRIBER_STOP_TIMEOUT = 15
+
+# Kalıcı Java ajanları (False ise her test için yeni JVM başlatılır, --cold-jvm)
+USE_AGENTS = True
+AGENT_READY_TIMEOUT = 60
+# Ölçülen mesajlardan önce aynı hızda gönderilen ısınma süresi (ölçüme girmez)
+WARMUP_SECONDS = 2
+# Üretici koşusu DURATION + ısınma + bu pay içinde bitmezse zaman aşımı (kısmi sonuç yazılır)
+PRODUCER_TIMEOUT_SLACK = 60
+SAMPLE_STREAM_OPEN_TIMEOUT = 10
+SAMPLE_STREAM_DRAIN_TIMEOUT = 10
+
+# Zamanlayıcı: toplam eşzamanlı compose yığını ve protokol başına üst sınır
+MAX_STACKS = 16
+STACKS_PER_PROTOCOL = 2
+
+# Sonuç veritabanı (results/results.db); __main__ içinde açılır
+results_db = None
+
+# Ham örnek arşivi (results/samples); __main__ içinde açılır
+sample_archive = None
+
+# Faz zamanlamaları (results/trace.json, Chrome Trace Event); __main__ içinde açılır
+tracer = Tracer()
+
 def run_command(command, check=True):
     try:
         result = subprocess.run(command, shell=True, check=check, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
@@ -39,164 +105,571 @@ def run_command(command, check=True):
         if check: raise
         return None
 
-def setup_network_for_container(container_name, bw, loss, delay):
-    try:
-        run_command(f"docker exec {container_name} tc qdisc del dev eth0 root", check=False)
-        cmd = f"docker exec {container_name} tc qdisc add dev eth0 root handle 1: netem delay {delay} loss {loss}"
-        run_command(cmd)
-        cmd = f"docker exec {container_name} tc qdisc add dev eth0 parent 1: handle 2: tbf rate {bw} burst 32kbit latency 400ms"
-        run_command(cmd)
-    except Exception as e:
-        print(f"Network setup failed for {container_name}: {e}")
-
-def worker(proto_name):
-    safe_proto = proto_name.replace("-", "_")
-    project_name = f"bench_{safe_proto}"
-    
-    print(f"[{proto_name}] Building and Starting Environment...")
-    
-    compose_cmd = f"PROTOCOL={proto_name} docker compose -p {project_name} -f docker-compose-java.yml"
-    run_command(f"{compose_cmd} down -v", check=False)
-    run_command(f"{compose_cmd} up -d --build")
-    
-    # Bekle ki servisler başlasın
-    if "amqp" in proto_name:
-        wait_time = 30
-    elif "xmpp" in proto_name:
-        wait_time = 25  # XMPP server needs time to start
-    else:
-        wait_time = 10
+def build_result_row(proto_name, size, rate, bw, loss, delay, expected_count, status,
+                     delivery_ratio=0.0, avg_latency=0.0, jitter=0.0, throughput=0.0, received_count=0,
+                     run_id="", latency_percentiles=None, latency_histogram="", repetitions=1,
+                     delivery_ci=(None, None), latency_ci=(None, None)):
+    return {
+        "Protocol": proto_name,
+        "Size": size,
+        "Rate": rate,
+        "Bandwidth": bw,
+        "Loss": loss,
+        "Delay": delay,
+        "ConfigDelay_ms": int(delay.replace('ms', '')),
+        "DeliveryRatio": delivery_ratio,
+        "LatencyAvg_ms": avg_latency,
+        "Jitter_ms": jitter,
+        **(latency_percentiles or dict.fromkeys(list(PERCENTILE_COLUMNS) + ["LatencyMax_ms"], 0.0)),
+        "LatencyHist": latency_histogram,
+        "Throughput_bps": throughput,
+        "ReceivedCount": received_count,
+        "ExpectedCount": expected_count,
+        "Status": status,
+        "Timestamp": time.time(),
+        "RunId": run_id,
+        "Repetitions": repetitions,
+        "DeliveryRatio_ci_lower": delivery_ci[0],
+        "DeliveryRatio_ci_upper": delivery_ci[1],
+        "LatencyAvg_ms_ci_lower": latency_ci[0],
+        "LatencyAvg_ms_ci_upper": latency_ci[1]
+    }
 
-    print(f"[{proto_name}] Waiting {wait_time}s for services to initialize...")
-    time.sleep(wait_time)
+def write_result_row(result_row):
+    """Satırı veritabanına yaz; Status değerini döndür"""
+    with tracer.span("write_result"):
+        results_db.insert(result_row)
+    return result_row["Status"]
 
-    # XMPP için kullanıcıları her iki node'da da kaydet (her node kendi Prosody'sine sahip)
-    if "xmpp" in proto_name:
-        node1_name = f"{project_name}-node1-1"
-        node2_name = f"{project_name}-node2-1"
-        print(f"[{proto_name}] Registering XMPP users on both nodes...")
-        # Node1'de subscriber kaydı (Prosodyctl kullan)
-        run_command(f"docker exec {node1_name} prosodyctl register subscriber lpwan.local password", check=False)
-        run_command(f"docker exec {node1_name} prosodyctl register producer lpwan.local password", check=False)
-        # Node2'de producer kaydı
-        run_command(f"docker exec {node2_name} prosodyctl register producer lpwan.local password", check=False)
-        run_command(f"docker exec {node2_name} prosodyctl register subscriber lpwan.local password", check=False)
-        time.sleep(2)
-    
+def iter_configs():
+    """Test ızgarası: (size, rate, bw, loss, delay)"""
     for size in PAYLOAD_SIZES:
         for rate in RATES:
             for bw in BANDWIDTHS:
                 for loss in LOSS_RATES:
                     for delay in DELAYS:
                         if rate == 100 and bw == "50kbit": continue
-                        
-                        node1_name = f"{project_name}-node1-1"
-                        node2_name = f"{project_name}-node2-1"
-                        
-                        # Network Setup
-                        setup_network_for_container(node1_name, bw, loss, delay)
-                        setup_network_for_container(node2_name, bw, loss, delay)
-                        
-                        # Prepare args
-                        config = PROTOCOLS[proto_name]
-                        prod_args = [arg.format(size=size, rate=rate, duration=DURATION) for arg in config["args"]]
-                        sub_args = config["sub_args"]
-                        
-                        prod_cmd = "java -jar /app/bench.jar " + " ".join(prod_args)
-                        sub_cmd = "java -jar /app/bench.jar " + " ".join(sub_args)
-                        
-                        # Start Subscriber
-                        run_command(f"docker exec {node1_name} pkill -f 'java -jar'", check=False)
-                        # Run subscriber in /tmp/{proto} to isolate results
-                        run_command(f"docker exec {node1_name} mkdir -p /tmp/{safe_proto}")
-                        
-                        full_sub_cmd = f"cd /tmp/{safe_proto} && {sub_cmd}"
-                        run_command(f"docker exec -d {node1_name} sh -c '{full_sub_cmd}'")
-                        time.sleep(2)
-                        
-                        # Start Producer
-                        prod_output = run_command(f"docker exec {node2_name} {prod_cmd}", check=False)
-                        
-                        actual_sent = int(rate * DURATION)
-                        if prod_output:
-                            for line in prod_output.splitlines():
-                                if "BENCHMARK_SENT_COUNT:" in line:
-                                    try:
-                                        actual_sent = int(line.split(":")[1].strip())
-                                    except:
-                                        pass
-                        
-                        # Stop Subscriber
-                        run_command(f"docker exec {node1_name} pkill -SIGTERM -f 'java -jar'", check=False)
-                        time.sleep(1)
-                        
-                        # Collect Results
-                        param_str = f"s{size}_r{rate}_bw{bw}_l{loss}_d{delay}"
-                        temp_csv = f"results/temp_{safe_proto}_{param_str}.csv"
-
-                        # Initialize default values for failed test
-                        delivery_ratio = 0.0
-                        avg_latency = 0.0
-                        jitter = 0.0
-                        throughput = 0.0
-                        received_count = 0
-                        test_status = "FAILED"
-
-                        try:
-                            run_command(f"docker cp {node1_name}:/tmp/{safe_proto}/results.csv {temp_csv}", check=False)
-
-                            import pandas as pd
-                            if os.path.exists(temp_csv) and os.path.getsize(temp_csv) > 0:
-                                df = pd.read_csv(temp_csv)
-                                expected_count = actual_sent
-                                # Count unique sequence numbers to avoid duplicates
-                                received_count = df['sequence'].nunique() if 'sequence' in df.columns else len(df)
-                                delivery_ratio = (received_count / expected_count) * 100.0 if expected_count > 0 else 0
-                                avg_latency = df['latency'].mean() if received_count > 0 else 0
-                                throughput = (received_count * size * 8) / DURATION
-                                jitter = df['latency'].std() if received_count > 1 else 0
-                                test_status = "SUCCESS"
-                                os.remove(temp_csv)
-                            else:
-                                print(f"[{proto_name}] No results received for {param_str}")
-                                test_status = "NO_DATA"
-                        except Exception as e:
-                            print(f"[{proto_name}] Error processing {param_str}: {e}")
-                            test_status = f"ERROR: {str(e)[:50]}"
-
-                        # Always write result row, even for failed tests
-                        result_row = {
-                            "Protocol": proto_name,
-                            "Size": size,
-                            "Rate": rate,
-                            "Bandwidth": bw,
-                            "Loss": loss,
-                            "Delay": delay,
-                            "ConfigDelay_ms": int(delay.replace('ms', '')),
-                            "DeliveryRatio": delivery_ratio,
-                            "LatencyAvg_ms": avg_latency,
-                            "Jitter_ms": jitter,
-                            "Throughput_bps": throughput,
-                            "ReceivedCount": received_count,
-                            "ExpectedCount": actual_sent,
-                            "Status": test_status,
-                            "Timestamp": time.time()
-                        }
-
-                        summary_file = f"results/results_{safe_proto}.csv"
-                        summary_df = pd.DataFrame([result_row])
-
-                        if not os.path.exists(summary_file):
-                            summary_df.to_csv(summary_file, index=False)
-                        else:
-                            summary_df.to_csv(summary_file, mode='a', header=False, index=False)
+                        yield size, rate, bw, loss, delay
+
+def iter_profiles():
+    """Kapasite araması profilleri: (size, bw, loss, delay); hız aramayla bulunur"""
+    for size in PAYLOAD_SIZES:
+        for bw in BANDWIDTHS:
+            for loss in LOSS_RATES:
+                for delay in DELAYS:
+                    yield size, bw, loss, delay
+
+def load_completed_configs(proto_name):
+    """Checkpoint indeksi: veritabanında başarıyla tamamlanmış
+    (protocol, size, rate, bandwidth, loss, delay) anahtarları.
+    NO_DATA/ERROR/FAILED satırları tamamlanmış sayılmaz; Status kolonu olmayan eski satırlar sayılır."""
+    return results_db.completed_configs(proto_name)
+
+def wait_for_services(proto_name, node1, node2):
+    """Broker (ve XMPP için her iki node'daki Prosody) hazır olana kadar bekle"""
+    family = proto_name.split("-")[0]
+
+    def ready():
+        if not probe(node2, "true"):
+            return False
+        if family in BROKER_PORTS:
+            nodes = [node1, node2] if family == "xmpp" else [node1]
+            if not all(port_listening(node, BROKER_PORTS[family]) for node in nodes):
+                return False
+        if family == "amqp":
+            # entrypoint test kullanıcısını broker açıldıktan sonra ekliyor
+            return probe(node1, "rabbitmqctl list_users 2>/dev/null | grep -q '^test'")
+        return True
+
+    return wait_until(ready, STARTUP_TIMEOUT, f"[{proto_name}] services")
+
+def wait_for_subscriber(proto_name, node1, log_path):
+    """Abone 'hazır' işaretçisini basana (ve varsa portunu açana) kadar bekle"""
+    family = proto_name.split("-")[0]
+
+    def ready():
+        if not file_contains(node1, log_path, SUBSCRIBER_READY_MARKER):
+            return False
+        if family in SUBSCRIBER_PORTS:
+            port, transport = SUBSCRIBER_PORTS[family]
+            return port_listening(node1, port, transport)
+        return True
+
+    return wait_until(ready, SUBSCRIBER_READY_TIMEOUT, f"[{proto_name}] subscriber")
+
+def pending_configs(proto_name):
+    """Checkpoint'e göre protokolün henüz tamamlanmamış konfigürasyonları"""
+    # Yarıda kalmış bir taramadan devam: başarılı konfigürasyonları atla
+    completed = load_completed_configs(proto_name) if RESUME else set()
+    planned = [config for config in iter_configs() if PLAN is None or config in PLAN]
+    pending = [config for config in planned if (proto_name,) + config not in completed]
+    skipped = len(planned) - len(pending)
+    if skipped:
+        print(f"[{proto_name}] Resuming: {skipped} configurations already done, {len(pending)} pending")
+    return pending
+
+def pending_profiles(proto_name):
+    """Aynı SLO ile henüz kapasitesi aranmamış profiller"""
+    completed = results_db.completed_capacity(proto_name, SLO_DELIVERY, SLO_P99_MS) if RESUME else set()
+    profiles = list(iter_profiles())
+    pending = [profile for profile in profiles if (proto_name,) + profile not in completed]
+    if len(pending) < len(profiles):
+        print(f"[{proto_name}] Resuming: {len(profiles) - len(pending)} profiles already searched, {len(pending)} pending")
+    return pending
+
+def compose_command(proto_name, project_name):
+    return f"PROTOCOL={proto_name} docker compose -p {project_name} -f docker-compose-java.yml"
+
+def start_stack(proto_name, index):
+    """Protokol için bir node1/node2 compose yığını kaldır; hazır olmazsa ReadinessTimeout"""
+    safe_proto = proto_name.replace("-", "_")
+    # Aynı protokolün paralel yığınları ayrı compose projeleri olarak koşar
+    project_name = f"bench_{safe_proto}" if index == 0 else f"bench_{safe_proto}_{index}"
+
+    print(f"[{proto_name}] Building and Starting Environment ({project_name})...")
+
+    with tracer.span("stack_start", protocol=proto_name, project=project_name):
+        return _start_stack(proto_name, safe_proto, project_name)
+
+def _start_stack(proto_name, safe_proto, project_name):
+    """start_stack gövdesi (stack_start span'i içinde)"""
+    compose_cmd = compose_command(proto_name, project_name)
+    with tracer.span("compose_up"):
+        run_command(f"{compose_cmd} down -v", check=False)
+        run_command(f"{compose_cmd} up -d --build")
+
+    node1_name = f"{project_name}-node1-1"
+    node2_name = f"{project_name}-node2-1"
+    stack = {
+        "proto": proto_name,
+        "safe_proto": safe_proto,
+        "project": project_name,
+        "node1": sessions.get(node1_name),
+        "node2": sessions.get(node2_name),
+        "network": NetworkProfileApplier()
+    }
+
+    # Bekle ki servisler başlasın
+    print(f"[{proto_name}] Waiting for services to initialize...")
+    try:
+        with tracer.span("startup_wait"):
+            elapsed = wait_for_services(proto_name, stack["node1"], stack["node2"])
+    except ReadinessTimeout:
+        stop_stack(stack)
+        raise
+    print(f"[{proto_name}] Services ready after {elapsed:.1f}s")
+
+    # XMPP için kullanıcıları her iki node'da da kaydet (her node kendi Prosody'sine sahip)
+    if "xmpp" in proto_name:
+        print(f"[{proto_name}] Registering XMPP users on both nodes...")
+        with tracer.span("xmpp_register"):
+            # Node1'de subscriber kaydı (Prosodyctl kullan)
+            stack["node1"].run("prosodyctl register subscriber lpwan.local password", check=False)
+            stack["node1"].run("prosodyctl register producer lpwan.local password", check=False)
+            # Node2'de producer kaydı
+            stack["node2"].run("prosodyctl register producer lpwan.local password", check=False)
+            stack["node2"].run("prosodyctl register subscriber lpwan.local password", check=False)
+
+    if USE_AGENTS:
+        with tracer.span("agents_start"):
+            stack["agents"] = start_agents(stack)
+    else:
+        stack["agents"] = None
+    # Koşu yürütücüsü: run_config yalnızca bu sözleşmeyi bilir (simulator.Simulator.execute de aynı)
+    stack["execute"] = run_with_agents if stack["agents"] else run_cold_jvm
+    return stack
+
+def start_agents(stack):
+    """Her iki node'da ajanı başlat, aboneyi node1 ajanında bir kez aç.
+    Ajanlar ayağa kalkmazsa None (yığın test başına JVM moduna düşer)."""
+    proto_name = stack["proto"]
+    subscriber = AgentClient(stack["node1"])
+    producer = AgentClient(stack["node2"])
+    try:
+        for agent in (subscriber, producer):
+            agent.start()
+        for agent in (subscriber, producer):
+            wait_until(lambda: port_listening(agent.shell, AGENT_PORT), AGENT_READY_TIMEOUT,
+                       f"[{proto_name}] agent on {agent.shell.container}")
+        subscriber.request("subscribe", *PROTOCOLS[proto_name]["sub_args"][1:])
+        wait_for_subscriber(proto_name, stack["node1"], subscriber.log_path)
+    except (ReadinessTimeout, AgentError) as e:
+        print(f"{e}\n{file_tail(stack['node1'], subscriber.log_path)}\n"
+              f"[{proto_name}] Falling back to one JVM per test")
+        for agent in (subscriber, producer):
+            agent.shell.run("pkill -f 'java -jar'", check=False)
+        return None
+    print(f"[{proto_name}] Benchmark agents ready")
+    return {"subscriber": subscriber, "producer": producer}
+
+def stop_stack(stack):
+    """Oturumları kapat ve yığını indir (yuva başka bir protokole geçebilsin)"""
+    with tracer.span("stack_stop", protocol=stack["proto"], project=stack["project"]):
+        stack["network"].close()
+        sessions.close(stack["node1"].container)
+        sessions.close(stack["node2"].container)
+        run_command(f"{compose_command(stack['proto'], stack['project'])} down -v", check=False)
+
+def run_cold_jvm(stack, job, run_id):
+    """Test başına yeni JVM: abone arka planda, üretici ön planda.
+    (sent, toplayıcı, tamamlandı mı)"""
+    proto_name, safe_proto = stack["proto"], stack["safe_proto"]
+    node1, node2 = stack["node1"], stack["node2"]
+    size, rate, bw, loss, delay = job
+
+    # Prepare args
+    config = PROTOCOLS[proto_name]
+    prod_args = [arg.format(size=size, rate=rate, duration=DURATION) for arg in config["args"]]
+    sub_args = config["sub_args"]
+    
+    prod_cmd = "java -jar /app/bench.jar " + " ".join(prod_args)
+    sub_cmd = "java -jar /app/bench.jar " + " ".join(sub_args)
+    
+    # Start Subscriber
+    sub_dir = f"/tmp/{safe_proto}"
+    with tracer.span("subscriber_start"):
+        node1.run("pkill -f 'java -jar'", check=False)
+        # Run subscriber in /tmp/{proto} to isolate results (önceki testin dosyaları silinir)
+        node1.run(f"mkdir -p {sub_dir} && rm -f {sub_dir}/results.csv {sub_dir}/subscriber.log")
+
+        full_sub_cmd = f"cd {sub_dir} && exec {sub_cmd} > subscriber.log 2>&1"
+        node1.run_detached(full_sub_cmd)
+        try:
+            wait_for_subscriber(proto_name, node1, f"{sub_dir}/subscriber.log")
+        except ReadinessTimeout:
+            print(file_tail(node1, f"{sub_dir}/subscriber.log"))
+            node1.run("pkill -f 'java -jar'", check=False)
+            raise
+    
+    # Start Producer
+    with tracer.span("producer_run"):
+        prod_output = node2.run(prod_cmd, check=False)
+    
+    actual_sent = int(rate * DURATION)
+    if prod_output:
+        for line in prod_output.splitlines():
+            if "BENCHMARK_SENT_COUNT:" in line:
+                try:
+                    actual_sent = int(line.split(":")[1].strip())
+                except:
+                    pass
+    
+    # Stop Subscriber
+    with tracer.span("subscriber_stop"):
+        node1.run("pkill -SIGTERM -f 'java -jar'", check=False)
+        # Süreç çıktığında shutdown hook results.csv'yi yazmış olur
+        try:
+            wait_until(lambda: not process_running(node1, "java -jar"),
+                       SUBSCRIBER_STOP_TIMEOUT, f"[{proto_name}] subscriber shutdown")
+        except ReadinessTimeout as e:
+            print(f"{e} for {run_id}; results may be incomplete")
+
+    # docker cp yerine açık oturum üzerinden oku
+    with tracer.span("collect"):
+        aggregator = OnlineAggregator()
+        aggregator.add_csv(node1.run(f"cat {sub_dir}/results.csv", check=False))
+    return actual_sent, aggregator, True
+
+def run_with_agents(stack, job, run_id):
+    """Kalıcı ajanlar üzerinden: ölçüm penceresini aç, abone örneklerini geldikçe
+    toplayıcıya akıt, üreticiyi koştur. Zaman aşımında o ana kadarki örnekler korunur.
+    (sent, toplayıcı, tamamlandı mı)"""
+    proto_name = stack["proto"]
+    subscriber, producer = stack["agents"]["subscriber"], stack["agents"]["producer"]
+    size, rate, bw, loss, delay = job
+
+    prod_args = [arg.format(size=size, rate=rate, duration=DURATION) for arg in PROTOCOLS[proto_name]["args"]]
+    warmup = int(rate * WARMUP_SECONDS)
+    actual_sent = int(rate * DURATION)
+    complete = True
+
+    aggregator = OnlineAggregator()
+    with tracer.span("subscriber_start"):
+        subscriber.request("start", run_id)
+        stream = subscriber.stream(run_id, aggregator)
+    try:
+        with tracer.span("stream_open"):
+            stream.wait_open(SAMPLE_STREAM_OPEN_TIMEOUT)
+        with tracer.span("producer_run"):
+            reply = producer.request("run", run_id, warmup, *prod_args[1:],
+                                     timeout=DURATION + WARMUP_SECONDS + PRODUCER_TIMEOUT_SLACK)
+        actual_sent = int(reply.get("sent", 0)) or actual_sent
+    except subprocess.TimeoutExpired:
+        print(f"[{proto_name}] Producer timed out for {run_id}; keeping partial results")
+        complete = False
+        # Ajandaki üretici thread'i hâlâ gönderiyor olabilir; ajanı yeniden başlat
+        with tracer.span("agent_restart"):
+            producer.start()
+            wait_until(lambda: port_listening(producer.shell, AGENT_PORT), AGENT_READY_TIMEOUT,
+                       f"[{proto_name}] agent on {producer.shell.container}")
+    finally:
+        with tracer.span("collect"):
+            try:
+                subscriber.request("collect", run_id)
+            except AgentError as e:
+                print(f"[{proto_name}] Collect failed for {run_id}: {e}")
+            stream.close(SAMPLE_STREAM_DRAIN_TIMEOUT)
+    return actual_sent, aggregator, complete
+
+def run_config(stack, job):
+    """Tek bir (size, rate, bw, loss, delay) konfigürasyonunu yığında koş ve sonucu yaz"""
+    size, rate, bw, loss, delay = job
+    param_str = f"s{size}_r{rate}_bw{bw}_l{loss}_d{delay}"
+    with tracer.span("config", protocol=stack["proto"], config=param_str) as span:
+        span["status"] = _run_config(stack, job, param_str, span)
+
+def _run_config(stack, job, param_str, span):
+    """run_config gövdesi; yazılan satırın Status değerini döndürür"""
+    proto_name, safe_proto = stack["proto"], stack["safe_proto"]
+    node1, node2 = stack["node1"], stack["node2"]
+    size, rate, bw, loss, delay = job
+
+    # Network Setup (iki node paralel; doğrulanamazsa test koşulmaz)
+    try:
+        with tracer.span("network_setup"):
+            stack["network"].apply([node1, node2], bw, loss, delay)
+    except NetworkSetupError as e:
+        print(f"[{proto_name}] Network setup failed for {param_str}: {e}")
+        return write_result_row(build_result_row(
+            proto_name, size, rate, bw, loss, delay, 0, "ERROR: network setup failed"))
+    
+    # Koşu kimliği: ajan komutları, ham örnek arşivi ve sonuç satırı bununla eşleşir
+    # (tekrarlar arşive <run_id>_rep<k> olarak yazılır)
+    run_id = f"{safe_proto}_s{size}_r{rate}_bw{bw}_l{loss.rstrip('%')}_d{delay}_{int(time.time() * 1000)}"
+    span["run_id"] = run_id
+    aggregator = OnlineAggregator()
+    repetitions = RepetitionStats()
+    actual_sent, complete = 0, True
+    started = time.monotonic()
+    while True:
+        repetition_id = run_id if repetitions.count == 0 else f"{run_id}_rep{repetitions.count}"
+        try:
+            sent, run_aggregator, run_complete = stack["execute"](stack, job, repetition_id)
+        except ReadinessTimeout as e:
+            print(f"{e} for {param_str}")
+            failure = "ERROR: subscriber not ready"
+        except AgentError as e:
+            print(f"[{proto_name}] Agent failed for {param_str}: {e}")
+            failure = "ERROR: agent failed"
+        except subprocess.CalledProcessError as e:
+            # Oturum komutu başarısız oldu (ör. abone dizini hazırlanamadı)
+            print(f"[{proto_name}] Command failed for {param_str}: {e}")
+            failure = "ERROR: command failed"
+        except subprocess.TimeoutExpired as e:
+            # Oturum kapatıldı; sonraki komutta yeniden açılır
+            print(f"[{proto_name}] Command timed out for {param_str}: {e}")
+            failure = "ERROR: command timed out"
+        else:
+            failure = None
+        if failure:
+            if repetitions.count:
+                break  # tamamlanan tekrarlarla devam
+            return write_result_row(build_result_row(proto_name, size, rate, bw, loss, delay, 0, failure))
+
+        # Ham örnekler arşive (gecikme kuyrukları sonradan yeniden hesaplanabilsin)
+        if sample_archive is not None:
+            with tracer.span("archive"):
+                sample_archive.append(repetition_id, run_aggregator.raw_seqs, run_aggregator.raw_latencies,
+                                      proto_name, size, rate, bw, loss, delay)
+
+        repetitions.add(run_aggregator.count / sent * 100.0 if sent > 0 else 0.0,
+                        run_aggregator.mean if run_aggregator.count else None)
+        aggregator.merge(run_aggregator)
+        actual_sent += sent
+        complete = complete and run_complete
+        if not ADAPTIVE or repetitions.count >= MAX_REPETITIONS \
+                or time.monotonic() - started >= CONFIG_TIME_BUDGET:
+            break
+        if repetitions.count >= MIN_REPETITIONS and repetitions.converged(CI_DELIVERY_WIDTH, CI_LATENCY_WIDTH):
+            break
+    span["repetitions"] = repetitions.count
+
+    # Metrikler çevrimiçi toplayıcıdan (her tekrarda tekil sıra numaraları üzerinden, tekrarlar birleşik)
+    received_count = aggregator.count
+    delivery_ratio = (received_count / actual_sent) * 100.0 if actual_sent > 0 else 0
+    avg_latency = aggregator.mean
+    jitter = aggregator.std
+    throughput = (received_count * size * 8) / (DURATION * repetitions.count)
+    if received_count > 0:
+        test_status = "SUCCESS" if complete else "PARTIAL: timeout"
+    else:
+        print(f"[{proto_name}] No results received for {param_str}")
+        test_status = "NO_DATA" if complete else "ERROR: timeout"
+
+    # Always write result row, even for failed tests
+    return write_result_row(build_result_row(
+        proto_name, size, rate, bw, loss, delay, actual_sent, test_status,
+        delivery_ratio=delivery_ratio, avg_latency=avg_latency, jitter=jitter,
+        throughput=throughput, received_count=received_count, run_id=run_id,
+        latency_percentiles=aggregator.percentile_columns(), latency_histogram=aggregator.encode_histogram(),
+        repetitions=repetitions.count, delivery_ci=repetitions.delivery_ci(), latency_ci=repetitions.latency_ci()))
+
+def run_capacity(stack, profile):
+    """Tek bir (size, bw, loss, delay) profilinde kapasite araması yap ve sonucu yaz"""
+    size, bw, loss, delay = profile
+    param_str = f"s{size}_bw{bw}_l{loss}_d{delay}"
+    with tracer.span("capacity_search", protocol=stack["proto"], config=param_str) as span:
+        span["status"] = _run_capacity(stack, profile, param_str, span)
+
+def _run_capacity(stack, profile, param_str, span):
+    """run_capacity gövdesi; capacity satırının Status değerini döndürür"""
+    proto_name, safe_proto = stack["proto"], stack["safe_proto"]
+    size, bw, loss, delay = profile
+    delay_ms = int(delay.replace('ms', ''))
+    search_id = f"{safe_proto}_s{size}_bw{bw}_l{loss.rstrip('%')}_d{delay}_cap_{int(time.time() * 1000)}"
+    span["search_id"] = search_id
+    result_row = {"Protocol": proto_name, "Size": size, "Bandwidth": bw, "Loss": loss, "Delay": delay,
+                  "ConfigDelay_ms": delay_ms, "SloDelivery": SLO_DELIVERY, "SloP99_ms": SLO_P99_MS,
+                  "SearchId": search_id, "Probes": 0}
+
+    def write_capacity(status, **values):
+        with tracer.span("write_result"):
+            results_db.insert_capacity({**result_row, **values, "Status": status, "Timestamp": time.time()})
+        return status
+
+    try:
+        with tracer.span("network_setup"):
+            stack["network"].apply([stack["node1"], stack["node2"]], bw, loss, delay)
+    except NetworkSetupError as e:
+        print(f"[{proto_name}] Network setup failed for {param_str}: {e}")
+        return write_capacity("ERROR: network setup failed")
+
+    search = CapacitySearch(CAPACITY_START_RATE, CAPACITY_MAX_RATE)
+    best = {}  # en yüksek geçen hızdaki metrikler
+    rate = search.next_rate()
+    while rate is not None:
+        run_id = f"{search_id}_r{rate}"
+        phase = search.phase
+        with tracer.span("capacity_probe", rate=rate, phase=phase) as probe_span:
+            try:
+                sent, aggregator, complete = stack["execute"](stack, (size, rate, bw, loss, delay), run_id)
+            except ReadinessTimeout as e:
+                print(f"{e} for {param_str} at rate {rate}")
+                return write_capacity("ERROR: subscriber not ready", Probes=result_row["Probes"])
+            except AgentError as e:
+                print(f"[{proto_name}] Agent failed for {param_str} at rate {rate}: {e}")
+                return write_capacity("ERROR: agent failed", Probes=result_row["Probes"])
+            except subprocess.CalledProcessError as e:
+                print(f"[{proto_name}] Command failed for {param_str} at rate {rate}: {e}")
+                return write_capacity("ERROR: command failed", Probes=result_row["Probes"])
+            except subprocess.TimeoutExpired as e:
+                print(f"[{proto_name}] Command timed out for {param_str} at rate {rate}: {e}")
+                return write_capacity("ERROR: command timed out", Probes=result_row["Probes"])
+
+            if sample_archive is not None:
+                with tracer.span("archive"):
+                    sample_archive.append(run_id, aggregator.raw_seqs, aggregator.raw_latencies,
+                                          proto_name, size, rate, bw, loss, delay)
+
+            metrics = {
+                "DeliveryRatio": aggregator.count / sent * 100.0 if sent > 0 else 0.0,
+                "LatencyP99_ms": aggregator.percentile_columns()["LatencyP99_ms"] if aggregator.count else None,
+                "Throughput_bps": aggregator.count * size * 8 / DURATION
+            }
+            passed, reason = slo_check(metrics["DeliveryRatio"], metrics["LatencyP99_ms"], delay_ms,
+                                       SLO_DELIVERY, SLO_P99_MS)
+            if not complete:
+                passed, reason = False, "producer timed out"
+            probe_span["passed"] = passed
+
+        result_row["Probes"] += 1
+        with tracer.span("write_result"):
+            results_db.insert_probe({**result_row, **metrics, "Probe": result_row["Probes"], "Phase": phase,
+                                     "Rate": rate, "Passed": int(passed), "Reason": reason, "RunId": run_id,
+                                     "Timestamp": time.time()})
+        search.record(rate, passed)
+        if passed and rate == search.passed:
+            best = metrics
+        rate = search.next_rate()
+
+    capacity, status = search.result()
+    span["capacity"] = capacity
+    print(f"[{proto_name}] Capacity for {param_str}: "
+          + (f"{capacity} msg/s" if capacity is not None else f"below {CAPACITY_START_RATE} msg/s")
+          + f" ({status}, {result_row['Probes']} probes)")
+    return write_capacity(status, CapacityRate=capacity, **best)
 
 if __name__ == "__main__":
-    if not os.path.exists("results"):
-        os.makedirs("results")
-        
-    with open("docker-compose-java.yml", "w") as f:
-        f.write("""
+    parser = argparse.ArgumentParser(description="LPWAN protocol benchmark sweep")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore existing results and re-run every configuration")
+    parser.add_argument("--cold-jvm", action="store_true",
+                        help="start a fresh JVM per test instead of long-lived agents")
+    parser.add_argument("--max-stacks", type=int, default=MAX_STACKS,
+                        help="total number of concurrent compose stacks")
+    parser.add_argument("--stacks-per-protocol", type=int, default=STACKS_PER_PROTOCOL,
+                        help="default concurrency limit per protocol")
+    parser.add_argument("--protocol-limit", action="append", default=[], metavar="PROTO=N",
+                        help="per-protocol concurrency limit override (repeatable)")
+    parser.add_argument("--simulate", action="store_true",
+                        help="replay the sweep with the local network simulator instead of Docker/tc")
+    parser.add_argument("--time-scale", type=float, default=0.0,
+                        help="simulated runs sleep real durations times this factor (0 = no sleeping)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the simulator and lhs plans")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="repeat each configuration until the delivery/latency confidence intervals are narrow")
+    parser.add_argument("--min-reps", type=int, default=MIN_REPETITIONS, help="adaptive: minimum repetitions")
+    parser.add_argument("--max-reps", type=int, default=MAX_REPETITIONS, help="adaptive: maximum repetitions")
+    parser.add_argument("--ci-delivery", type=float, default=CI_DELIVERY_WIDTH,
+                        help="adaptive: target 95%% CI width of the delivery ratio (percentage points)")
+    parser.add_argument("--ci-latency", type=float, default=CI_LATENCY_WIDTH,
+                        help="adaptive: target 95%% CI width of the mean latency (fraction of the mean)")
+    parser.add_argument("--config-budget", type=float, default=CONFIG_TIME_BUDGET,
+                        help="adaptive: seconds after which a configuration stops repeating")
+    parser.add_argument("--capacity", action="store_true",
+                        help="search the highest producer rate meeting the SLO per protocol and network profile")
+    parser.add_argument("--slo-delivery", type=float, default=SLO_DELIVERY,
+                        help="capacity: minimum delivery ratio (%%)")
+    parser.add_argument("--slo-p99", type=float, default=SLO_P99_MS,
+                        help="capacity: allowed p99 latency above the configured delay (ms)")
+    parser.add_argument("--capacity-start", type=int, default=CAPACITY_START_RATE,
+                        help="capacity: first probed rate (msg/s)")
+    parser.add_argument("--capacity-max", type=int, default=CAPACITY_MAX_RATE,
+                        help="capacity: highest probed rate (msg/s)")
+    parser.add_argument("--plan", choices=sweep_plan.DESIGNS, default="full",
+                        help="sweep design; non-full designs predict the skipped configurations afterwards")
+    parser.add_argument("--plan-runs", type=int, help="configurations per protocol for fractional/lhs plans")
+    parser.add_argument("--plan-file", help="CSV points (size,rate,bandwidth,loss,delay) for --plan subset")
+    parser.add_argument("--results-dir", default="results",
+                        help="directory for results.db, samples/ and trace files")
+    args = parser.parse_args()
+    RESUME = not args.fresh
+    USE_AGENTS = not args.cold_jvm
+    ADAPTIVE = args.adaptive
+    MIN_REPETITIONS, MAX_REPETITIONS = args.min_reps, max(args.max_reps, 1)
+    CI_DELIVERY_WIDTH, CI_LATENCY_WIDTH = args.ci_delivery, args.ci_latency
+    CONFIG_TIME_BUDGET = args.config_budget
+    SLO_DELIVERY, SLO_P99_MS = args.slo_delivery, args.slo_p99
+    CAPACITY_START_RATE, CAPACITY_MAX_RATE = max(args.capacity_start, 1), args.capacity_max
+    if args.capacity and (args.adaptive or args.plan != "full"):
+        parser.error("--capacity cannot be combined with --adaptive or --plan")
+
+    protocol_limits = {}
+    for item in args.protocol_limit:
+        proto, _, limit = item.partition("=")
+        if proto not in PROTOCOLS or not limit.isdigit():
+            parser.error(f"invalid --protocol-limit: {item}")
+        protocol_limits[proto] = int(limit)
+
+    if args.plan != "full":
+        try:
+            PLAN = set(sweep_plan.plan(list(iter_configs()), args.plan, args.plan_runs, args.seed, args.plan_file))
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"invalid plan: {e}")
+        print(f"Sweep plan '{args.plan}': {len(PLAN)}/{sum(1 for _ in iter_configs())} configurations per protocol")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    results_db = ResultsWriter(os.path.join(args.results_dir, "results.db"))
+    sample_archive = SampleArchiveWriter(os.path.join(args.results_dir, "samples"))
+    tracer.open(os.path.join(args.results_dir, "trace.json"))
+
+    if args.simulate:
+        simulator = Simulator(DURATION, time_scale=args.time_scale, seed=args.seed, tracer=tracer)
+        stack_hooks = (simulator.start_stack, simulator.stop_stack)
+    else:
+        stack_hooks = (start_stack, stop_stack)
+        with open("docker-compose-java.yml", "w") as f:
+            f.write("""
 services:
   node1:
     build: 
@@ -229,5 +702,23 @@ networks:
     driver: bridge
 """)
 
-    with ThreadPoolExecutor(max_workers=16) as executor:
-        executor.map(worker, PROTOCOLS.keys())
+    if args.capacity:
+        jobs, run_job = {proto_name: pending_profiles(proto_name) for proto_name in PROTOCOLS}, run_capacity
+    else:
+        jobs, run_job = {proto_name: pending_configs(proto_name) for proto_name in PROTOCOLS}, run_config
+    scheduler = SweepScheduler(
+        jobs, stack_hooks[0], run_job, stack_hooks[1],
+        max_stacks=args.max_stacks,
+        stacks_per_protocol=args.stacks_per_protocol,
+        protocol_limits=protocol_limits
+    )
+    try:
+        scheduler.run()
+        if PLAN is not None:
+            # Atlanan konfigürasyonlar için etkiler ve tahminler (predictions/effects tabloları)
+            with tracer.span("plan_fit", design=args.plan):
+                sweep_plan.fit_and_store(results_db.path, list(iter_configs()), args.plan, PROTOCOLS)
+    finally:
+        # Faz özeti: results/trace_summary.csv (yarıda kesilen taramalarda da)
+        tracer.write_summary(os.path.join(args.results_dir, "trace_summary.csv"))
+        tracer.close()
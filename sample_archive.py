@@ -0,0 +1,136 @@
+"""Koşu başına ham mesaj örneklerinin (seq, gecikme) sıkıştırılmış sütunlu arşivi.
+
+Her sütun ayrı, yalnızca sona eklenen ham ikili dosyadır (int32 seq, float32
+gecikme); `runs.csv` indeksi her koşunun RunId'sini, konfigürasyonunu ve
+sütunlardaki [Offset, Offset + Count) aralığını tutar. İndeks satırı sütunlar
+yazıldıktan sonra eklenir (commit noktası); yarım kalmış yazımlar bir sonraki
+açılışta kırpılır. Okuyucu sütunları np.memmap ile açar, böylece milyonlarca
+örnek RAM'e yüklenmeden vektörel işlenebilir.
+"""
+import csv
+import os
+import threading
+import time
+
+import numpy as np
+
+ARCHIVE_DIR = "results/samples"
+INDEX_FILE = "runs.csv"
+COLUMNS = {"seq": np.int32, "latency_ms": np.float32}
+INDEX_COLUMNS = ["RunId", "Protocol", "Size", "Rate", "Bandwidth", "Loss", "Delay",
+                 "Offset", "Count", "Timestamp"]
+
+
+def _column_path(directory, name):
+    return os.path.join(directory, f"{name}.{np.dtype(COLUMNS[name]).name}")
+
+
+class SampleArchiveWriter:
+    """Süreç içinde paylaşılan yazıcı (thread-safe)"""
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._end = self._recover()
+
+    def _recover(self):
+        """Son indekslenmiş koşunun sonunu bul; sütunlardaki fazlalığı kırp"""
+        end = 0
+        if os.path.exists(self._index_path):
+            with open(self._index_path, newline="") as f:
+                for row in csv.DictReader(f):
+                    end = max(end, int(row["Offset"]) + int(row["Count"]))
+        else:
+            with open(self._index_path, "w", newline="") as f:
+                csv.writer(f).writerow(INDEX_COLUMNS)
+
+        for name, dtype in COLUMNS.items():
+            path = _column_path(self.directory, name)
+            size = end * np.dtype(dtype).itemsize
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            if os.path.getsize(path) != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        return end
+
+    def append(self, run_id, seqs, latencies, protocol, size, rate, bw, loss, delay):
+        """Koşunun örneklerini ekle; (offset, count) döndür"""
+        seqs = np.asarray(seqs, dtype=COLUMNS["seq"])
+        latencies = np.asarray(latencies, dtype=COLUMNS["latency_ms"])
+        if len(seqs) != len(latencies):
+            raise ValueError("seq and latency columns differ in length")
+
+        with self._lock:
+            offset = self._end
+            for name, values in (("seq", seqs), ("latency_ms", latencies)):
+                with open(_column_path(self.directory, name), "ab") as f:
+                    f.write(values.tobytes())
+            with open(self._index_path, "a", newline="") as f:
+                csv.writer(f).writerow([run_id, protocol, size, rate, bw, loss, delay,
+                                        offset, len(seqs), time.time()])
+            self._end = offset + len(seqs)
+        return offset, len(seqs)
+
+
+class SampleArchive:
+    """Salt okunur yükleyici: indeks DataFrame + memory-mapped sütunlar"""
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        import pandas as pd
+        self.directory = directory
+        self.index = pd.read_csv(os.path.join(directory, INDEX_FILE))
+        # Yazıcı eşzamanlı ekliyorsa indekste olmayan kuyruk yok sayılır
+        end = int((self.index["Offset"] + self.index["Count"]).max()) if len(self.index) else 0
+        self.columns = {}
+        for name, dtype in COLUMNS.items():
+            path = _column_path(directory, name)
+            self.columns[name] = (np.memmap(path, dtype=dtype, mode="r", shape=(end,))
+                                  if end else np.empty(0, dtype=dtype))
+        self._by_run = {run_id: i for i, run_id in enumerate(self.index["RunId"])}
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def seq(self):
+        return self.columns["seq"]
+
+    @property
+    def latency_ms(self):
+        return self.columns["latency_ms"]
+
+    def run(self, run_id):
+        """Koşunun (seq, latency_ms) görünümleri (kopya yok)"""
+        row = self.index.iloc[self._by_run[run_id]]
+        start, stop = int(row["Offset"]), int(row["Offset"] + row["Count"])
+        return self.seq[start:stop], self.latency_ms[start:stop]
+
+    def select(self, **filters):
+        """İndeks satırlarını kolon=değer (ya da değer listesi) ile süz"""
+        mask = np.ones(len(self.index), dtype=bool)
+        for column, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.index[column].isin(values).to_numpy()
+        return self.index[mask]
+
+    def latencies(self, runs=None):
+        """Seçili koşuların gecikmeleri tek dizi olarak (yalnızca ilgili sayfalar okunur)"""
+        runs = self.index if runs is None else runs
+        if not len(runs):
+            return np.empty(0, dtype=COLUMNS["latency_ms"])
+        return np.concatenate([self.latency_ms[int(o):int(o + c)]
+                               for o, c in zip(runs["Offset"], runs["Count"])])
+
+    def per_run(self, ufunc=np.add):
+        """Her koşu için vektörel indirgeme (ör. np.add -> toplam, np.maximum -> max).
+        Boş koşular NaN döner."""
+        offsets = self.index["Offset"].to_numpy()
+        counts = self.index["Count"].to_numpy()
+        result = np.full(len(offsets), np.nan)
+        nonempty = counts > 0
+        if nonempty.any():
+            result[nonempty] = ufunc.reduceat(self.latency_ms, offsets[nonempty], dtype=np.float64)
+        return result
@@ -0,0 +1,174 @@
+"""(protokol, konfigürasyon) işleri için iş çalan zamanlayıcı.
+
+Tüm ızgara protokol başına bir iş kuyruğuna dönüştürülür. Toplam `max_stacks`
+kadar yuva (thread) vardır; her yuva bir protokol için node1/node2 compose
+yığını ayağa kaldırır ve o protokolün sıradaki işlerini çeker. Protokolün işleri
+bittiğinde yuva yığını kapatır ve en çok bekleyen işi olan, eşzamanlılık
+sınırına ulaşmamış protokole geçer. Gözlenen iş sürelerinden kalan süre (ETA)
+tahmin edilir.
+
+Bir yığın başlatılamazsa protokolün başka çalışan yığını varsa yalnızca yuva
+bırakılır (ve protokolün eşzamanlılık sınırı çalışan yığın sayısına iner); hiç
+yığını yoksa işleri bırakılır. Hata fırlatan iş kuyruğun sonuna bir kez daha
+eklenir, yine başarısız olursa başarısız sayılır (sonuç satırı yazılmadığından
+sonraki taramada checkpoint'ten yeniden denenir); yuva çalışmaya devam eder.
+"""
+import threading
+import time
+import traceback
+from collections import deque
+
+# Hata fırlatan bir işin yeniden deneme sayısı
+JOB_RETRIES = 1
+
+
+class SweepScheduler:
+    def __init__(self, jobs, start_stack, run_job, stop_stack, max_stacks=16,
+                 stacks_per_protocol=2, protocol_limits=None):
+        """jobs: {protokol: [config, ...]}
+        start_stack(proto, index) -> stack (hata fırlatırsa protokolün işleri bırakılır)
+        run_job(stack, config), stop_stack(stack)
+        """
+        self._pending = {proto: deque(configs) for proto, configs in jobs.items() if configs}
+        self._start_stack = start_stack
+        self._run_job = run_job
+        self._stop_stack = stop_stack
+        self.max_stacks = max_stacks
+        self._limits = {proto: (protocol_limits or {}).get(proto, stacks_per_protocol)
+                        for proto in self._pending}
+
+        self._lock = threading.Lock()
+        self._active = {proto: set() for proto in self._pending}  # kullanımdaki yığın indeksleri
+        self._durations = {proto: [] for proto in self._pending}
+        self._done = 0
+        self._failed = []  # (protokol, config) - yeniden denemeden sonra da hata fırlatan işler
+        self._attempts = {}  # (protokol, config) -> hata sayısı
+        self._total = sum(len(q) for q in self._pending.values())
+        self._started_at = None
+
+    def _next_protocol(self):
+        """Yeni yığın açılabilecek, en çok bekleyen işi olan protokol (kilit altında)"""
+        candidates = [proto for proto, queue in self._pending.items()
+                      if queue and len(self._active[proto]) < self._limits[proto]]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda proto: len(self._pending[proto]))
+
+    def _acquire_stack_index(self, proto):
+        index = 0
+        while index in self._active[proto]:
+            index += 1
+        self._active[proto].add(index)
+        return index
+
+    def _slot(self):
+        while True:
+            with self._lock:
+                proto = self._next_protocol()
+                if proto is None:
+                    return
+                index = self._acquire_stack_index(proto)
+
+            try:
+                stack = self._start_stack(proto, index)
+            except Exception as e:
+                with self._lock:
+                    self._active[proto].discard(index)
+                    running = len(self._active[proto])
+                    if running:
+                        # Diğer yığınlar işleri bitirir; bu protokol için yeni yığın denenmez
+                        self._limits[proto] = running
+                        dropped = 0
+                    else:
+                        dropped = len(self._pending[proto])
+                        self._pending[proto].clear()
+                        self._total -= dropped
+                if dropped:
+                    print(f"[{proto}#{index}] Stack failed to start ({e}); dropping {dropped} pending jobs")
+                else:
+                    print(f"[{proto}#{index}] Stack failed to start ({e}); "
+                          f"continuing on {running} running stack(s)")
+                continue
+
+            try:
+                while True:
+                    with self._lock:
+                        if not self._pending[proto]:
+                            break
+                        config = self._pending[proto].popleft()
+
+                    start = time.monotonic()
+                    try:
+                        self._run_job(stack, config)
+                    except Exception as e:
+                        self._job_failed(proto, index, config, e)
+                        continue
+                    duration = time.monotonic() - start
+
+                    with self._lock:
+                        self._durations[proto].append(duration)
+                        self._done += 1
+                        progress = self.progress()
+                    print(f"[{proto}#{index}] {progress['done']}/{progress['total']} jobs done, "
+                          f"ETA {format_duration(progress['eta_s'])}")
+            finally:
+                self._stop_stack(stack)
+                with self._lock:
+                    self._active[proto].discard(index)
+
+    def _job_failed(self, proto, index, config, error):
+        """Hata fırlatan iş: JOB_RETRIES kez kuyruğun sonuna, sonra başarısız sayılır"""
+        traceback.print_exc()
+        with self._lock:
+            key = (proto, config)
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            retry = self._attempts[key] <= JOB_RETRIES
+            if retry:
+                self._pending[proto].append(config)
+            else:
+                self._failed.append(key)
+                self._done += 1
+        print(f"[{proto}#{index}] Job {config} failed ({error!r}); "
+              + ("requeued" if retry else "giving up, no result written"))
+
+    def progress(self):
+        """İlerleme ve gözlenen sürelerden ETA (kilit altında çağrılmalı)"""
+        all_durations = [d for durations in self._durations.values() for d in durations]
+        fallback = sum(all_durations) / len(all_durations) if all_durations else None
+        remaining_s = 0.0
+        for proto, queue in self._pending.items():
+            durations = self._durations[proto]
+            mean = sum(durations) / len(durations) if durations else fallback
+            if mean is not None:
+                remaining_s += mean * len(queue)
+        active = sum(len(indexes) for indexes in self._active.values()) or 1
+        return {
+            'done': self._done,
+            'failed': len(self._failed),
+            'total': self._total,
+            'active_stacks': {proto: len(indexes) for proto, indexes in self._active.items() if indexes},
+            'eta_s': remaining_s / active if fallback is not None else None
+        }
+
+    def run(self):
+        """Tüm işler bitene kadar çalış"""
+        self._started_at = time.monotonic()
+        slots = [threading.Thread(target=self._slot, name=f"stack-slot-{i}") for i in range(self.max_stacks)]
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            slot.join()
+        print(f"Sweep finished: {self._done}/{self._total} jobs in "
+              f"{format_duration(time.monotonic() - self._started_at)}"
+              + (f", {len(self._failed)} failed" if self._failed else ""))
+        for proto, config in self._failed:
+            print(f"  failed: {proto} {config}")
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
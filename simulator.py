@@ -0,0 +1,186 @@
+"""Docker, tc ve JVM olmadan yerel benchmark simülatörü (`run_experiments.py --simulate`).
+
+Yığın başlatma/durdurma, ağ profili ve test koşusu run_experiments ile aynı
+sözleşmeyle (stack sözlüğü, network.apply/close, execute) taklit edilir; böylece
+zamanlayıcı, sonuç yazımı, arşiv ve dashboard tüm tarama boyunca gerçek yük
+altında dakikalar içinde uçtan uca ölçülebilir.
+
+Mesaj modeli netem/tbf parametrelerinden türetilir:
+- üretici çıkışında tbf hızıyla FIFO serileştirme (kuyruk gecikmesi)
+- datagram protokollerinde tbf kuyruğu TBF_LATENCY_MS'i aşınca düşme
+- netem tek yön gecikmesi ve bağımsız paket kaybı
+- TCP: kayıpta katlanan RTO ile yeniden iletim ve sıralı teslim (head-of-line)
+- CoAP CON: ACK_TIMEOUT * [1, 1.5) ile katlanan yeniden iletim, en fazla 4 kez
+- abone durdurulana kadar (süre + DRAIN_MS) gelmeyen mesajlar kayıp sayılır
+Her koşu abonenin results.csv biçiminde (timestamp,sequence,latency) yazılır ve
+soğuk JVM yolundaki gibi geri okunur.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from collections import namedtuple
+from contextlib import nullcontext
+
+import numpy as np
+
+from aggregator import OnlineAggregator
+from network_profile import NetworkSetupError, parse_delay, parse_loss, parse_rate
+
+# network_profile.TBF_OPTIONS ile aynı kuyruk sınırı
+TBF_LATENCY_MS = 400.0
+TCP_MIN_RTO_MS = 200.0
+COAP_ACK_TIMEOUT_MS = 2000.0
+COAP_ACK_RANDOM_FACTOR = 1.5
+COAP_MAX_RETRANSMIT = 4
+DRAIN_MS = 2000.0
+
+# Koşu başına results.csv'ler için çalışma dizini kökü. Diskte tutulursa dosya
+# kesme/silme işlemleri SQLite ve arşivin fsync'leriyle aynı ext4 journal'ını bekler.
+WORK_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Yığın kurulumunun (compose up + servis hazırlığı) simüle edilen süresi (saniye)
+STACK_START_SECONDS = 30.0
+
+# overhead: mesaj başına protokol + taşıma başlığı (bayt); transport: tcp/udp;
+# retransmit: tcp/coap/None; extra_rtt: teslimden önceki ek el sıkışma turu;
+# processing_ms: broker/istemci işleme süresinin medyanı
+ProtocolModel = namedtuple("ProtocolModel", "overhead transport retransmit extra_rtt processing_ms")
+
+PROTOCOL_MODELS = {
+    "mqtt-qos0": ProtocolModel(60, "tcp", "tcp", 0, 0.5),
+    "mqtt-qos1": ProtocolModel(64, "tcp", "tcp", 0, 0.6),
+    "mqtt-qos2": ProtocolModel(64, "tcp", "tcp", 1, 0.8),
+    "amqp-qos0": ProtocolModel(90, "tcp", "tcp", 0, 0.8),
+    "amqp-qos1": ProtocolModel(98, "tcp", "tcp", 0, 1.0),
+    "coap-con": ProtocolModel(32, "udp", "coap", 0, 0.4),
+    "coap-non": ProtocolModel(32, "udp", None, 0, 0.3),
+    "http": ProtocolModel(220, "tcp", "tcp", 0, 1.5),
+    "xmpp-qos0": ProtocolModel(350, "tcp", "tcp", 0, 2.0),
+    "xmpp-qos1": ProtocolModel(380, "tcp", "tcp", 0, 2.2),
+    "xmpp-qos2": ProtocolModel(400, "tcp", "tcp", 1, 2.4),
+    "zenoh-best-effort": ProtocolModel(30, "udp", None, 0, 0.2),
+    "zenoh-reliable": ProtocolModel(34, "tcp", "tcp", 0, 0.3),
+}
+
+
+def simulate_run(model, size, rate, duration, bw, loss, delay, rng):
+    """Bir koşunun mesajları: (gönderilen, teslim edilen seq, gecikme ms, varış ms)"""
+    count = int(rate * duration)
+    seq = np.arange(count)
+    send = seq * (1000.0 / rate)
+    tx = (size + model.overhead) * 8 / parse_rate(bw) * 1000.0
+    one_way = parse_delay(delay)
+    p = parse_loss(loss) / 100.0
+    rtt = 2 * one_way + 2 * tx
+
+    # FIFO: d_i = max(a_i, d_{i-1}) + tx = (i+1)*tx + max_{j<=i}(a_j - j*tx)
+    depart = np.maximum.accumulate(send - seq * tx) + (seq + 1) * tx
+    delivered = np.ones(count, dtype=bool)
+    if model.transport == "udp":
+        delivered &= depart - send - tx <= TBF_LATENCY_MS
+
+    # İlk başarılı denemeden önceki kayıp sayısı
+    failures = rng.geometric(1.0 - p, count) - 1 if p > 0 else np.zeros(count, dtype=np.int64)
+    if model.retransmit == "tcp":
+        extra = max(TCP_MIN_RTO_MS, 2 * rtt) * (2.0 ** failures - 1)
+    elif model.retransmit == "coap":
+        delivered &= failures <= COAP_MAX_RETRANSMIT
+        timeout = COAP_ACK_TIMEOUT_MS * rng.uniform(1.0, COAP_ACK_RANDOM_FACTOR, count)
+        extra = timeout * (2.0 ** np.minimum(failures, COAP_MAX_RETRANSMIT) - 1)
+    else:
+        delivered &= failures == 0
+        extra = 0.0
+
+    processing = model.processing_ms * rng.lognormal(0.0, 0.5, count)
+    arrival = depart + one_way + extra + model.extra_rtt * rtt + processing
+    if model.transport == "tcp":
+        # Sıralı akış: yeniden iletilen mesaj arkasındakileri bekletir
+        arrival = np.maximum.accumulate(arrival)
+    delivered &= arrival <= duration * 1000.0 + DRAIN_MS
+
+    return count, seq[delivered], (arrival - send)[delivered], arrival[delivered]
+
+
+class SimulatedNetwork:
+    """NetworkProfileApplier yerine: profili doğrular ve saklar"""
+
+    def __init__(self):
+        self.profile = None
+
+    def apply(self, shells, bw, loss, delay):
+        try:
+            parse_rate(bw), parse_loss(loss), parse_delay(delay)
+        except ValueError as e:
+            raise NetworkSetupError(str(e)) from e
+        self.profile = (bw, loss, delay)
+
+    def close(self):
+        self.profile = None
+
+
+class Simulator:
+    """Simüle yığınlar; time_scale > 0 ise gerçek süreler bu oranla uyutulur
+    (ör. 0.001 -> 10 sn'lik koşu 10 ms sürer), 0 ise hiç beklenmez"""
+
+    def __init__(self, duration, time_scale=0.0, seed=0, tracer=None):
+        self.duration = duration
+        self.time_scale = time_scale
+        self.seed = seed
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        self._runs = {}  # (protokol, konfigürasyon) -> koşu sayısı; tekrarlar farklı örnekler üretir
+
+    def _span(self, name):
+        return self.tracer.span(name) if self.tracer is not None else nullcontext()
+
+    def _sleep(self, seconds):
+        if self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def start_stack(self, proto_name, index):
+        safe_proto = proto_name.replace("-", "_")
+        project_name = f"sim_{safe_proto}" if index == 0 else f"sim_{safe_proto}_{index}"
+        with self._span("stack_start"):
+            self._sleep(STACK_START_SECONDS)
+        return {
+            "proto": proto_name,
+            "safe_proto": safe_proto,
+            "project": project_name,
+            "node1": None,
+            "node2": None,
+            "network": SimulatedNetwork(),
+            "agents": None,
+            "execute": self.execute,
+            "workdir": tempfile.mkdtemp(prefix=f"{project_name}_", dir=WORK_ROOT)
+        }
+
+    def stop_stack(self, stack):
+        stack["network"].close()
+        shutil.rmtree(stack["workdir"], ignore_errors=True)
+
+    def execute(self, stack, job, run_id):
+        """run_cold_jvm ile aynı sözleşme: (sent, toplayıcı, tamamlandı mı)"""
+        size, rate, bw, loss, delay = job
+        model = PROTOCOL_MODELS[stack["proto"]]
+        # Aynı tohumla aynı konfigürasyonun n. koşusu aynı örnekleri üretir
+        with self._lock:
+            repetition = self._runs[(stack["proto"], job)] = self._runs.get((stack["proto"], job), -1) + 1
+        rng = np.random.default_rng([self.seed, zlib.crc32(f"{stack['proto']}|{job}".encode()), repetition])
+        results_path = os.path.join(stack["workdir"], "results.csv")
+
+        with self._span("producer_run"):
+            start = time.time()
+            sent, seqs, latencies, arrivals = simulate_run(model, size, rate, self.duration, bw, loss, delay, rng)
+            # Gerçek abonelerle aynı biçim: timestamp yükteki gönderim zamanı (saniye, ondalıklı), latency ms
+            np.savetxt(results_path, np.column_stack([start + (arrivals - latencies) / 1000.0, seqs, latencies]),
+                       fmt=["%.6f", "%d", "%.3f"], delimiter=",", header="timestamp,sequence,latency", comments="")
+            self._sleep(self.duration + DRAIN_MS / 1000.0)
+
+        with self._span("collect"):
+            aggregator = OnlineAggregator()
+            with open(results_path) as f:
+                aggregator.add_csv(f.read())
+        return sent, aggregator, True
@@ -0,0 +1,288 @@
+"""Tarama planlayıcı: tam ızgara yerine küçük bir tasarım koşup atlanan konfigürasyonları tahmin etmek.
+
+Tasarımlar (konfigürasyon ızgarası run_experiments.iter_configs'ten gelir):
+- full: tüm ızgara
+- fractional: ana etkiler + ikili etkileşim modeli için D-optimal kesir; karışık
+  seviyeli (2x3x4x4x4) ve kısıtlı ızgarada düzenli bir 2^(k-p) kesri olmadığından
+  nokta seçimi determinant artışına göre açgözlüdür
+- lhs: ayrık Latin hiperküp (her faktörün seviyeleri eşit sayıda kullanılır)
+- subset: kullanıcının CSV dosyasındaki noktalar (size,rate,bandwidth,loss,delay)
+
+Tarama bitince her protokol ve metrik için etki kodlamalı en küçük kareler modeli
+(yeterli serbestlik derecesi varsa ikili etkileşimlerle) ölçülen satırlara
+uydurulur. Ana/etkileşim etkileri `effects`, ölçülmemiş konfigürasyonların
+tahminleri %95 tahmin aralığıyla `predictions` tablosuna yazılır (results_db v3).
+
+    python sweep_plan.py plan --design lhs --runs 96 --output plan.csv
+    python sweep_plan.py fit --design lhs
+"""
+import argparse
+import csv
+import time
+from itertools import combinations
+
+import numpy as np
+
+import results_db
+
+DESIGNS = ["full", "fractional", "lhs", "subset"]
+FACTORS = ["Size", "Rate", "Bandwidth", "Loss", "Delay"]
+# Tahmin edilen metriklerin (results_db.PREDICTED_METRICS) geçerli aralıkları
+METRIC_BOUNDS = {
+    "DeliveryRatio": (0.0, 100.0),
+    "LatencyAvg_ms": (0.0, None),
+    "Throughput_bps": (0.0, None),
+}
+# Etkileşimli model için gereken en az artık serbestlik derecesi; yoksa yalnızca ana etkiler
+MIN_RESIDUAL_DF = 5
+# Açgözlü D-optimal seçimde başlangıç M^-1 = I * bu değer: M = I / bu değer, tekil olmayan
+# ama seçimi etkilemeyecek kadar zayıf bir başlangıç bilgi matrisi (ilk noktalar tanımsız det'i aşar)
+D_OPTIMAL_PRIOR_SCALE = 1e6
+# fractional tasarımda varsayılan koşu sayısı = model parametre sayısı * bu oran
+FRACTIONAL_RUNS_FACTOR = 1.5
+Z_95 = 1.959964
+
+
+def factor_levels(grid):
+    """Her faktörün ızgarada ilk görüldüğü sıradaki seviyeleri"""
+    return [list(dict.fromkeys(config[f] for config in grid)) for f in range(len(FACTORS))]
+
+
+def encode(configs, levels):
+    """Konfigürasyonları (n, faktör) seviye indeksi dizisine çevir"""
+    index = [{level: i for i, level in enumerate(values)} for values in levels]
+    return np.array([[index[f][value] for f, value in enumerate(config)] for config in configs], dtype=np.int64)
+
+
+def model_matrix(codes, levels, interactions=True):
+    """Etki kodlaması (son seviye -1): sabit, ana etkiler ve istenirse tüm ikili etkileşimler"""
+    main = []
+    for f, values in enumerate(levels):
+        last = len(values) - 1
+        block = np.zeros((len(codes), last))
+        for k in range(last):
+            block[:, k] = (codes[:, f] == k).astype(float) - (codes[:, f] == last)
+        main.append(block)
+    blocks = [np.ones((len(codes), 1))] + main
+    if interactions:
+        for a, b in combinations(range(len(levels)), 2):
+            blocks.append((main[a][:, :, None] * main[b][:, None, :]).reshape(len(codes), -1))
+    return np.hstack(blocks)
+
+
+def fractional_design(grid, runs=None):
+    """Açgözlü D-optimal kesir (ızgara sırasıyla). Noktalar, fit()'in bu koşu sayısıyla uydurabileceği
+    modele göre seçilir: etkileşim modeli MIN_RESIDUAL_DF artık serbestlik bırakmıyorsa ana etkiler.
+    Ana etki modeli de uydurulamayacak kadar az koşuda ValueError."""
+    levels = factor_levels(grid)
+    codes = encode(grid, levels)
+    X = model_matrix(codes, levels)
+    if runs is None:
+        runs = int(np.ceil(X.shape[1] * FRACTIONAL_RUNS_FACTOR))
+    runs = min(runs, len(grid))
+    if runs - np.linalg.matrix_rank(X) < MIN_RESIDUAL_DF:
+        X = model_matrix(codes, levels, interactions=False)
+        if runs <= X.shape[1]:
+            raise ValueError(f"fractional design needs more than {X.shape[1]} runs to fit main effects")
+
+    # det(M + x x^T) = det(M) (1 + x^T M^-1 x): en yüksek kaldıraçlı nokta seçilir, M^-1 Sherman-Morrison ile güncellenir
+    inverse = np.eye(X.shape[1]) * D_OPTIMAL_PRIOR_SCALE
+    chosen = np.zeros(len(grid), dtype=bool)
+    for _ in range(runs):
+        leverage = np.einsum("ij,jk,ik->i", X, inverse, X)
+        leverage[chosen] = -np.inf
+        best = int(np.argmax(leverage))
+        chosen[best] = True
+        v = inverse @ X[best]
+        inverse -= np.outer(v, v) / (1.0 + X[best] @ v)
+    return [config for config, keep in zip(grid, chosen) if keep]
+
+
+def lhs_design(grid, runs, seed=0):
+    """Ayrık Latin hiperküp: her faktörde seviyeler eşit sıklıkta; ızgara dışı/tekrarlı noktalar rastgele geçerli noktalarla değiştirilir"""
+    rng = np.random.default_rng(seed)
+    levels = factor_levels(grid)
+    runs = min(runs, len(grid))
+    columns = [rng.permutation(np.arange(runs) * len(values) // runs) for values in levels]
+    valid = set(grid)
+
+    chosen = []
+    for row in zip(*columns):
+        config = tuple(levels[f][i] for f, i in enumerate(row))
+        if config in valid and config not in chosen:
+            chosen.append(config)
+    remaining = [config for config in grid if config not in chosen]
+    for i in rng.permutation(len(remaining))[:runs - len(chosen)]:
+        chosen.append(remaining[i])
+    chosen = set(chosen)
+    return [config for config in grid if config in chosen]
+
+
+def load_subset(grid, path):
+    """CSV'deki (size,rate,bandwidth,loss,delay) noktaları; ızgarada olmayan nokta ValueError"""
+    valid = set(grid)
+    chosen = set()
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            delay = row["delay"].strip()
+            config = (int(row["size"]), int(row["rate"]), row["bandwidth"].strip(), row["loss"].strip(),
+                      delay if delay.endswith("ms") else f"{delay}ms")
+            if config not in valid:
+                raise ValueError(f"{path}: {config} is not in the sweep grid")
+            chosen.add(config)
+    return [config for config in grid if config in chosen]
+
+
+def plan(grid, design, runs=None, seed=0, subset_path=None):
+    """Tasarımın koşulacak konfigürasyonları (ızgara sırasıyla)"""
+    if design == "full":
+        return list(grid)
+    if design == "fractional":
+        return fractional_design(grid, runs)
+    if design == "lhs":
+        return lhs_design(grid, runs or len(grid) // 4, seed)
+    if design == "subset":
+        if not subset_path:
+            raise ValueError("subset design needs a points file")
+        return load_subset(grid, subset_path)
+    raise ValueError(f"unknown design: {design}")
+
+
+def fit(grid, configs, values, levels):
+    """Ölçümlere model uydur; (model adı, ızgara tahminleri, tahmin std sapmaları, ızgara model matrisi,
+    etki fonksiyonu) ya da yeterli ölçüm yoksa None"""
+    codes = encode(configs, levels)
+    for interactions in (True, False):
+        X = model_matrix(codes, levels, interactions)
+        rank = np.linalg.matrix_rank(X)
+        if len(values) - rank >= (MIN_RESIDUAL_DF if interactions else 1):
+            break
+    else:
+        return None
+
+    # Kısıtlı ızgarada (rate=100, 50kbit yok) bazı etkileşim sütunları bağımlı: pseudo-inverse
+    precision = np.linalg.pinv(X.T @ X)
+    beta = precision @ X.T @ values
+    residual = values - X @ beta
+    sigma2 = float(residual @ residual) / (len(values) - rank)
+
+    G = model_matrix(encode(grid, levels), levels, interactions)
+    predicted = G @ beta
+    # Yeni bir koşu için tahmin aralığı: parametre belirsizliği + koşu gürültüsü
+    spread = np.sqrt(sigma2 * (1.0 + np.einsum("ij,jk,ik->i", G, precision, G)))
+
+    def effect(contrast):
+        return float(contrast @ beta), float(np.sqrt(sigma2 * contrast @ precision @ contrast))
+
+    return ("main+2fi" if interactions else "main"), predicted, spread, G, effect
+
+
+def effect_rows(grid_codes, G, effect, levels, interactions):
+    """Izgara üzerindeki marjinal ortalamalardan ana ve ikili etkileşim etkileri: (terim, seviye, etki, std hata)"""
+    grand = G.mean(axis=0)
+    rows = []
+    for f, values in enumerate(levels):
+        for i, value in enumerate(values):
+            mask = grid_codes[:, f] == i
+            rows.append((FACTORS[f], str(value), *effect(G[mask].mean(axis=0) - grand)))
+    if interactions:
+        for a, b in combinations(range(len(levels)), 2):
+            for i, value_a in enumerate(levels[a]):
+                for j, value_b in enumerate(levels[b]):
+                    cell = (grid_codes[:, a] == i) & (grid_codes[:, b] == j)
+                    if not cell.any():
+                        continue
+                    contrast = (G[cell].mean(axis=0) - G[grid_codes[:, a] == i].mean(axis=0)
+                                - G[grid_codes[:, b] == j].mean(axis=0) + grand)
+                    rows.append((f"{FACTORS[a]}:{FACTORS[b]}", f"{value_a}:{value_b}", *effect(contrast)))
+    return rows
+
+
+def fit_and_store(db_path, grid, design, protocols):
+    """Her protokol için modeli uydur; etkileri ve ölçülmemiş konfigürasyon tahminlerini veritabanına yaz"""
+    conn = results_db.connect(db_path)
+    levels = factor_levels(grid)
+    grid_codes = encode(grid, levels)
+    fitted_at = time.time()
+    metric_columns = ", ".join(results_db.PREDICTED_METRICS)
+
+    for proto in protocols:
+        rows = conn.execute(
+            f"SELECT Size, Rate, Bandwidth, Loss, Delay, {metric_columns} FROM results "
+            "WHERE Protocol = ? AND (Status IS NULL OR Status = 'SUCCESS')", (proto,)).fetchall()
+        valid = set(grid)
+        rows = [row for row in rows if (int(row[0]), int(row[1])) + tuple(row[2:5]) in valid]
+        measured = {(int(row[0]), int(row[1])) + tuple(row[2:5]) for row in rows}
+        skipped = [i for i, config in enumerate(grid) if config not in measured]
+
+        predictions = {i: {} for i in skipped}
+        effects = []
+        models = set()
+        for m, metric in enumerate(results_db.PREDICTED_METRICS):
+            samples = [row for row in rows if row[5 + m] is not None]
+            configs = [(int(row[0]), int(row[1])) + tuple(row[2:5]) for row in samples]
+            result = fit(grid, configs, np.array([row[5 + m] for row in samples], dtype=float), levels)
+            if result is None:
+                print(f"[{proto}] {metric}: not enough measurements to fit ({len(samples)} rows)")
+                continue
+            model, predicted, spread, G, effect = result
+            models.add(model)
+            low, high = METRIC_BOUNDS[metric]
+            for i in skipped:
+                bounds = np.clip([predicted[i], predicted[i] - Z_95 * spread[i], predicted[i] + Z_95 * spread[i]],
+                                 low, high)
+                predictions[i][metric] = [float(v) for v in bounds]
+            effects += [(proto, metric, term, level, value, stderr, fitted_at)
+                        for term, level, value, stderr in effect_rows(grid_codes, G, effect, levels,
+                                                                      model == "main+2fi")]
+
+        metrics = [f"{metric}{suffix}" for metric in results_db.PREDICTED_METRICS for suffix in ("", "_lower", "_upper")]
+        records = []
+        for i, values in predictions.items():
+            size, rate, bw, loss, delay = grid[i]
+            bounds = [v for metric in results_db.PREDICTED_METRICS for v in values.get(metric, [None] * 3)]
+            records.append((proto, size, rate, bw, loss, delay, int(delay.replace("ms", "")), *bounds,
+                            design, "/".join(sorted(models)), len(rows), fitted_at))
+        with conn:
+            conn.execute("DELETE FROM predictions WHERE Protocol = ?", (proto,))
+            conn.execute("DELETE FROM effects WHERE Protocol = ?", (proto,))
+            if models:
+                conn.executemany(
+                    f"INSERT INTO predictions (Protocol, Size, Rate, Bandwidth, Loss, Delay, ConfigDelay_ms, "
+                    f"{', '.join(metrics)}, Design, Model, MeasuredRows, FittedAt) "
+                    f"VALUES ({', '.join('?' for _ in range(7 + len(metrics) + 4))})", records)
+                conn.executemany("INSERT INTO effects (Protocol, Metric, Term, Level, Effect, StdErr, FittedAt) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?)", effects)
+        if models:
+            print(f"[{proto}] {len(measured)} configurations measured, {len(records)} predicted "
+                  f"({'/'.join(sorted(models))})")
+    conn.close()
+
+
+if __name__ == "__main__":
+    from run_experiments import PROTOCOLS, iter_configs
+
+    parser = argparse.ArgumentParser(description="LPWAN sweep planner")
+    parser.add_argument("--db", default=results_db.DB_PATH, help="database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    plan_parser = commands.add_parser("plan", help="print or save the configurations a design would run")
+    plan_parser.add_argument("--design", choices=DESIGNS, default="fractional")
+    plan_parser.add_argument("--runs", type=int, help="number of configurations (fractional/lhs)")
+    plan_parser.add_argument("--seed", type=int, default=0)
+    plan_parser.add_argument("--plan-file", help="points file for the subset design")
+    plan_parser.add_argument("--output", help="write the points as CSV (usable as a subset file)")
+    fit_parser = commands.add_parser("fit", help="fit effects and predict unmeasured configurations")
+    fit_parser.add_argument("--design", default="measured", help="design label stored with the predictions")
+    args = parser.parse_args()
+
+    grid = list(iter_configs())
+    if args.command == "plan":
+        points = plan(grid, args.design, args.runs, args.seed, args.plan_file)
+        print(f"{args.design}: {len(points)}/{len(grid)} configurations per protocol")
+        if args.output:
+            with open(args.output, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["size", "rate", "bandwidth", "loss", "delay"])
+                writer.writerows(points)
+    else:
+        fit_and_store(args.db, grid, args.design, PROTOCOLS)
@@ -0,0 +1,151 @@
+"""Orkestratör için iç içe zamanlama aralıkları (span) ve Chrome Trace Event çıktısı.
+
+Her span bittiğinde "X" (complete) olayı olarak trace dosyasına bir satır
+eklenir; dosya JSON Array biçimindedir ve kapanış `]` olmadan da
+chrome://tracing / Perfetto tarafından açılır, böylece yarıda kesilen bir
+tarama da incelenebilir. Olayın args alanındaki self_ms, alt span'ler
+dışında kalan süredir; faz özetleri (summarize) buna dayanır.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_FILE = "results/trace.json"
+SUMMARY_FILE = "results/trace_summary.csv"
+SUMMARY_COLUMNS = ["Phase", "Count", "Total_s", "Self_s", "Mean_s", "Max_s", "SelfShare_pct"]
+
+
+class Tracer:
+    """Thread-safe span kaydedici; open() çağrılmadıysa hiçbir şey yazmaz"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._file = None
+        self._threads = set()
+        self.path = None
+
+    def open(self, path=TRACE_FILE):
+        with self._lock:
+            self.path = path
+            self._file = open(path, "w")
+            self._file.write("[\n")
+            self._write({"name": "process_name", "ph": "M", "pid": os.getpid(),
+                         "args": {"name": "run_experiments"}})
+
+    def close(self):
+        """Diziyi kapat (son olaydan sonraki virgül atılır), dosya katı JSON olur"""
+        with self._lock:
+            if self._file is not None:
+                self._file.seek(self._file.tell() - 2)
+                self._file.write("\n]\n")
+                self._file.truncate()
+                self._file.close()
+                self._file = None
+
+    def _write(self, event):
+        self._file.write(json.dumps(event) + ",\n")
+        self._file.flush()
+
+    @contextmanager
+    def span(self, name, **args):
+        """Zamanlanan blok; dönen args sözlüğüne blok içinde alan eklenebilir (ör. status)"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = {"children": 0.0}
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1]["children"] += duration
+            self._record(name, start, duration, duration - frame["children"], args)
+
+    def _record(self, name, start, duration, self_time, args):
+        thread = threading.current_thread()
+        event = {"name": name, "cat": "sweep", "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+                 "ts": round((start - self._origin) * 1e6, 1), "dur": round(duration * 1e6, 1),
+                 "args": {**args, "self_ms": round(self_time * 1e3, 3)}}
+        with self._lock:
+            if self._file is None:
+                return
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self._write({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident,
+                             "args": {"name": thread.name}})
+            self._write(event)
+
+    def write_summary(self, path=SUMMARY_FILE):
+        """Trace dosyasından faz başına özet CSV'si"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            trace_path = self.path
+        if trace_path is None:
+            return
+        rows = summarize(load_events(trace_path))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def load_events(path=TRACE_FILE):
+    """Trace dosyasındaki olaylar; kapanmamış dizi ve yarım kalmış son satır tolere edilir"""
+    events = []
+    if not os.path.exists(path):
+        return events
+    with open(path) as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line in ("", "[", "]"):
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def summarize(events):
+    """Faz (span adı) başına sayı, toplam/öz süre, ortalama ve en uzun süre; öz süreye göre sıralı"""
+    phases = {}
+    for event in events:
+        if event.get("ph") != "X":
+            continue
+        phase = phases.setdefault(event["name"], {"count": 0, "total": 0.0, "self": 0.0, "max": 0.0})
+        duration = event["dur"] / 1e6
+        phase["count"] += 1
+        phase["total"] += duration
+        phase["self"] += event.get("args", {}).get("self_ms", 0.0) / 1e3
+        phase["max"] = max(phase["max"], duration)
+
+    total_self = sum(phase["self"] for phase in phases.values()) or 1.0
+    rows = [
+        {
+            "Phase": name,
+            "Count": phase["count"],
+            "Total_s": round(phase["total"], 3),
+            "Self_s": round(phase["self"], 3),
+            "Mean_s": round(phase["total"] / phase["count"], 3),
+            "Max_s": round(phase["max"], 3),
+            "SelfShare_pct": round(100.0 * phase["self"] / total_self, 1)
+        }
+        for name, phase in phases.items()
+    ]
+    return sorted(rows, key=lambda row: row["Self_s"], reverse=True)
+
+
+def slowest(events, name="config", limit=20):
+    """Verilen span adının en uzun süren örnekleri (args ile)"""
+    spans = [event for event in events if event.get("ph") == "X" and event["name"] == name]
+    spans.sort(key=lambda event: event["dur"], reverse=True)
+    return [{"duration_s": round(event["dur"] / 1e6, 3), **event.get("args", {})} for event in spans[:limit]]